@@ -0,0 +1,55 @@
+"""
+Times the whole-column Age and Type_of_Loan cleaning against the per-row lambdas
+it replaced, on generated data. tests/cleaning_test.py checks that both give the
+same output.
+
+Run from the repository root:
+    python -m benchmarks.age_and_loan_type --rows 1000000
+"""
+import argparse
+import pandas as pd
+
+from benchmarks.common import timed
+from benchmarks.synthetic import make_raw_columns
+from lib.preprocessing.cleaning import clean_age, clean_loan_types, parse_number
+
+# Medians of the generated ages, as CleaningStatistics would fit them
+AGE_MEDIAN = MEDIAN_AGE = 35
+
+
+def age_per_row(ages):
+    # The previous implementation, applied with Series.apply
+    ages = ages.fillna(AGE_MEDIAN).astype(int)
+    return ages.apply(lambda x: MEDIAN_AGE if x < 0 else x).astype(int)
+
+
+def loan_types_per_row(loans):
+    # The previous implementation, applied with Series.apply
+    return loans.apply(
+        lambda x: x.lower().replace('and ', '').replace(', ', ',').strip() if pd.notna(x) else x
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args()
+
+    cases = {
+        "Age": (age_per_row, lambda s: clean_age(s, AGE_MEDIAN, MEDIAN_AGE)),
+        "Type_of_Loan": (loan_types_per_row, clean_loan_types),
+    }
+
+    print(f"{'column':>14} {'rows':>10} {'per-row (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for n_rows in args.rows:
+        raw = make_raw_columns(list(cases), n_rows)
+        # Age is timed from the parsed numbers, where the two implementations differ
+        raw['Age'] = parse_number(raw['Age'])
+        for name, (per_row, vectorized) in cases.items():
+            _, old_time = timed(per_row, raw[name])
+            _, new_time = timed(vectorized, raw[name])
+            print(f"{name:>14} {n_rows:>10} {old_time:>12.2f} {new_time:>15.2f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
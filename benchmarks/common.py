@@ -0,0 +1,54 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+from contextlib import redirect_stdout
+import io
+import time
+
+from lib.io.schema import IDENTIFIER_COLUMNS
+from lib.preprocessing.cleaning import (
+    clean_categorical,
+    drop_columns,
+    handle_missing_data,
+    transform_data_types,
+    transform_special_columns,
+)
+
+
+def timed(func, *args, **kwargs):
+    """
+    Calls func and returns its result with the wall time it took, in seconds.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def cleaning_stages(stats=None, copy=True):
+    """
+    Returns the stage functions of lib.preprocessing.cleaning in the order the
+    pipeline's steps follow, as (name, function, keyword arguments), for the cases that
+    compare with or time the stages one by one.
+
+    Parameters:
+    stats (CleaningStatistics, optional): Fitted statistics for the imputation steps.
+    copy (bool): Passed to the stages that make defensive copies.
+    """
+    return [
+        ('drop_columns', drop_columns, {'columns_to_drop': IDENTIFIER_COLUMNS, 'copy': copy}),
+        ('transform_data_types', transform_data_types, {'stats': stats, 'copy': copy}),
+        ('clean_categorical', clean_categorical, {'copy': copy}),
+        ('transform_special_columns', transform_special_columns, {}),
+        ('handle_missing_data', handle_missing_data, {'stats': stats, 'copy': copy}),
+    ]
+
+
+def clean_in_stages(df, stats=None, copy=True):
+    """
+    Runs the cleaning stages on df in order, without their progress output.
+    With copy=False the stages work in place, so df must not be used afterwards.
+    """
+    with redirect_stdout(io.StringIO()):
+        for _, func, kwargs in cleaning_stages(stats, copy):
+            df = func(df, **kwargs)
+    return df
@@ -0,0 +1,44 @@
+"""
+Benchmark of the Credit_History_Age parser against the per-row implementation.
+
+Run from the repository root:
+    python -m benchmarks.credit_history --rows 1000000 10000000
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from benchmarks.synthetic import make_raw_columns
+from lib.preprocessing.cleaning import convert_to_months
+
+
+def convert_to_months_per_row(age_str):
+    # The previous implementation, applied with Series.apply
+    if pd.isna(age_str):
+        return np.nan
+    try:
+        parts = age_str.split()
+        years = int(parts[0])
+        months = int(parts[3])
+        return (years * 12) + months
+    except (IndexError, ValueError):
+        return np.nan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'per-row (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for n_rows in args.rows:
+        column = make_raw_columns(['Credit_History_Age'], n_rows)['Credit_History_Age']
+        expected, old_time = timed(lambda s: s.apply(convert_to_months_per_row).astype(float), column)
+        result, new_time = timed(convert_to_months, column)
+        assert expected.equals(result), "vectorized output differs from the per-row parser"
+        print(f"{n_rows:>12} {old_time:>12.2f} {new_time:>15.2f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares coerce_numeric with the per-column code transform_data_types used before
+(a regex replace and astype(float), or pd.to_numeric), and prints how many values of
+each column were coerced.
+
+Run from the repository root:
+    python -m benchmarks.numeric --rows 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from benchmarks.synthetic import make_raw_columns
+from lib.preprocessing.numeric import NUMERIC_TEXT_COLUMNS, coerce_numeric, coercion_report
+
+
+def previous(series, mode):
+    # The code transform_data_types ran before
+    if mode == 'strip':
+        return series.astype(str).str.replace(r'[^\d.]', '', regex=True).astype(float)
+    return pd.to_numeric(series, errors='coerce')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        df = make_raw_columns(list(NUMERIC_TEXT_COLUMNS), n_rows)
+        print(f"\n{n_rows} rows")
+        print(f"{'column':<26} {'mode':>6} {'before (s)':>11} {'engine (s)':>11} {'speedup':>8} {'max rel diff':>13}")
+        total_before = total_after = 0.0
+        for col, mode in NUMERIC_TEXT_COLUMNS.items():
+            expected, before = timed(previous, df[col], mode)
+            result, after = timed(coerce_numeric, df[col], mode)
+            # Both give the same numbers; pd.to_numeric can be one unit in the last place off
+            result, expected = result.to_numpy(), expected.to_numpy(dtype=float)
+            assert np.array_equal(np.isnan(result), np.isnan(expected))
+            diff = np.nanmax(np.abs(result - expected) / np.maximum(np.abs(expected), 1))
+            total_before += before
+            total_after += after
+            print(f"{col:<26} {mode:>6} {before:>11.3f} {after:>11.3f} {before / after:>7.1f}x {diff:>13.1e}")
+        print(f"{'total':<26} {'':>6} {total_before:>11.3f} {total_after:>11.3f} "
+              f"{total_before / total_after:>7.1f}x")
+        print()
+        print(coercion_report(df).to_string())
+
+
+if __name__ == "__main__":
+    main()
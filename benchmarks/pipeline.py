@@ -0,0 +1,58 @@
+"""
+Compares the compiled cleaning Pipeline with the stage functions run one after the
+other (benchmarks.common.clean_in_stages): same output, batch time, time when only
+a few output columns are requested, and the time of scoring one record and a batch
+of records.
+
+Run from the repository root:
+    python -m benchmarks.pipeline --rows 100000
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.common import clean_in_stages, timed
+from benchmarks.synthetic import make_raw_frame
+from lib.io.schema import IDENTIFIER_COLUMNS
+from lib.preprocessing.pipeline import Pipeline
+from lib.preprocessing.statistics import CleaningStatistics
+
+# A small feature set, to show the columns and steps the plan leaves out
+FEATURES = ['Age', 'Annual_Income', 'Credit_Mix', 'Outstanding_Debt', 'Credit_Score']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'stages (s)':>11} {'pipeline (s)':>13} {'threads (s)':>12} "
+          f"{'features (s)':>13} {'record (ms)':>12} {'batch (ms/rec)':>15}")
+    for n_rows in args.rows:
+        df = make_raw_frame(n_rows)
+        stats = CleaningStatistics().fit(df)
+
+        expected, stage_time = timed(clean_in_stages, df, stats=stats)
+        pipeline = Pipeline(drop=IDENTIFIER_COLUMNS, stats=stats)
+        result, pipeline_time = timed(pipeline.transform, df)
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+        threaded = Pipeline(drop=IDENTIFIER_COLUMNS, stats=stats, n_jobs=args.threads)
+        _, thread_time = timed(threaded.transform, df)
+        features = Pipeline(columns=FEATURES, stats=stats)
+        _, feature_time = timed(features.transform, df)
+
+        record = df.iloc[0].to_dict()
+        pipeline.transform_record(record)
+        _, record_time = timed(lambda: [pipeline.transform_record(record) for _ in range(20)])
+        records = df.head(1000).to_dict('records')
+        _, batch_time = timed(pipeline.transform_records, records)
+
+        print(f"{n_rows:>10} {stage_time:>11.2f} {pipeline_time:>13.2f} {thread_time:>12.2f} "
+              f"{feature_time:>13.2f} {record_time / 20 * 1000:>12.1f} "
+              f"{batch_time / len(records) * 1000:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compares the schema-based reader in lib.io.load with the untyped pd.read_csv call
+main.py used before: parse time and in-memory size of the result.
+
+Run from the repository root:
+    python -m benchmarks.read_csv --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.common import timed
+from benchmarks.synthetic import write_raw_csv
+from lib.io.load import read_raw_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args()
+
+    readers = {
+        "untyped": lambda path: pd.read_csv(path, low_memory=False),
+        "schema": lambda path: read_raw_csv(path),
+        "schema+pyarrow": lambda path: read_raw_csv(path, engine="pyarrow"),
+    }
+
+    print(f"{'rows':>10} {'reader':>15} {'time (s)':>9} {'memory (MB)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            path = os.path.join(tmp, f"train_{n_rows}.csv")
+            write_raw_csv(path, n_rows)
+            for name, read in readers.items():
+                df, elapsed = timed(read, path)
+                memory = df.memory_usage(deep=True).sum() / 2**20
+                print(f"{n_rows:>10} {name:>15} {elapsed:>9.2f} {memory:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
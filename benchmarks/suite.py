@@ -0,0 +1,487 @@
+"""
+Benchmark suite for the cleaning, loading, outlier, report and plot functions, at
+several data scales, with stored baselines to catch regressions.
+
+Every case is timed on synthetic data (see benchmarks/synthetic.py) that is generated
+once per scale and seed and kept in --data-dir. Each repeat gets a fresh copy of its
+input, which is not timed, and the best and median time are reported.
+
+Run from the repository root:
+    python -m benchmarks.suite --rows 100k 1M
+    python -m benchmarks.suite --rows 100k --cases cleaning loading
+    python -m benchmarks.suite --rows 100k --save reference
+    python -m benchmarks.suite --rows 100k --compare reference
+
+The in-memory cases need several times the raw file size in RAM, so they are capped
+at 10M rows; the streaming cases also run at 50M. --compare exits with status 1 if a
+case got slower than the baseline by more than --tolerance, or has no baseline.
+--save adds the results to the baseline file, keeping the cases that were not run.
+"""
+import argparse
+from contextlib import redirect_stdout
+from functools import cached_property
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import warnings
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import cleaning_stages
+from benchmarks.synthetic import write_raw_csv
+from lib.analysis.correlation import correlation
+from lib.analysis.outliers import (
+    calculate_zscore_outliers,
+    detect_outliers,
+    streaming_outlier_summary,
+)
+from lib.analysis.plots import create_correlation_heatmap, visualize_outliers
+from lib.analysis.reports import (
+    CategoricalSummary,
+    categorical_summary_stats,
+    report_missing_data,
+)
+from lib.io.load import load_data, read_columnar, read_raw_csv
+from lib.io.save import save_data
+from lib.io.schema import IDENTIFIER_COLUMNS, RAW_SCHEMA
+from lib.preprocessing.cleaning import (
+    clean_categorical,
+    drop_columns,
+    handle_missing_data,
+    transform_data_types,
+    transform_special_columns,
+)
+from lib.preprocessing.compaction import compact_data
+from lib.preprocessing.encoding import FeatureEncoder, default_encoders, multi_hot
+from lib.preprocessing.pipeline import Pipeline, cleaning_steps
+from lib.preprocessing.statistics import CleaningStatistics
+from lib.preprocessing.temporal import add_customer_features
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+# Largest scale for cases that hold the whole dataset in memory
+IN_MEMORY_ROWS = 10_000_000
+
+SCALES = {'k': 1_000, 'M': 1_000_000}
+
+
+def parse_rows(text):
+    # "100k", "1M", "50M" or a plain number
+    if text[-1] in SCALES:
+        return int(float(text[:-1]) * SCALES[text[-1]])
+    return int(text)
+
+
+def format_rows(n_rows):
+    for suffix, size in sorted(SCALES.items(), key=lambda item: -item[1]):
+        if n_rows >= size and n_rows % size == 0:
+            return f"{n_rows // size}{suffix}"
+    return str(n_rows)
+
+
+class Dataset:
+    """
+    The inputs of the cases at one scale, built on first use: the raw CSV, the typed
+    raw frame, the input of each cleaning stage, the cleaned frame and its columnar
+    copies. Files are kept in data_dir and reused by later runs.
+    """
+
+    def __init__(self, n_rows, seed, data_dir):
+        self.n_rows = n_rows
+        self.seed = seed
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.data_dir, f"{format_rows(self.n_rows)}-seed{self.seed}-{name}")
+
+    @cached_property
+    def csv_path(self):
+        path = self.path('train.csv')
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            write_raw_csv(tmp_path, self.n_rows, seed=self.seed)
+            os.replace(tmp_path, path)
+        return path
+
+    @cached_property
+    def raw(self):
+        # All columns, identifiers included, as drop_columns sees them
+        return read_raw_csv(self.csv_path, columns=list(RAW_SCHEMA))
+
+    @cached_property
+    def stats(self):
+        return CleaningStatistics().fit(self.raw)
+
+    @cached_property
+    def stage_inputs(self):
+        # The input of every cleaning stage, from running the stages in order once
+        inputs = {}
+        df = self.raw
+        with redirect_stdout(io.StringIO()):
+            for name, func, kwargs in cleaning_stages(self.stats):
+                inputs[name] = df
+                df = func(df.copy(), **kwargs)
+        inputs['cleaned'] = df
+        return inputs
+
+    @property
+    def cleaned(self):
+        return self.stage_inputs['cleaned']
+
+    def saved(self, extension):
+        # The cleaned data in a columnar format
+        path = self.path(f"cleaned{extension}")
+        if not os.path.exists(path):
+            save_data(self.cleaned, path)
+        return path
+
+
+class Case:
+    def __init__(self, name, group, setup, run, max_rows=IN_MEMORY_ROWS):
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.run = run
+        self.max_rows = max_rows
+
+
+CASES = []
+
+
+def case(group, max_rows=IN_MEMORY_ROWS, setup=None):
+    """
+    Registers a benchmark. The decorated function takes the Dataset and the output of
+    setup(dataset), which is called before every repeat and not timed.
+    """
+    def register(run):
+        CASES.append(Case(run.__name__, group, setup or (lambda data: None), run, max_rows))
+        return run
+    return register
+
+
+def _copy_of(stage):
+    return lambda data: data.stage_inputs[stage].copy()
+
+
+def _quiet(func, *args, **kwargs):
+    # Report and plot functions print and draw; neither is part of what is measured
+    with redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        result = func(*args, **kwargs)
+    plt.close('all')
+    return result
+
+
+# Cleaning stages, each on the output of the previous one
+
+@case('cleaning', setup=_copy_of('drop_columns'))
+def drop_columns_stage(data, df):
+    _quiet(drop_columns, df, IDENTIFIER_COLUMNS)
+
+
+@case('cleaning', setup=_copy_of('transform_data_types'))
+def transform_data_types_stage(data, df):
+    transform_data_types(df, stats=data.stats)
+
+
+@case('cleaning', setup=_copy_of('clean_categorical'))
+def clean_categorical_stage(data, df):
+    clean_categorical(df)
+
+
+@case('cleaning', setup=_copy_of('transform_special_columns'))
+def transform_special_columns_stage(data, df):
+    transform_special_columns(df)
+
+
+@case('cleaning', setup=_copy_of('handle_missing_data'))
+def handle_missing_data_stage(data, df):
+    handle_missing_data(df, stats=data.stats)
+
+
+@case('cleaning')
+def pipeline_transform(data, _):
+    Pipeline(drop=IDENTIFIER_COLUMNS, stats=data.stats).transform(data.raw)
+
+
+@case('cleaning')
+def fit_statistics(data, _):
+    CleaningStatistics().fit(data.raw[CleaningStatistics.columns])
+
+
+@case('cleaning')
+def compact_data_stage(data, _):
+    compact_data(data.cleaned)
+
+
+@case('cleaning', setup=lambda data: FeatureEncoder(default_encoders()).fit(data.cleaned))
+def encode_features(data, encoder):
+    encoder.transform(data.cleaned)
+
+
+@case('cleaning')
+def multi_hot_loan_types(data, _):
+    multi_hot(data.cleaned['Type_of_Loan'])
+
+
+def _cleaned_with_customer(data):
+    keep = [col for col in IDENTIFIER_COLUMNS if col != 'Customer_ID']
+    return Pipeline(drop=keep, stats=data.stats).transform(data.raw)
+
+
+@case('cleaning', setup=_cleaned_with_customer)
+def customer_features(data, df):
+    add_customer_features(df.copy())
+
+
+@case('cleaning', setup=lambda data: Pipeline(steps=cleaning_steps('customer'),
+                                              drop=IDENTIFIER_COLUMNS, stats=data.stats))
+def impute_by_customer(data, pipeline):
+    pipeline.transform(data.raw)
+
+
+@case('cleaning', setup=lambda data: Pipeline(drop=IDENTIFIER_COLUMNS, stats=data.stats))
+def transform_100_records(data, pipeline):
+    # Scoring a batch of records; the cost does not depend on the scale
+    records = pd.read_csv(data.csv_path, nrows=100, dtype=str).to_dict('records')
+    pipeline.transform_records(records)
+
+
+# Loading and saving
+
+@case('loading', max_rows=None)
+def read_raw_csv_chunked(data, _):
+    for _ in read_raw_csv(data.csv_path, chunksize=1_000_000):
+        pass
+
+
+@case('loading', max_rows=None)
+def clean_chunked(data, _):
+    pipeline = Pipeline(drop=IDENTIFIER_COLUMNS, stats=data.stats)
+    for chunk in read_raw_csv(data.csv_path, columns=pipeline.input_columns(RAW_SCHEMA),
+                              chunksize=1_000_000):
+        pipeline.transform(chunk)
+
+
+@case('loading', max_rows=None)
+def fit_statistics_chunked(data, _):
+    CleaningStatistics().fit(read_raw_csv(data.csv_path, columns=CleaningStatistics.columns,
+                                          chunksize=1_000_000))
+
+
+@case('loading')
+def read_raw_csv_schema(data, _):
+    read_raw_csv(data.csv_path)
+
+
+@case('loading')
+def read_raw_csv_pyarrow(data, _):
+    read_raw_csv(data.csv_path, engine='pyarrow')
+
+
+@case('loading')
+def load_data_untyped(data, _):
+    _quiet(load_data, data.csv_path)
+
+
+@case('loading')
+def read_parquet(data, _):
+    read_columnar(data.saved('.parquet'))
+
+
+@case('loading')
+def read_feather(data, _):
+    read_columnar(data.saved('.feather'))
+
+
+@case('loading')
+def read_arrow_mapped(data, _):
+    read_columnar(data.saved('.arrow'))
+
+
+def _save_case(extension):
+    def run(data, _):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_data(data.cleaned, os.path.join(tmp_dir, f"cleaned{extension}"))
+    run.__name__ = f"save_{extension[1:]}"
+    return case('loading')(run)
+
+
+for _extension in ['.csv', '.parquet', '.feather', '.arrow']:
+    _save_case(_extension)
+
+
+# Outliers, reports and plots on the cleaned data
+
+@case('outliers')
+def zscore_outliers(data, _):
+    for col in data.cleaned.select_dtypes('number').columns:
+        calculate_zscore_outliers(data.cleaned[col])
+
+
+@case('outliers')
+def detect_outliers_batched(data, _):
+    detect_outliers(data.cleaned)
+
+
+@case('outliers')
+def detect_outliers_float32(data, _):
+    detect_outliers(data.cleaned, dtype=np.float32)
+
+
+@case('outliers', max_rows=None)
+def streaming_outliers(data, _):
+    # Two passes over the raw CSV in chunks, reading only the numeric raw columns
+    columns = [col for col, dtype in RAW_SCHEMA.items() if dtype in ('int64', 'float64')]
+    streaming_outlier_summary(lambda: read_raw_csv(data.csv_path, columns=columns,
+                                                   chunksize=1_000_000))
+
+
+@case('reports')
+def categorical_summary(data, _):
+    categorical_summary_stats(data.cleaned, cache=False)
+
+
+@case('reports', max_rows=None)
+def categorical_summary_chunked(data, _):
+    CategoricalSummary().fit(read_raw_csv(data.csv_path, chunksize=1_000_000)).summary()
+
+
+@case('reports')
+def missing_data_report(data, _):
+    # Computes the report and renders it, from row bins, into a PNG buffer
+    _quiet(report_missing_data, data.stage_inputs['drop_columns'], output=io.BytesIO(),
+           file_format='png')
+
+
+@case('plots')
+def correlation_heatmap(data, _):
+    _quiet(create_correlation_heatmap, data.cleaned, cache=False)
+
+
+@case('plots')
+def correlation_spearman(data, _):
+    correlation(data.cleaned, method='spearman', cache=False)
+
+
+@case('plots')
+def outlier_boxplots(data, _):
+    _quiet(visualize_outliers, data.cleaned)
+
+
+def run_case(bench, data, repeats):
+    times = []
+    for _ in range(repeats):
+        state = bench.setup(data)
+        start = time.perf_counter()
+        bench.run(data, state)
+        times.append(time.perf_counter() - start)
+    return {'min_s': min(times), 'median_s': statistics.median(times), 'repeats': repeats}
+
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints the change of every case against the baseline.
+
+    Returns:
+    tuple: The keys of the cases that got slower by more than tolerance (a fraction),
+           and the keys of the cases that have no baseline.
+    """
+    regressions = []
+    missing = []
+    print(f"\n{'case':<48} {'baseline (s)':>13} {'now (s)':>9} {'change':>8}")
+    for key, result in results.items():
+        if key not in baseline['results']:
+            missing.append(key)
+            print(f"{key:<48} {'-':>13} {result['min_s']:>9.4f} {'':>8} NO BASELINE")
+            continue
+        before = baseline['results'][key]['min_s']
+        change = result['min_s'] / before - 1
+        flag = ''
+        if change > tolerance:
+            flag = ' REGRESSION'
+            regressions.append(key)
+        elif change < -tolerance:
+            flag = ' faster'
+        print(f"{key:<48} {before:>13.4f} {result['min_s']:>9.4f} {change:>+8.0%}{flag}")
+    return regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", nargs="+", default=["100k"],
+                        help="Scales, e.g. 100k 1M 10M 50M.")
+    parser.add_argument("--cases", nargs="+", default=None,
+                        help="Groups or case names to run (default: all).")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "credit-score-benchmarks"),
+                        help="Where the generated data is kept between runs.")
+    parser.add_argument("--save", metavar="NAME", help="Save the results as baselines/NAME.json.")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with baselines/NAME.json.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Slowdown reported as a regression by --compare (default 0.2 = 20%%).")
+    args = parser.parse_args()
+
+    selected = [bench for bench in CASES
+                if args.cases is None or bench.group in args.cases or bench.name in args.cases]
+    results = {}
+    print(f"{'case':<48} {'best (s)':>9} {'median (s)':>11}")
+    for n_rows in map(parse_rows, args.rows):
+        data = Dataset(n_rows, args.seed, args.data_dir)
+        for bench in selected:
+            if bench.max_rows is not None and n_rows > bench.max_rows:
+                continue
+            key = f"{bench.group}/{bench.name}@{format_rows(n_rows)}"
+            results[key] = run_case(bench, data, args.repeats)
+            print(f"{key:<48} {results[key]['min_s']:>9.4f} {results[key]['median_s']:>11.4f}")
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as f:
+            baseline = json.load(f)
+        regressions, missing = compare(results, baseline, args.tolerance)
+        if missing:
+            print(f"\n{len(missing)} case(s) without a baseline, record them with "
+                  f"--cases ... --save {args.compare} ❌")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.tolerance:.0%} ❌")
+        if missing or regressions:
+            raise SystemExit(1)
+        print("\nNo regressions ✅")
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        saved = {}
+        if os.path.exists(path):
+            # Cases that were not run keep their stored baseline
+            with open(path) as f:
+                saved = json.load(f)['results']
+        saved.update(results)
+        with open(path, 'w') as f:
+            json.dump({'machine': machine_info(), 'seed': args.seed, 'results': saved}, f, indent=4)
+        print(f"Baseline saved to {path} ✅")
+
+
+if __name__ == "__main__":
+    main()
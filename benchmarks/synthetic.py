@@ -0,0 +1,223 @@
+"""
+Seeded generator of raw data in the layout of the Kaggle credit score dataset.
+
+The real files are not shipped with the repository (see data/raw/DATA_SOURCE.md),
+so the benchmarks build frames with the same columns and the same kinds of dirty
+values the cleaning stages deal with: "_______" occupations, "!@9#%8" payment
+behaviours, "22 Years and 1 Months" history ages, "NM" minimum payments, "_" credit
+mixes, numbers with a trailing "_", negative and impossible ages, and missing values.
+
+Large files are written in chunks, so any number of rows fits in memory:
+    python -m benchmarks.synthetic --rows 1000000 --out data/raw
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# train.csv has eight monthly records per customer, test.csv the next four
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August']
+TEST_MONTHS = ['September', 'October', 'November', 'December']
+
+OCCUPATIONS = ['Scientist', 'Teacher', 'Engineer', 'Entrepreneur', 'Developer', 'Lawyer',
+               'Media_Manager', 'Doctor', 'Journalist', 'Manager', 'Accountant',
+               'Musician', 'Mechanic', 'Writer', 'Architect', '_______']
+
+LOAN_TYPES = ['Auto Loan', 'Credit-Builder Loan', 'Personal Loan', 'Home Equity Loan',
+              'Mortgage Loan', 'Student Loan', 'Debt Consolidation Loan', 'Payday Loan',
+              'Not Specified']
+
+PAYMENT_BEHAVIOURS = ['Low_spent_Small_value_payments', 'Low_spent_Medium_value_payments',
+                      'Low_spent_Large_value_payments', 'High_spent_Small_value_payments',
+                      'High_spent_Medium_value_payments', 'High_spent_Large_value_payments',
+                      '!@9#%8']
+
+
+def _as_text(values):
+    # Numbers as text; pyarrow's cast is several times faster than astype(str)
+    return pd.Series(pa.array(np.asarray(values)).cast(pa.string()).to_numpy(zero_copy_only=False))
+
+
+def _with_underscores(values, rng, rate=0.05):
+    # Numbers written as text, some with the trailing '_' seen in the raw data
+    text = _as_text(values)
+    return text.where(rng.random(len(text)) >= rate, text + '_').astype(object)
+
+
+def _hex(values):
+    # Lower-case hexadecimal digits, like format(value, 'x')
+    values = np.asarray(values, dtype=np.int64)
+    n_digits = max(1, int(values.max()).bit_length() + 3 >> 2) if len(values) else 1
+    digits = np.array(list('0123456789abcdef'), dtype=object)
+    text = pd.Series('', index=range(len(values)), dtype=object)
+    for shift in range(4 * (n_digits - 1), -1, -4):
+        nibble = (values >> shift) & 0xf
+        # No leading zeros
+        text = text + np.where((values >> shift) > 0, digits[nibble], '').astype(object)
+    return text.where(values > 0, '0')
+
+
+def _with_missing(values, rng, rate):
+    values = pd.Series(values)
+    return values.where(rng.random(len(values)) >= rate)
+
+
+def _loan_combinations(rng, n=3000):
+    # Comma-separated lists in the Kaggle format: "A, B, and C"
+    combos = []
+    for _ in range(n):
+        k = rng.integers(1, 6)
+        loans = list(rng.choice(LOAN_TYPES, k))
+        combos.append(', '.join(loans[:-1]) + (', and ' if k > 1 else '') + loans[-1])
+    return np.array(combos, dtype=object)
+
+
+def make_raw_frame(n_rows, seed=0, with_target=True, start=0):
+    """
+    Generates a raw frame with the 28 columns of train.csv (27 without the target).
+
+    Rows come in panels of monthly records per customer, like the real data: eight
+    (January to August) with the target, four (September to December) without.
+
+    Parameters:
+    n_rows (int): Number of rows.
+    seed (int): Seed for the random generator, the same seed gives the same frame.
+    with_target (bool): If False, leave out Credit_Score and use the test months,
+                        like test.csv.
+    start (int): Number of the first row, so that chunks of a large file get
+                 consecutive IDs and customers (see write_raw_csv).
+
+    Returns:
+    pd.DataFrame: The generated raw data, with object columns as read by pd.read_csv.
+    """
+    # Each chunk draws from its own stream; the loan lists only depend on the seed,
+    # so all chunks share the same set of Type_of_Loan values
+    rng = np.random.default_rng([seed, start])
+    loan_combinations = _loan_combinations(np.random.default_rng(seed))
+    months = MONTHS if with_target else TEST_MONTHS
+    row = np.arange(start, start + n_rows)
+    customer = row // len(months)
+
+    ages = rng.integers(14, 57, n_rows).astype(object)
+    bad_age = rng.random(n_rows)
+    ages[bad_age < 0.01] = -500
+    ages[(bad_age >= 0.01) & (bad_age < 0.03)] = rng.integers(101, 8700, n_rows)[(bad_age >= 0.01) & (bad_age < 0.03)]
+
+    history_years = _as_text(rng.integers(0, 34, n_rows))
+    history_months = _as_text(rng.integers(0, 12, n_rows))
+    history = history_years + ' Years and ' + history_months + ' Months'
+
+    changed_limit = _as_text(np.round(rng.uniform(-6, 37, n_rows), 2))
+    changed_limit[rng.random(n_rows) < 0.02] = '_'
+
+    invested = _as_text(rng.uniform(0, 1000, n_rows))
+    invested[rng.random(n_rows) < 0.04] = '__10000__'
+
+    balance = _as_text(rng.uniform(0, 1600, n_rows))
+    balance[rng.random(n_rows) < 0.01] = '__-333333333333333333333333333__'
+
+    df = pd.DataFrame({
+        'ID': '0x' + _hex(row + 0x1602),
+        'Customer_ID': 'CUS_0x' + _hex(customer + 0xd40),
+        'Month': np.array(months, dtype=object)[row % len(months)],
+        'Name': 'Name ' + _as_text(customer),
+        'Age': _with_underscores(ages, rng),
+        'SSN': _as_text(rng.integers(100_00_0000, 999_99_9999, n_rows)).where(
+            rng.random(n_rows) >= 0.05, '#F%$D@*&8'),
+        'Occupation': rng.choice(OCCUPATIONS, n_rows).astype(object),
+        'Annual_Income': _with_underscores(np.round(rng.uniform(7000, 180000, n_rows), 2), rng),
+        'Monthly_Inhand_Salary': _with_missing(rng.uniform(300, 15000, n_rows), rng, 0.15),
+        'Num_Bank_Accounts': rng.integers(-1, 12, n_rows),
+        'Num_Credit_Card': rng.integers(0, 12, n_rows),
+        'Interest_Rate': rng.integers(1, 35, n_rows),
+        'Num_of_Loan': _with_underscores(rng.integers(0, 10, n_rows), rng),
+        'Type_of_Loan': _with_missing(rng.choice(loan_combinations, n_rows), rng, 0.11),
+        'Delay_from_due_date': rng.integers(-5, 68, n_rows),
+        'Num_of_Delayed_Payment': _with_missing(_with_underscores(rng.integers(0, 29, n_rows), rng), rng, 0.07),
+        'Changed_Credit_Limit': changed_limit.astype(object),
+        'Num_Credit_Inquiries': _with_missing(rng.integers(0, 18, n_rows).astype(float), rng, 0.02),
+        'Credit_Mix': rng.choice(['Good', 'Standard', 'Bad', '_'], n_rows).astype(object),
+        'Outstanding_Debt': _with_underscores(np.round(rng.uniform(0, 5000, n_rows), 2), rng, 0.01),
+        'Credit_Utilization_Ratio': rng.uniform(20, 50, n_rows),
+        'Credit_History_Age': _with_missing(history, rng, 0.09).astype(object),
+        'Payment_of_Min_Amount': rng.choice(['Yes', 'No', 'NM'], n_rows).astype(object),
+        'Total_EMI_per_month': rng.uniform(0, 360, n_rows),
+        'Amount_invested_monthly': _with_missing(invested, rng, 0.045).astype(object),
+        'Payment_Behaviour': rng.choice(PAYMENT_BEHAVIOURS, n_rows).astype(object),
+        'Monthly_Balance': _with_missing(balance, rng, 0.01).astype(object),
+    })
+    if with_target:
+        df['Credit_Score'] = rng.choice(['Good', 'Standard', 'Poor'], n_rows).astype(object)
+    return df
+
+
+def make_raw_columns(columns, n_rows, seed=0, with_target=True, chunk_rows=1_000_000):
+    """
+    Generates only some columns of make_raw_frame, in chunks of chunk_rows rows, so
+    that benchmarks of single columns can run at scales where the whole frame would
+    not fit in memory. The values are those of make_raw_frame's frame in the same
+    chunks, as written by write_raw_csv.
+
+    Parameters:
+    columns (list): Names of the columns to keep.
+    n_rows (int): Number of rows.
+    seed (int): Seed for the random generator.
+    with_target (bool): As in make_raw_frame.
+    chunk_rows (int): Rows generated at a time.
+
+    Returns:
+    pd.DataFrame: The columns, with a RangeIndex.
+    """
+    chunks = [make_raw_frame(min(chunk_rows, n_rows - start), seed=seed,
+                             with_target=with_target, start=start)[columns]
+              for start in range(0, n_rows, chunk_rows)]
+    if not chunks:
+        return make_raw_frame(0, seed=seed, with_target=with_target)[columns]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_raw_csv(path, n_rows, seed=0, with_target=True, chunk_rows=1_000_000):
+    """
+    Writes a synthetic raw CSV of any size in chunks of chunk_rows rows, so memory
+    stays bounded. The same arguments always give the same file.
+
+    Parameters:
+    path (str): Output CSV path.
+    n_rows (int): Number of rows.
+    seed (int): Seed for the random generator.
+    with_target (bool): If False, write a test.csv-like file without Credit_Score.
+    chunk_rows (int): Rows generated and written at a time.
+
+    Returns:
+    str: path
+    """
+    for start in range(0, n_rows, chunk_rows):
+        chunk = make_raw_frame(min(chunk_rows, n_rows - start), seed=seed,
+                               with_target=with_target, start=start)
+        chunk.to_csv(path, index=False, mode='w' if start == 0 else 'a', header=start == 0)
+    if n_rows == 0:
+        make_raw_frame(0, seed=seed, with_target=with_target).to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic train.csv and test.csv files.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows of train.csv.")
+    parser.add_argument("--test-rows", type=int, default=None,
+                        help="Rows of test.csv (default: half of --rows).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="data/raw", help="Output directory.")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    test_rows = args.rows // 2 if args.test_rows is None else args.test_rows
+    for name, n_rows, with_target in [("train.csv", args.rows, True), ("test.csv", test_rows, False)]:
+        path = write_raw_csv(os.path.join(args.out, name), n_rows, seed=args.seed,
+                             with_target=with_target)
+        print(f"Wrote {n_rows} rows to {path} ✅")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import kendalltau, norm
+
+from lib.analysis.memo import column_token, frame_memo
+
+METHODS = ('pearson', 'spearman', 'kendall')
+
+# Variance factor of Fisher's z of each coefficient, over n - 3 (Pearson) or n - 3
+# and n - 4 (Fieller, Hartley and Pearson) for the rank coefficients
+_FISHER_VARIANCE = {'pearson': (1.0, 3), 'spearman': (1.06, 3), 'kendall': (0.437, 4)}
+
+
+def _numeric_columns(df, columns=None):
+    # Like select_dtypes(include=[np.number]), without copying the data
+    columns = df.columns if columns is None else columns
+    return [col for col in columns
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+
+
+def _as_columns(df, columns, rows=None):
+    # The columns (or some of their rows) as rows of one (n_columns, n_rows) float64
+    # array, missing values as NaN
+    values = np.empty((len(columns), len(df) if rows is None else len(rows)))
+    for i, col in enumerate(columns):
+        column = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        values[i] = column if rows is None else column[rows]
+    return values
+
+
+def rank_rows(values, order=None):
+    """
+    Ranks each row of a 2-D array, averaging ties (as Series.rank()), with one
+    argsort for all rows. NaN stays NaN and is not ranked.
+
+    Parameters:
+    values (np.ndarray): Values as (n_columns, n_rows).
+    order (np.ndarray, optional): np.argsort(values, axis=1), if it is already
+                                  computed.
+
+    Returns:
+    np.ndarray: The ranks, as float64, in the shape of values.
+    """
+    n_rows = values.shape[1]
+    # Ties are averaged, so the sort need not be stable
+    order = np.argsort(values, axis=1) if order is None else order
+    sorted_values = np.take_along_axis(values, order, axis=1)
+    # Each sorted value's run of equal values spans the positions [first, last]
+    positions = np.broadcast_to(np.arange(n_rows, dtype=np.float64), values.shape)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[:, 1:] = sorted_values[:, 1:] != sorted_values[:, :-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    first = np.maximum.accumulate(np.where(starts, positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, positions, n_rows)[:, ::-1], axis=1)[:, ::-1]
+    sorted_ranks = (first + last) / 2 + 1
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=1)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def _pearson(values, dtype):
+    """
+    Pearson correlations of the rows of values, over the rows' pairwise complete
+    observations (as DataFrame.corr), computed with matrix products.
+
+    Every column is standardized first, so the products run on values of order 1,
+    which float32 holds accurately; correlations do not change under shifting and
+    scaling, even over the subset of rows two columns have in common.
+    """
+    present = ~np.isnan(values)
+    counts = present.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.nansum(values, axis=1, keepdims=True) / counts[:, None]
+        stds = np.sqrt(np.nansum((values - means) ** 2, axis=1, keepdims=True) / counts[:, None])
+        z = ((values - means) / np.where(stds > 0, stds, 1)).astype(dtype)
+    z[~present] = 0
+
+    if present.all():
+        # No missing values: one product of the standardized data with itself
+        n = np.full((len(values), len(values)), values.shape[1], dtype=np.float64)
+        cross = (z @ z.T).astype(np.float64)
+        sums = np.zeros((len(values), len(values)))
+        squares = np.repeat((z.astype(np.float64) ** 2).sum(axis=1)[:, None], len(values), axis=1)
+    else:
+        # Sums over the rows both columns have: products with the presence masks
+        mask = present.astype(dtype)
+        n = (mask @ mask.T).astype(np.float64)
+        cross = (z @ z.T).astype(np.float64)
+        sums = (z @ mask.T).astype(np.float64)
+        squares = ((z * z) @ mask.T).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = n * cross - sums * sums.T
+        variances = n * squares - sums ** 2
+        corr = covariance / np.sqrt(variances * variances.T)
+    corr = np.clip(corr, -1, 1)
+    # Constant columns and pairs with fewer than 2 rows in common have no correlation
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+    constant = ~(stds[:, 0] > 0) | (counts < 2)
+    corr[constant, :] = np.nan
+    corr[:, constant] = np.nan
+    np.fill_diagonal(corr, np.where(constant, np.nan, 1.0))
+    return corr, n
+
+
+def _subset_ranks(values, order, keep):
+    # Ranks of values[keep], averaging ties, from the sort order of all the values:
+    # filtering the sorted sequence is O(n), where sorting again is O(n log n)
+    kept = order[keep[order]]
+    sorted_values = values[kept]
+    run_starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    run_sizes = np.diff(np.r_[run_starts, len(kept)])
+    ranks = np.empty(len(values))
+    ranks[kept] = np.repeat(run_starts + (run_sizes + 1) / 2, run_sizes)
+    return ranks[keep]
+
+
+def _spearman(values, dtype):
+    """
+    Spearman correlations of the rows of values: Pearson on ranks computed once
+    per row. A pair of rows with missing values in different places is re-ranked
+    over the observations it has in common, as DataFrame.corr does, so the result
+    is the same; the rows without missing values never need it.
+    """
+    order = np.argsort(values, axis=1)
+    corr, n = _pearson(rank_rows(values, order), dtype)
+    present = ~np.isnan(values)
+    partial = set(np.flatnonzero(~present.all(axis=1)).tolist())
+    for i in sorted(partial):
+        for j in range(len(values)):
+            if j == i or (j in partial and j < i):
+                continue
+            both = present[i] & present[j]
+            if both.sum() < 2 or (np.array_equal(both, present[i]) and np.array_equal(both, present[j])):
+                continue
+            ranks = np.vstack([_subset_ranks(values[i], order[i], both),
+                               _subset_ranks(values[j], order[j], both)])
+            pair, _ = _pearson(ranks, np.float64)
+            corr[i, j] = corr[j, i] = pair[0, 1]
+    return corr, n
+
+
+def _kendall(values):
+    """
+    Kendall's tau-b of every pair of rows, over their complete observations, with
+    scipy's O(n log n) algorithm (Knight's), instead of the pairwise O(n^2) count.
+    """
+    k = len(values)
+    corr = np.full((k, k), np.nan)
+    present = ~np.isnan(values)
+    n = (present.astype(np.float64) @ present.T.astype(np.float64))
+    for i in range(k):
+        # Like DataFrame.corr, a column correlates 1 with itself, even if constant
+        corr[i, i] = 1.0
+        for j in range(i + 1, k):
+            both = present[i] & present[j]
+            if both.sum() < 2:
+                continue
+            corr[i, j] = corr[j, i] = kendalltau(values[i, both], values[j, both]).statistic
+    return corr, n
+
+
+def _fisher_bounds(corr, n, method, confidence):
+    # Confidence interval of each coefficient from Fisher's z transform
+    factor, offset = _FISHER_VARIANCE[method]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se = np.sqrt(factor / (n - offset))
+        z = np.arctanh(np.clip(corr, -1 + 1e-12, 1 - 1e-12))
+        margin = norm.ppf(0.5 + confidence / 2) * se
+        lower, upper = np.tanh(z - margin), np.tanh(z + margin)
+    invalid = ~np.isfinite(se) | np.isnan(corr)
+    lower[invalid] = np.nan
+    upper[invalid] = np.nan
+    # A perfect correlation has nowhere to go
+    perfect = np.abs(corr) == 1
+    lower[perfect] = corr[perfect]
+    upper[perfect] = corr[perfect]
+    return lower, upper
+
+
+class CorrelationResult:
+    """
+    A correlation matrix with its sample sizes and confidence bounds.
+
+    Attributes:
+    matrix (pd.DataFrame): The correlations.
+    n_obs (pd.DataFrame): Number of rows each pair was computed on.
+    lower (pd.DataFrame): Lower confidence bound of each correlation.
+    upper (pd.DataFrame): Upper confidence bound of each correlation.
+    method (str): 'pearson', 'spearman' or 'kendall'.
+    sampled (bool): True if the correlations were computed on a row sample.
+    confidence (float): Confidence level of the bounds.
+    """
+
+    def __init__(self, matrix, n_obs, lower, upper, method, sampled, confidence):
+        self.matrix = matrix
+        self.n_obs = n_obs
+        self.lower = lower
+        self.upper = upper
+        self.method = method
+        self.sampled = sampled
+        self.confidence = confidence
+
+    def __repr__(self):
+        return (f"CorrelationResult({self.method}, {len(self.matrix)} columns, "
+                f"sampled={self.sampled})")
+
+
+def correlation(df, method='pearson', columns=None, sample=None, seed=0, confidence=0.95,
+                dtype=np.float32, cache=False):
+    """
+    Computes the correlation matrix of the numeric columns of a DataFrame.
+
+    - pearson: every column is standardized once, and the matrix is one matrix
+      product of the standardized data with itself (BLAS), in float32 by default;
+      with missing values, three more products over the presence masks give the
+      sums over each pair's complete rows, as DataFrame.corr uses.
+    - spearman: every column is ranked once (all with one argsort), then Pearson
+      on the ranks. Only pairs of columns with missing values in different rows
+      are re-ranked over the rows they have in common.
+    - kendall: tau-b of each pair with scipy's O(n log n) algorithm.
+
+    Parameters:
+    df (pd.DataFrame): The data.
+    method (str): 'pearson', 'spearman' or 'kendall'.
+    columns (list, optional): Columns to correlate. Defaults to the numeric columns.
+    sample (int, optional): If given and df has more rows, correlate a random
+                            sample of this many rows instead; the bounds tell how
+                            far the sampled correlations may be from the full ones.
+    seed (int): Seed of the row sample.
+    confidence (float): Confidence level of the bounds (Fisher z intervals).
+    dtype: np.float32, or np.float64 for the products at full precision (float32
+           results agree with pandas to about 1e-6).
+    cache (bool): If True, the result is kept for as long as df is alive and reused
+                  for the same arguments until a column is replaced. Edits made in
+                  place (df.loc[...] = ..., fillna(inplace=True)) are not seen, so
+                  only pass it for frames that are no longer modified.
+
+    Returns:
+    CorrelationResult: The matrix, the rows per pair and the confidence bounds.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method '{method}', expected one of {list(METHODS)}.")
+    columns = _numeric_columns(df, columns)
+
+    if cache:
+        memo = frame_memo(df, 'correlation')
+        key = (method, tuple(columns), sample, seed, confidence, np.dtype(dtype).str)
+        tokens = [column_token(df[col]) for col in columns]
+        cached = memo.get(key)
+        if cached is not None and cached[0] == tokens:
+            return cached[1]
+
+    sampled = sample is not None and len(df) > sample
+    rows = None
+    if sampled:
+        rows = np.sort(np.random.default_rng(seed).choice(len(df), sample, replace=False))
+    values = _as_columns(df, columns, rows)
+
+    if method == 'kendall':
+        corr, n = _kendall(values)
+    elif method == 'spearman':
+        corr, n = _spearman(values, dtype)
+    else:
+        corr, n = _pearson(values, dtype)
+    lower, upper = _fisher_bounds(corr, n, method, confidence)
+
+    def frame(matrix):
+        return pd.DataFrame(matrix, index=pd.Index(columns), columns=pd.Index(columns))
+
+    result = CorrelationResult(frame(corr), frame(n.astype(np.int64)), frame(lower), frame(upper),
+                               method, sampled, confidence)
+    if cache:
+        memo[key] = (tokens, result)
+    return result
+
+
+def top_correlations(matrix, n=10):
+    """
+    Returns the n strongest correlations between different columns, each pair once.
+
+    Parameters:
+    matrix (pd.DataFrame): A correlation matrix.
+    n (int): Number of pairs.
+
+    Returns:
+    pd.Series: The correlations, indexed by (column, column) pairs, strongest
+               (by absolute value) first.
+    """
+    values = matrix.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    pairs = values[rows, cols]
+    strength = np.nan_to_num(np.abs(pairs), nan=-1)
+    # Partial selection of the n largest, then a sort of those only
+    top = np.argpartition(-strength, min(n, len(pairs)) - 1)[:n] if len(pairs) > n else np.arange(len(pairs))
+    top = top[np.argsort(-strength[top], kind='stable')]
+    top = top[~np.isnan(pairs[top])]
+    index = pd.MultiIndex.from_arrays([matrix.index[rows[top]], matrix.columns[cols[top]]])
+    return pd.Series(pairs[top], index=index)
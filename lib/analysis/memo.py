@@ -0,0 +1,69 @@
+import weakref
+
+import numpy as np
+
+# Name of the attribute of a DataFrame that holds its memo, see frame_memo
+MEMO_ATTRIBUTE = '_analysis_memo'
+
+
+class ColumnToken:
+    """
+    Identifies the data a column holds, to tell whether a result computed from the
+    column is still valid: tokens of the same column compare equal until the column
+    is replaced (df[col] = ...). Edits made in place are not seen.
+
+    The token refers to the column's array weakly, so it does not keep the data
+    alive, and a new array allocated at the same address after the old one was freed
+    cannot be mistaken for it.
+    """
+
+    def __init__(self, series):
+        self.dtype = str(series.dtype)
+        self.length = len(series)
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy(copy=False)
+            self.layout = (values.__array_interface__['data'][0], values.strides)
+            # A column of a DataFrame is a view of its block; the block is what is
+            # replaced when the column is
+            while isinstance(values.base, np.ndarray):
+                values = values.base
+        else:
+            values = series.array
+            self.layout = None
+        self._ref = weakref.ref(values)
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnToken):
+            return NotImplemented
+        target = self._ref()
+        return (target is not None and target is other._ref() and self.dtype == other.dtype
+                and self.length == other.length and self.layout == other.layout)
+
+    __hash__ = None
+
+
+def column_token(series):
+    """Returns the ColumnToken of a column."""
+    return ColumnToken(series)
+
+
+def frame_memo(df, name):
+    """
+    Returns a dict for memoizing results computed from a DataFrame, stored on the
+    frame object itself: it lives and dies with df, is not shared with copies of it,
+    and is not pickled. Results should be stored with the column_token of the
+    columns they were computed from, and checked against them before reuse.
+
+    Parameters:
+    df (pd.DataFrame): The frame.
+    name (str): Name of the memo, one per kind of result (e.g. 'correlation').
+
+    Returns:
+    dict: The memo, empty the first time.
+    """
+    memos = df.__dict__.get(MEMO_ATTRIBUTE)
+    if memos is None:
+        # Set directly, since pandas would treat a new attribute as a column
+        memos = {}
+        object.__setattr__(df, MEMO_ATTRIBUTE, memos)
+    return memos.setdefault(name, {})
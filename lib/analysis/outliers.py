@@ -1,9 +1,305 @@
-from scipy.stats import zscore
 import numpy as np
+import pandas as pd
+
+from lib.preprocessing.statistics import QuantileSketch
+
+# The outlier rules, in the order of the summary table columns
+METHODS = ('zscore', 'iqr', 'mad')
+
+# Scale of the MAD to the standard deviation of normal data, so the MAD rule with
+# threshold 3.5 is the modified Z-score rule of Iglewicz and Hoaglin
+MAD_SCALE = 1.4826
+
+# Rows per batch when the masks are computed; a multiple of 8, so every batch packs
+# into whole bytes
+BATCH_ROWS = 1 << 16
+
+
+def _as_columns(data, columns=None, dtype=np.float64):
+    """
+    Returns the values of the numeric columns as one (n_columns, n_rows) array, each
+    column contiguous, and the column names. Missing values become NaN.
+    """
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    if isinstance(data, pd.DataFrame):
+        if columns is None:
+            columns = data.select_dtypes(include=['number']).columns.tolist()
+        values = np.empty((len(columns), len(data)), dtype=dtype)
+        for i, col in enumerate(columns):
+            values[i] = data[col].to_numpy(dtype=dtype, na_value=np.nan)
+        return values, list(columns)
+
+    data = np.asarray(data, dtype=dtype)
+    if data.ndim == 1:
+        data = data[:, None]
+    if columns is None:
+        columns = list(range(data.shape[1]))
+    return np.ascontiguousarray(data.T), list(columns)
+
+
+def _sorted_quantiles(sorted_values, counts, quantiles):
+    """
+    Linear-interpolation quantiles (numpy's default) of each row of sorted_values,
+    whose first counts[i] entries are the non-missing values of row i in order.
+    Returns an array of shape (len(quantiles), n_columns), NaN for empty columns.
+    """
+    rows = np.arange(len(counts))
+    result = np.full((len(quantiles), len(counts)), np.nan)
+    has = counts > 0
+    for i, q in enumerate(quantiles):
+        position = (counts[has] - 1) * q
+        low = np.floor(position).astype(np.intp)
+        high = np.minimum(low + 1, counts[has] - 1)
+        low_values = sorted_values[rows[has], low].astype(np.float64)
+        high_values = sorted_values[rows[has], high].astype(np.float64)
+        result[i, has] = low_values + (high_values - low_values) * (position - low)
+    return result
+
+
+def column_statistics(values, quantiles=True):
+    """
+    Computes the NaN-aware statistics the outlier rules need for every column at once.
+
+    Parameters:
+    - values (np.ndarray): Values as (n_columns, n_rows), as made by _as_columns.
+    - quantiles (bool): If False, skip the quartiles and MAD, which need sorting
+      (the zscore rule does not use them).
+
+    Returns:
+    - stats (dict): 'count', 'missing', 'mean', 'std' (population, like
+      scipy.stats.zscore), and unless quantiles is False 'q1', 'median', 'q3' and
+      'mad', one array per statistic. Sums are accumulated in float64 even for
+      float32 values.
+    """
+    present = ~np.isnan(values)
+    counts = present.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.nansum(values, axis=1, dtype=np.float64) / counts
+        deviations = values - means[:, None].astype(values.dtype)
+        stds = np.sqrt(np.nansum(deviations * deviations, axis=1, dtype=np.float64) / counts)
+    del deviations
+    stats = {'count': counts, 'missing': values.shape[1] - counts, 'mean': means, 'std': stds}
+    if not quantiles:
+        return stats
+
+    # One sort per column gives the quartiles; NaN sorts last, after the counts
+    sorted_values = np.sort(values, axis=1)
+    q1, median, q3 = _sorted_quantiles(sorted_values, counts, (0.25, 0.5, 0.75))
+    # The MAD is the median of the absolute deviations, which needs a second sort
+    np.abs(values - median[:, None].astype(values.dtype), out=sorted_values)
+    sorted_values.sort(axis=1)
+    mad, = _sorted_quantiles(sorted_values, counts, (0.5,))
+    stats.update(q1=q1, median=median, q3=q3, mad=mad)
+    return stats
+
+
+def outlier_bounds(stats, methods=METHODS, z_threshold=3.0, iqr_factor=1.5, mad_threshold=3.5):
+    """
+    Turns column statistics into (lower, upper) bounds per rule; a value is an outlier
+    when it is strictly outside them.
+
+    - zscore: mean -/+ z_threshold * std
+    - iqr: q1 - iqr_factor * IQR, q3 + iqr_factor * IQR (Tukey's fences)
+    - mad: median -/+ mad_threshold * MAD_SCALE * MAD
+
+    Columns with a std or MAD of 0 get infinite bounds for that rule, so a constant
+    column, or one where most values are equal, has no outliers instead of flagging
+    every other value.
+
+    Parameters:
+    - stats (dict): Statistics from column_statistics.
+    - methods (iterable): Rules to compute bounds for.
+    - z_threshold (float): Z-score above which a value is an outlier.
+    - iqr_factor (float): Multiple of the IQR beyond the quartiles.
+    - mad_threshold (float): Modified Z-score above which a value is an outlier.
+
+    Returns:
+    - bounds (dict): Rule name to a (lower, upper) pair of float64 arrays.
+    """
+    def around(center, spread):
+        spread = np.where(spread > 0, spread, np.inf)
+        return center - spread, center + spread
+
+    bounds = {}
+    for method in methods:
+        if method == 'zscore':
+            bounds[method] = around(stats['mean'], z_threshold * stats['std'])
+        elif method == 'iqr':
+            iqr = stats['q3'] - stats['q1']
+            bounds[method] = (stats['q1'] - iqr_factor * iqr, stats['q3'] + iqr_factor * iqr)
+        elif method == 'mad':
+            bounds[method] = around(stats['median'], mad_threshold * MAD_SCALE * stats['mad'])
+        else:
+            raise ValueError(f"Unknown outlier method '{method}', expected one of {list(METHODS)}.")
+    return bounds
+
+
+def _limits(bounds, methods, dtype):
+    # Bounds as (n_columns, 1) columns of the values' dtype, to compare whole rows
+    return {method: (bounds[method][0][:, None].astype(dtype), bounds[method][1][:, None].astype(dtype))
+            for method in methods}
+
+
+def outlier_masks(values, bounds, methods=METHODS, batch_rows=BATCH_ROWS):
+    """
+    Flags the values outside the bounds of each rule, as bit-packed masks.
+
+    The rows are processed in batches, so the boolean temporaries stay at
+    batch_rows per column however long the data is. Missing values are never
+    outliers.
+
+    Parameters:
+    - values (np.ndarray): Values as (n_columns, n_rows).
+    - bounds (dict): Bounds from outlier_bounds.
+    - methods (iterable): Rules to compute masks for.
+    - batch_rows (int): Rows per batch, a multiple of 8.
+
+    Returns:
+    - masks (dict): Rule name to a uint8 array of shape (n_columns, ceil(n_rows / 8)),
+      bit j % 8 (little-endian) of byte j // 8 being row j.
+    - counts (dict): Rule name to the number of outliers per column.
+    """
+    if batch_rows % 8:
+        raise ValueError("batch_rows must be a multiple of 8.")
+    n_columns, n_rows = values.shape
+    masks = {method: np.empty((n_columns, (n_rows + 7) // 8), dtype=np.uint8) for method in methods}
+    counts = {method: np.zeros(n_columns, dtype=np.int64) for method in methods}
+    limits = _limits(bounds, methods, values.dtype)
+    for start in range(0, n_rows, batch_rows):
+        batch = values[:, start:start + batch_rows]
+        for method in methods:
+            lower, upper = limits[method]
+            # NaN compares False on both sides
+            flagged = (batch < lower) | (batch > upper)
+            counts[method] += flagged.sum(axis=1)
+            masks[method][:, start // 8:(start + batch.shape[1] + 7) // 8] = \
+                np.packbits(flagged, axis=1, bitorder='little')
+    return masks, counts
+
+
+def summary_table(columns, stats, bounds, counts, n_rows):
+    """
+    Builds the outlier summary: one row per column with its statistics, and the
+    bounds, count and percentage of outliers of every rule.
+
+    Parameters:
+    - columns (list): The column names.
+    - stats (dict): Statistics from column_statistics.
+    - bounds (dict): Bounds from outlier_bounds.
+    - counts (dict): Outlier counts per rule, as returned by outlier_masks.
+    - n_rows (int): Number of rows, missing values included.
+
+    Returns:
+    - summary (pd.DataFrame): The table, indexed by column name. Percentages are of
+      the non-missing values.
+    """
+    table = {key: stats[key] for key in ('count', 'missing', 'mean', 'std', 'q1', 'median',
+                                         'q3', 'mad') if key in stats}
+    table['missing_percentage'] = stats['missing'] / n_rows * 100 if n_rows else np.zeros(len(columns))
+    for method, method_counts in counts.items():
+        lower, upper = bounds[method]
+        table[f"{method}_lower"] = lower
+        table[f"{method}_upper"] = upper
+        table[f"{method}_count"] = method_counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table[f"{method}_percentage"] = np.where(stats['count'] > 0,
+                                                     method_counts / stats['count'] * 100, 0.0)
+    return pd.DataFrame(table, index=pd.Index(columns, name='column'))
+
+
+class OutlierReport:
+    """
+    The outliers of several columns under several rules, as found by detect_outliers.
+
+    Attributes:
+    - summary (pd.DataFrame): Statistics, bounds and outlier counts per column (see
+      summary_table).
+    - masks (dict): Rule name to the bit-packed outlier masks, (n_columns, n_bytes)
+      uint8 arrays (see outlier_masks); an eighth of the size of boolean masks.
+    - columns (list): The column names, in the order of the mask rows.
+    - n_rows (int): Number of rows.
+    - index (pd.Index): Row labels of the data, if it was a DataFrame.
+    """
+
+    def __init__(self, summary, masks, columns, n_rows, index=None):
+        self.summary = summary
+        self.masks = masks
+        self.columns = columns
+        self.n_rows = n_rows
+        self.index = index
+
+    def mask(self, method='zscore', column=None):
+        """
+        Unpacks outlier masks.
+
+        Parameters:
+        - method (str): The rule.
+        - column (optional): A column name; if None, every column.
+
+        Returns:
+        - mask (pd.Series or pd.DataFrame): Boolean mask of the column, or of every
+          column, with the row labels of the data.
+        """
+        if column is not None:
+            packed = self.masks[method][self.columns.index(column)]
+            flags = np.unpackbits(packed, count=self.n_rows, bitorder='little').astype(bool)
+            return pd.Series(flags, index=self.index, name=column)
+        flags = np.unpackbits(self.masks[method], axis=1, count=self.n_rows, bitorder='little')
+        return pd.DataFrame(flags.T.astype(bool), index=self.index, columns=self.columns)
+
+    def any_outlier(self, method='zscore'):
+        """Returns a boolean Series flagging the rows with an outlier in any column."""
+        packed = np.bitwise_or.reduce(self.masks[method], axis=0)
+        flags = np.unpackbits(packed, count=self.n_rows, bitorder='little').astype(bool)
+        return pd.Series(flags, index=self.index)
+
+    def __repr__(self):
+        return f"OutlierReport({len(self.columns)} columns, {self.n_rows} rows, methods={list(self.masks)})"
+
+
+def detect_outliers(data, columns=None, methods=METHODS, z_threshold=3.0, iqr_factor=1.5,
+                    mad_threshold=3.5, dtype=np.float64, batch_rows=BATCH_ROWS):
+    """
+    Finds the Z-score, IQR and MAD outliers of many columns in one pass over a
+    (n_columns, n_rows) array, instead of one zscore call and temporary per column.
+    Missing values are ignored by the statistics and never flagged.
+
+    Parameters:
+    - data (pd.DataFrame, pd.Series or array-like): The data; a 2-D array has one
+      column per variable.
+    - columns (list, optional): Columns to check. Defaults to the numeric columns
+      (every column of an array).
+    - methods (iterable): Rules among METHODS.
+    - z_threshold (float): Z-score above which a value is an outlier.
+    - iqr_factor (float): Multiple of the IQR beyond the quartiles.
+    - mad_threshold (float): Modified Z-score above which a value is an outlier.
+    - dtype: np.float64, or np.float32 to halve the memory of the values and sorts.
+      Statistics are still accumulated in float64, but values and bounds are
+      compared in float32, so values within float32 rounding of a bound can be
+      flagged differently.
+    - batch_rows (int): Rows per batch of the mask computation.
+
+    Returns:
+    - report (OutlierReport): The summary table and bit-packed masks.
+    """
+    methods = list(methods)
+    unknown = [method for method in methods if method not in METHODS]
+    if unknown:
+        raise ValueError(f"Unknown outlier methods {unknown}, expected some of {list(METHODS)}.")
+    values, columns = _as_columns(data, columns, dtype)
+    stats = column_statistics(values, quantiles=methods != ['zscore'])
+    bounds = outlier_bounds(stats, methods, z_threshold, iqr_factor, mad_threshold)
+    masks, counts = outlier_masks(values, bounds, methods, batch_rows)
+    summary = summary_table(columns, stats, bounds, counts, values.shape[1])
+    index = data.index if isinstance(data, (pd.DataFrame, pd.Series)) else None
+    return OutlierReport(summary, masks, columns, values.shape[1], index)
+
 
 def calculate_zscore_outliers(column, threshold=3):
     """
     Calculate the number and percentage of outliers in a column using Z-Score.
+    Missing values are ignored; see detect_outliers to check many columns at once.
 
     Parameters:
     - column (array-like): A numerical data column (e.g., a list or a pandas Series).
@@ -13,18 +309,210 @@ def calculate_zscore_outliers(column, threshold=3):
     - count (int): The count of outlier values.
     - percentage (float): The percentage of outlier values in the column.
     """
-    # Calculate the Z-Scores of the column
-    z_scores = zscore(column)
-    
-    # Identify outliers where the absolute Z-Score exceeds the threshold
-    outlier_mask = np.abs(z_scores) > threshold
-    
-    # Count the number of outliers
-    count = np.sum(outlier_mask)
-    
-    # Calculate the percentage of outliers
-    percentage = (count / len(column)) * 100
-    
+    report = detect_outliers(column, methods=['zscore'], z_threshold=threshold)
+    count = int(report.summary['zscore_count'].iloc[0])
+    # Percentage of all entries, missing ones included
+    percentage = (count / len(column)) * 100 if len(column) else 0.0
     return count, percentage
 
 
+def _combine_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """
+    Combines the counts, means and sums of squared deviations of two parts of the
+    data (Chan et al.), per column. Parts without values contribute nothing.
+    """
+    n = n_a + n_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = mean_b - mean_a
+        mean = np.where(n_b == 0, mean_a, np.where(n_a == 0, mean_b, mean_a + delta * (n_b / n)))
+        m2 = np.where(n_b == 0, m2_a, np.where(n_a == 0, m2_b, m2_a + m2_b + delta ** 2 * (n_a * n_b / n)))
+    return n, mean, m2
+
+
+class OutlierAccumulator:
+    """
+    Streaming, mergeable statistics for the outlier rules, for data read in chunks
+    (e.g. read_raw_csv(..., chunksize=...)) that does not fit in memory at once.
+
+    Every chunk updates, per column, the count, mean and sum of squared deviations,
+    combined with the chunk's own with Chan's parallel formulas (the chunk moments
+    are computed in one vectorized pass over all columns), and a QuantileSketch of
+    the values for the quartiles and the MAD. The sketches are exact until a column
+    has more than max_size distinct values, then approximate. Accumulators fitted
+    on different chunks, e.g. in different processes, can be merged.
+
+    The bounds of the rules are only final after the last chunk, so the outliers are
+    counted in a second pass with OutlierCounter; see streaming_outlier_summary.
+
+    Attributes:
+    - columns (list): The columns, taken from the first chunk's numeric columns if
+      not given.
+    - n_rows (int): Number of rows seen, missing values included.
+    """
+
+    def __init__(self, columns=None, max_size=200_000):
+        self.columns = None if columns is None else list(columns)
+        self.max_size = max_size
+        self.n_rows = 0
+        self._moments = None
+        self.sketches = None
+
+    def _start(self, columns):
+        self.columns = list(columns)
+        zeros = np.zeros(len(self.columns))
+        self._moments = (zeros.astype(np.int64), zeros.copy(), zeros.copy())
+        self.sketches = [QuantileSketch(self.max_size) for _ in self.columns]
+
+    def partial_fit(self, data):
+        """
+        Updates the statistics with one chunk.
+
+        Parameters:
+        - data (pd.DataFrame or array-like): A chunk, with the same columns as the
+          others.
+
+        Returns:
+        - self (OutlierAccumulator)
+        """
+        values, columns = _as_columns(data, self.columns)
+        if self._moments is None:
+            self._start(columns)
+        self.n_rows += values.shape[1]
+        stats = column_statistics(values, quantiles=False)
+        chunk_m2 = stats['std'] ** 2 * stats['count']
+        self._moments = _combine_moments(*self._moments, stats['count'],
+                                         np.nan_to_num(stats['mean']), np.nan_to_num(chunk_m2))
+        for sketch, column in zip(self.sketches, values):
+            sketch.update(column)
+        return self
+
+    def fit(self, data):
+        """
+        Fits the statistics in one pass over a DataFrame or an iterable of chunks.
+
+        Returns:
+        - self (OutlierAccumulator)
+        """
+        chunks = [data] if isinstance(data, (pd.DataFrame, np.ndarray)) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        """
+        Merges an accumulator fitted on other chunks of the same columns.
+
+        Returns:
+        - self (OutlierAccumulator)
+        """
+        if other._moments is None:
+            return self
+        if self._moments is None:
+            self._start(other.columns)
+        elif other.columns != self.columns:
+            raise ValueError(f"Cannot merge statistics of columns {other.columns} into {self.columns}.")
+        self.n_rows += other.n_rows
+        self._moments = _combine_moments(*self._moments, *other._moments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    @property
+    def exact(self):
+        """True if no sketch had to be compressed, i.e. the quantiles are exact."""
+        return self.sketches is None or all(sketch.exact for sketch in self.sketches)
+
+    def statistics(self):
+        """
+        Returns the statistics in the form of column_statistics: 'count', 'missing',
+        'mean', 'std', 'q1', 'median', 'q3' and 'mad', one array per statistic.
+
+        The MAD is the weighted median of the distances from the median to the
+        sketch's values, which is exact while the sketch is.
+        """
+        if self._moments is None:
+            raise ValueError("No data seen yet; call partial_fit or fit first.")
+        counts, means, m2 = self._moments
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stds = np.sqrt(m2 / counts)
+        quartiles = np.array([[sketch.quantile(q) for sketch in self.sketches]
+                              for q in (0.25, 0.5, 0.75)]).reshape(3, len(self.columns))
+        mads = []
+        for sketch, median in zip(self.sketches, quartiles[1]):
+            deviations = QuantileSketch(np.inf).update(np.abs(sketch.values - median), sketch.weights)
+            mads.append(deviations.median())
+        return {'count': counts, 'missing': self.n_rows - counts,
+                'mean': np.where(counts > 0, means, np.nan), 'std': stds,
+                'q1': quartiles[0], 'median': quartiles[1], 'q3': quartiles[2],
+                'mad': np.array(mads, dtype=float)}
+
+    def bounds(self, methods=METHODS, z_threshold=3.0, iqr_factor=1.5, mad_threshold=3.5):
+        """Returns the bounds of the rules, see outlier_bounds."""
+        return outlier_bounds(self.statistics(), methods, z_threshold, iqr_factor, mad_threshold)
+
+
+class OutlierCounter:
+    """
+    Counts the values outside fixed bounds, chunk by chunk: the second pass of a
+    streaming outlier report, after OutlierAccumulator fixed the bounds. Counters of
+    different chunks can be merged.
+
+    Parameters:
+    - columns (list): The columns the bounds are for, in order.
+    - bounds (dict): Bounds from outlier_bounds or OutlierAccumulator.bounds.
+    """
+
+    def __init__(self, columns, bounds):
+        self.columns = list(columns)
+        self.bounds = bounds
+        self.counts = {method: np.zeros(len(self.columns), dtype=np.int64) for method in bounds}
+
+    def partial_fit(self, data):
+        """Adds the outliers of one chunk to counts, and returns self."""
+        values, _ = _as_columns(data, self.columns)
+        for method, (lower, upper) in _limits(self.bounds, self.bounds, values.dtype).items():
+            self.counts[method] += ((values < lower) | (values > upper)).sum(axis=1)
+        return self
+
+    def fit(self, data):
+        """Counts the outliers of a DataFrame or an iterable of chunks, and returns self."""
+        chunks = [data] if isinstance(data, (pd.DataFrame, np.ndarray)) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        """Adds the counts of a counter of other chunks, and returns self."""
+        for method in self.counts:
+            self.counts[method] += other.counts[method]
+        return self
+
+
+def streaming_outlier_summary(read_chunks, columns=None, methods=METHODS, z_threshold=3.0,
+                              iqr_factor=1.5, mad_threshold=3.5, max_size=200_000):
+    """
+    Builds the outlier summary table of detect_outliers over data read in chunks, in
+    memory bounded by the chunk size and the sketches: one pass to fit the
+    statistics and a second one to count the outliers against the final bounds.
+
+    Parameters:
+    - read_chunks (callable): Returns a new iterable of DataFrame chunks each time
+      it is called; it is called twice.
+    - columns (list, optional): Columns to check. Defaults to the numeric columns of
+      the first chunk.
+    - methods (iterable): Rules among METHODS.
+    - z_threshold, iqr_factor, mad_threshold (float): See outlier_bounds.
+    - max_size (int): Distinct values per column kept exactly by the sketches.
+
+    Returns:
+    - summary (pd.DataFrame): The table, as OutlierReport.summary.
+
+    Usage:
+        summary = streaming_outlier_summary(
+            lambda: read_raw_csv(path, columns=columns, chunksize=1_000_000))
+    """
+    accumulator = OutlierAccumulator(columns, max_size).fit(read_chunks())
+    bounds = accumulator.bounds(methods, z_threshold, iqr_factor, mad_threshold)
+    counter = OutlierCounter(accumulator.columns, bounds).fit(read_chunks())
+    return summary_table(accumulator.columns, accumulator.statistics(), bounds, counter.counts,
+                         accumulator.n_rows)
@@ -3,9 +3,11 @@ import seaborn as sns
 import numpy as np
 import pandas as pd
 
+from lib.analysis.correlation import correlation
+
 def create_correlation_heatmap(df, columns=None, method='pearson', figsize=(12, 10), 
                                cmap='coolwarm', annot=True, mask_upper=False, 
-                               save_path=None):
+                               save_path=None, sample=None, cache=False):
     """
     Create a correlation heatmap to visualize relationships between variables in a dataset.
     
@@ -31,6 +33,13 @@ def create_correlation_heatmap(df, columns=None, method='pearson', figsize=(12,
         If True, mask the upper triangle of the correlation matrix
     save_path : str or None, optional (default=None)
         Path to save the figure. If None, the figure will be displayed but not saved.
+    sample : int or None, optional (default=None)
+        If given, correlate a random sample of this many rows on large frames
+        (see lib.analysis.correlation.correlation for the confidence bounds)
+    cache : bool, optional (default=False)
+        If True, reuse the matrix computed earlier for the same frame and method.
+        Values edited in place are not seen, so only pass it for frames that are
+        no longer modified
     
     Returns:
     --------
@@ -39,23 +48,18 @@ def create_correlation_heatmap(df, columns=None, method='pearson', figsize=(12,
     corr_matrix : pandas.DataFrame
         The correlation matrix
     """
-    # If no columns specified, use all numeric columns
-    if columns is None:
-        # Select only numeric columns
-        numeric_df = df.select_dtypes(include=[np.number])
-    else:
-        numeric_df = df[columns].select_dtypes(include=[np.number])
-    
-    # Calculate the correlation matrix
-    corr_matrix = numeric_df.corr(method=method)
+    # Calculate the correlation matrix of the numeric columns (all of them if no
+    # columns are specified): one standardized matrix product for pearson and
+    # spearman, an O(n log n) algorithm per pair for kendall. The frame itself is
+    # passed, so with cache the matrix is found again on the next call
+    corr_matrix = correlation(df, method=method, columns=columns, sample=sample,
+                              cache=cache).matrix
     
     # Create a mask for the upper triangle if required
     mask = np.triu(np.ones_like(corr_matrix, dtype=bool)) if mask_upper else None
     
-    # Set up the matplotlib figure
-    plt.figure(figsize=figsize)
-    
-    # Draw the heatmap with the mask and correct aspect ratio
+    # Set up the matplotlib figure and draw the heatmap with the mask and correct
+    # aspect ratio
     fig = plt.figure(figsize=figsize)
     sns.heatmap(corr_matrix, mask=mask, cmap=cmap, annot=annot, 
                 square=True, linewidths=.5, cbar_kws={"shrink": .5},
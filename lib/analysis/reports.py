@@ -1,137 +1,516 @@
 import pandas as pd
 import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
-def categorical_summary_stats(df, categorical_columns=None):
+from lib.analysis.memo import column_token, frame_memo
+
+# A numeric column is summarized as categorical when it has fewer distinct values
+LOW_CARDINALITY = 10
+
+# Rows of a numeric column checked before counting all its values: if they already
+# hold LOW_CARDINALITY distinct values, the column is skipped without a full pass
+SAMPLE_ROWS = 10_000
+
+
+class ValueCounts:
+    """
+    The distinct values of a column and their counts, from one factorize pass per
+    chunk, in order of first appearance (as Series.unique). Missing values are
+    counted as one more value. Counts of chunks can be merged.
+
+    Every statistic of categorical_summary_stats (value counts, unique values,
+    missing values and the mode) is derived from these counts, instead of scanning
+    the column once for each.
+    """
+
+    def __init__(self):
+        self.values = None
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.categories = None
+        self.n_rows = 0
+        self._summary = None
+
+    def update(self, series):
+        """Adds the values of a column, or of a chunk of it, and returns self."""
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        counts = np.bincount(codes, minlength=len(uniques))
+        categories = None
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Categoricals also report their unused categories in value_counts
+            categories = series.cat.categories
+            uniques = pd.Index(np.asarray(uniques, dtype=object))
+        elif pd.api.types.is_object_dtype(series) and pd.isna(uniques).any():
+            # factorize turns None into NaN; keep the column's own missing value,
+            # which Series.unique reports
+            missing = int(np.flatnonzero(pd.isna(uniques))[0])
+            values = np.array(uniques, dtype=object)
+            values[missing] = series.iloc[int(np.argmax(codes == missing))]
+            uniques = pd.Index(values, dtype=object)
+        self._add(pd.Index(uniques), counts, categories, len(series))
+        return self
+
+    def merge(self, other):
+        """Adds the counts of another part of the column, and returns self."""
+        if other.values is not None:
+            self._add(other.values, other.counts, other.categories, other.n_rows)
+        return self
+
+    def _add(self, values, counts, categories, n_rows):
+        self._summary = None
+        self.n_rows += n_rows
+        if categories is not None:
+            self.categories = categories if self.categories is None else \
+                self.categories.append(categories.difference(self.categories, sort=False))
+        if self.values is None:
+            self.values, self.counts = values, counts.astype(np.int64)
+            return
+        positions = self.values.get_indexer(values)
+        found = positions >= 0
+        np.add.at(self.counts, positions[found], counts[found])
+        if not found.all():
+            self.values = self.values.append(values[~found])
+            self.counts = np.concatenate([self.counts, counts[~found]])
+
+    @property
+    def n_distinct(self):
+        """Number of distinct non-missing values."""
+        return 0 if self.values is None else int((~pd.isna(self.values)).sum())
+
+    def summary(self, top=5):
+        """
+        Returns the statistics of the column, in the form of categorical_summary_stats.
+
+        Parameters:
+        top (int): Number of most frequent values to list.
+
+        Returns:
+        dict: The column's summary statistics. It is built once and returned again
+              until more values are added.
+        """
+        if self._summary is not None and self._summary[0] == top:
+            return self._summary[1]
+        values = pd.Index([]) if self.values is None else self.values
+        missing_mask = np.asarray(pd.isna(values), dtype=bool)
+        missing = self.counts[missing_mask].sum()
+        keys, key_counts = values[~missing_mask], self.counts[~missing_mask]
+        counts = pd.Series(key_counts, index=keys)
+        if self.categories is not None:
+            counts = counts.reindex(self.categories, fill_value=0)
+        keys, key_counts = counts.index, counts.to_numpy()
+        # Most frequent first, sorted the way value_counts sorts, so ties come out in
+        # the same order
+        top_counts = counts.sort_values(ascending=False).head(top)
+
+        mode_value, mode_count = None, 0
+        if len(counts):
+            mode_count = key_counts.max()
+            tied = keys[key_counts == mode_count]
+            mode_value = tied[0]
+            if self.categories is None and mode_count > 0:
+                # Like Series.mode, the smallest of the most frequent values
+                try:
+                    mode_value = min(tied)
+                except TypeError:
+                    pass
+        if mode_count == 0:
+            mode_value = None
+
+        def percentage(count):
+            return round((count / self.n_rows) * 100, 2) if self.n_rows > 0 else 0
+
+        summary = {
+            'unique_values': len(values),
+            'missing_values': missing,
+            'missing_percentage': percentage(missing),
+            'mode': {
+                'value': mode_value,
+                'count': mode_count,
+                'percentage': percentage(mode_count)
+            },
+            'top_categories': [{'value': value, 'count': count, 'percentage': percentage(count)}
+                               for value, count in top_counts.items()],
+            'all_categories': [str(v) for v in values]
+        }
+        self._summary = (top, summary)
+        return summary
+
+
+def _is_categorical(series):
+    return (pd.api.types.is_object_dtype(series) or pd.api.types.is_bool_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype))
+
+
+def _few_values(series):
+    # False as soon as a sample of the column has LOW_CARDINALITY distinct values
+    sample = series.iloc[:SAMPLE_ROWS]
+    return pd.unique(sample.dropna()).size < LOW_CARDINALITY
+
+
+def _column_counts(df, col, memo):
+    """
+    Returns the ValueCounts of a column of df, from memo if they were counted since
+    the column was last replaced; memo maps columns to (ColumnToken, ValueCounts).
+    """
+    series = df[col]
+    token = column_token(series)
+    cached = memo.get(col)
+    if cached is None or cached[0] != token:
+        cached = memo[col] = (token, ValueCounts().update(series))
+    return cached[1]
+
+
+def categorical_summary_stats(df, categorical_columns=None, cache=False):
     """
     Generate summary statistics for categorical variables in a dataframe.
+
+    Each column is factorized once (see ValueCounts) and every statistic is derived
+    from its counts. With cache, the counts are memoized per frame and column, so
+    calling this again on the same frame is nearly free; values edited in place are
+    not seen then, so only pass it for frames that are no longer modified. For files
+    too large to load, see CategoricalSummary.
     
     Parameters:
     df (pandas.DataFrame): The dataframe to analyze
     categorical_columns (list, optional): List of categorical column names to analyze.
                                          If None, will try to identify categorical columns.
+    cache (bool): If True, reuse the counts of earlier calls on the same frame.
     
     Returns:
     dict: Dictionary where keys are column names and values are dictionaries of summary statistics
     """    
+    # Without cache the counts are still shared within this call, between the
+    # cardinality check and the summary
+    memo = frame_memo(df, 'value_counts') if cache else {}
+
     # If no categorical columns specified, try to identify them
     if categorical_columns is None:
         # Select object, category, and boolean dtypes
         categorical_columns = df.select_dtypes(include=['object', 'category', 'bool']).columns.tolist()
         
-        # Also include numeric columns with low cardinality (fewer than 10 unique values)
+        # Also include numeric columns with low cardinality (fewer than 10 unique values);
+        # their counts are reused for the summary below
         for col in df.select_dtypes(include=['number']).columns:
-            if df[col].nunique() < 10:
+            if _few_values(df[col]) and _column_counts(df, col, memo).n_distinct < LOW_CARDINALITY:
                 categorical_columns.append(col)
     
     summary = {}
-    
     for col in categorical_columns:
         if col not in df.columns:
             continue
-            
-        # Basic stats
-        value_counts = df[col].value_counts()
-        unique_values = df[col].unique()
-        missing_values = df[col].isna().sum()
-        
-        # Get mode (most frequent value)
-        mode_value = df[col].mode()[0] if not df[col].empty else None
-        mode_count = value_counts.iloc[0] if not value_counts.empty else 0
-        mode_percentage = (mode_count / len(df)) * 100 if len(df) > 0 else 0
-        
-        # Get top 5 categories with counts and percentages
-        top_categories = []
-        for value, count in value_counts.head(5).items():
-            percentage = (count / len(df)) * 100
-            top_categories.append({
-                'value': value,
-                'count': count,
-                'percentage': round(percentage, 2)
-            })
-        
-        # Compile column summary
-        summary[col] = {
-            'unique_values': len(unique_values),
-            'missing_values': missing_values,
-            'missing_percentage': round((missing_values / len(df)) * 100, 2) if len(df) > 0 else 0,
-            'mode': {
-                'value': mode_value,
-                'count': mode_count,
-                'percentage': round(mode_percentage, 2)
-            },
-            'top_categories': top_categories,
-            'all_categories': [str(v) for v in unique_values]
-        }
-    
+        summary[col] = _column_counts(df, col, memo).summary()
     return summary
 
 
-def report_missing_data(df, dataset_name="Dataset"):
+class CategoricalSummary:
+    """
+    categorical_summary_stats over a file read in chunks, or over parts of the data
+    summarized in different processes and merged.
+
+    When the columns are not given, the object, category and boolean columns of the
+    first chunk are summarized, plus the numeric columns that have fewer than
+    LOW_CARDINALITY distinct values over all chunks. A numeric column stops being
+    counted as soon as it reaches that many.
+
+    Usage:
+        summary = CategoricalSummary().fit(read_raw_csv(path, chunksize=1_000_000))
+        stats = summary.summary()
+    """
+
+    def __init__(self, categorical_columns=None):
+        self.categorical_columns = None if categorical_columns is None else list(categorical_columns)
+        self.counts = {}
+        self.skipped = set()
+
+    def partial_fit(self, df):
+        """Adds the values of one chunk, and returns self."""
+        if self.categorical_columns is None:
+            self.categorical_columns = [col for col in df.columns if _is_categorical(df[col])]
+        for col in df.columns:
+            categorical = col in self.categorical_columns
+            if not categorical and (col in self.skipped or not pd.api.types.is_numeric_dtype(df[col])):
+                continue
+            counts = self.counts.setdefault(col, ValueCounts()).update(df[col])
+            if not categorical and counts.n_distinct >= LOW_CARDINALITY:
+                del self.counts[col]
+                self.skipped.add(col)
+        return self
+
+    def fit(self, data):
+        """Summarizes a DataFrame or an iterable of chunks, and returns self."""
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        """Adds a summary of other chunks of the same columns, and returns self."""
+        if self.categorical_columns is None:
+            self.categorical_columns = other.categorical_columns
+        self.skipped |= other.skipped
+        for col, counts in other.counts.items():
+            if col not in self.skipped:
+                self.counts.setdefault(col, ValueCounts()).merge(counts)
+        for col in list(self.counts):
+            if col not in self.categorical_columns and (
+                    col in self.skipped or self.counts[col].n_distinct >= LOW_CARDINALITY):
+                del self.counts[col]
+                self.skipped.add(col)
+        return self
+
+    def summary(self, top=5):
+        """Returns the statistics of each column, as categorical_summary_stats."""
+        columns = [col for col in self.categorical_columns if col in self.counts]
+        columns += [col for col in self.counts if col not in columns]
+        return {col: self.counts[col].summary(top) for col in columns}
+
+
+# Number of set bits of every byte value, to count rows in bit-packed masks
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+# Backends that can only write files; with them there is nothing to show
+_FILE_BACKENDS = {'agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template'}
+
+
+class MissingDataReport:
+    """
+    Missingness of a dataset, as computed by missing_data_report.
+
+    Attributes:
+    n_rows (int): Number of rows.
+    columns (list): All column names.
+    by_column (pd.DataFrame): 'missing' count and 'percentage' per column.
+    masks (np.ndarray): Bit-packed missingness of the columns with missing values
+                        (the rows of by_column with missing > 0, in order), as uint8
+                        of shape (n_columns, ceil(n_rows / 8)), bit j % 8 (little-endian)
+                        of byte j // 8 being row j.
+    co_occurrence (pd.DataFrame): Rows missing both columns, for every pair of the
+                                  columns with missing values (the diagonal holds
+                                  their counts).
+    patterns (pd.DataFrame): The most frequent combinations of missing columns: one
+                             boolean column per column with missing values, plus the
+                             'rows' having the pattern and their 'percentage'.
+    binned (pd.DataFrame): Fraction of missing values per column in each bin of
+                           consecutive rows, indexed by the first row of the bin.
+    """
+
+    def __init__(self, n_rows, columns, by_column, masks, co_occurrence, patterns, binned):
+        self.n_rows = n_rows
+        self.columns = columns
+        self.by_column = by_column
+        self.masks = masks
+        self.co_occurrence = co_occurrence
+        self.patterns = patterns
+        self.binned = binned
+
+    @property
+    def total_cells(self):
+        return self.n_rows * len(self.columns)
+
+    @property
+    def total_missing(self):
+        return int(self.by_column['missing'].sum())
+
+    @property
+    def total_percentage(self):
+        return self.total_missing / self.total_cells * 100 if self.total_cells else 0.0
+
+    @property
+    def missing_columns(self):
+        """The rows of by_column with missing values."""
+        return self.by_column[self.by_column['missing'] > 0]
+
+    def mask(self, column):
+        """Returns the missingness of a column with missing values as a boolean array."""
+        row = self.missing_columns.index.get_loc(column)
+        return np.unpackbits(self.masks[row], count=self.n_rows, bitorder='little').astype(bool)
+
+    def to_dict(self):
+        """Returns the report without the masks and bins, as JSON-serializable data."""
+        missing = self.missing_columns
+        return {
+            'n_rows': self.n_rows,
+            'n_columns': len(self.columns),
+            'total_missing': self.total_missing,
+            'total_percentage': self.total_percentage,
+            'columns': {col: {'missing': int(row['missing']), 'percentage': float(row['percentage'])}
+                        for col, row in missing.iterrows()},
+            'patterns': [{'columns': [col for col in missing.index if row[col]],
+                          'rows': int(row['rows']), 'percentage': float(row['percentage'])}
+                         for _, row in self.patterns.iterrows()],
+        }
+
+    def text(self, dataset_name="Dataset"):
+        """Formats the report as the text report_missing_data prints."""
+        lines = [f"### Missing Data Report for {dataset_name} ###",
+                 f"Total Rows: {self.n_rows}, Total Columns: {len(self.columns)}",
+                 f"Total Entries (cells): {self.total_cells}",
+                 "\n#### Variables with Missing Data ####"]
+        missing = self.missing_columns
+        if len(missing) > 0:
+            for col, row in missing.iterrows():
+                lines.append(f"{col}: {int(row['missing'])} missing values ({row['percentage']:.2f}%)")
+        else:
+            lines.append("No missing data found in any variable.")
+        lines += ["\n#### Overall Missing Data ####",
+                  f"Total Missing Values: {self.total_missing}",
+                  f"Total Missing Percentage: {self.total_percentage:.2f}%"]
+        if len(self.patterns) > 0:
+            lines.append("\n#### Most Frequent Missing Patterns ####")
+            for _, row in self.patterns.iterrows():
+                names = [col for col in missing.index if row[col]] or ['(none)']
+                lines.append(f"{', '.join(names)}: {int(row['rows'])} rows ({row['percentage']:.2f}%)")
+        return '\n'.join(lines)
+
+
+def _row_patterns(masks, n_rows, columns, top):
+    # Count the distinct combinations of missing columns, one code per row
+    if len(columns) == 0:
+        patterns = pd.DataFrame({'rows': [n_rows]}) if n_rows else pd.DataFrame({'rows': []})
+    else:
+        n_bytes = (len(columns) + 7) // 8
+        codes = np.zeros((n_rows, 8 if n_bytes <= 8 else n_bytes), dtype=np.uint8)
+        for j, packed in enumerate(masks):
+            codes[:, j // 8] |= np.unpackbits(packed, count=n_rows, bitorder='little') << (j % 8)
+        # Up to 64 columns fit one uint64 per row, which np.unique sorts fastest
+        codes = codes.view(np.uint64)[:, 0] if n_bytes <= 8 else \
+            codes.view(np.dtype((np.void, n_bytes)))[:, 0]
+        uniques, counts = np.unique(codes, return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:top]
+        bits = np.unpackbits(uniques[order].view(np.uint8).reshape(len(order), -1), axis=1,
+                             bitorder='little')[:, :len(columns)].astype(bool)
+        patterns = pd.DataFrame(bits, columns=columns)
+        patterns['rows'] = counts[order]
+    patterns['percentage'] = patterns['rows'] / n_rows * 100 if n_rows else 0.0
+    return patterns
+
+
+def missing_data_report(df, max_bins=500, top_patterns=10):
+    """
+    Computes the missingness of a DataFrame in one pass over its columns, without
+    building the cell-by-cell isnull() frame: each column's mask is counted, packed
+    into bits and averaged over row bins as it is made.
+
+    Parameters:
+    df (pd.DataFrame): The data to analyze.
+    max_bins (int): Largest number of row bins for the heatmap; consecutive rows
+                    are averaged into at most this many bins, so drawing the heatmap
+                    costs the same at any number of rows.
+    top_patterns (int): Number of most frequent missing patterns to keep.
+
+    Returns:
+    MissingDataReport: The structured report.
+    """
+    n_rows = len(df)
+    n_bins = max(min(n_rows, max_bins), 1)
+    bin_starts = np.arange(n_bins) * n_rows // n_bins
+    bin_sizes = np.diff(np.r_[bin_starts, n_rows])
+
+    counts, masks, binned = {}, [], {}
+    for col in df.columns:
+        missing = df[col].isna().to_numpy()
+        counts[col] = int(missing.sum())
+        binned[col] = np.add.reduceat(missing, bin_starts) / bin_sizes if n_rows else np.zeros(n_bins)
+        if counts[col] > 0:
+            masks.append(np.packbits(missing, bitorder='little'))
+
+    by_column = pd.DataFrame({'missing': pd.Series(counts, dtype=np.int64)})
+    by_column['percentage'] = by_column['missing'] / n_rows * 100 if n_rows else 0.0
+    missing_columns = by_column.index[by_column['missing'] > 0].tolist()
+    masks = np.array(masks, dtype=np.uint8).reshape(len(missing_columns), (n_rows + 7) // 8)
+
+    # Rows missing both columns of a pair: set bits of the AND of their masks
+    pairs = np.zeros((len(missing_columns), len(missing_columns)), dtype=np.int64)
+    for i in range(len(missing_columns)):
+        for j in range(i, len(missing_columns)):
+            pairs[i, j] = pairs[j, i] = _POPCOUNT[masks[i] & masks[j]].sum()
+    co_occurrence = pd.DataFrame(pairs, index=missing_columns, columns=missing_columns)
+
+    patterns = _row_patterns(masks, n_rows, missing_columns, top_patterns)
+    binned = pd.DataFrame(binned, index=pd.Index(bin_starts[:len(bin_sizes)], name='first_row'))
+    return MissingDataReport(n_rows, list(df.columns), by_column, masks, co_occurrence, patterns, binned)
+
+
+def plot_missing_data(report, dataset_name="Dataset", figsize=(12, 8), fig=None):
+    """
+    Draws the missing data heatmap, from the row bins of the report, and the
+    percentage of missing values by variable.
+
+    Parameters:
+    report (MissingDataReport): The report to draw.
+    dataset_name (str): Name of the dataset for the titles.
+    figsize (tuple): Figure size in inches, for a new figure.
+    fig (matplotlib.figure.Figure, optional): Figure to draw on. By default a new
+                                              Figure is made outside pyplot, so no
+                                              display or GUI backend is needed and
+                                              nothing is left open.
+
+    Returns:
+    matplotlib.figure.Figure: The figure.
+    """
+    if fig is None:
+        fig = Figure(figsize=figsize)
+    heatmap, bars = fig.subplots(2, 1)
+
+    # Each pixel row is a bin of consecutive rows, shaded by its fraction missing
+    binned = report.binned
+    image = heatmap.imshow(binned.to_numpy(dtype=float), aspect='auto', cmap='viridis',
+                           vmin=0, vmax=1, interpolation='nearest')
+    heatmap.set_xticks(range(len(binned.columns)))
+    heatmap.set_xticklabels(binned.columns, rotation=90, fontsize=7)
+    heatmap.set_yticks([])
+    heatmap.set_title(f"Missing Data Heatmap - {dataset_name}")
+    heatmap.set_xlabel("Columns")
+    heatmap.set_ylabel(f"Rows ({len(binned)} bins of ~{report.n_rows // max(len(binned), 1)})")
+    fig.colorbar(image, ax=heatmap, label="Fraction missing")
+
+    # Bar plot of missing data by column
+    percentages = report.missing_columns['percentage']
+    bars.bar(range(len(percentages)), percentages.to_numpy(), color='skyblue')
+    bars.set_xticks(range(len(percentages)))
+    bars.set_xticklabels(percentages.index, rotation=45, ha='right')
+    bars.set_title(f"Percentage of Missing Data by Variable - {dataset_name}")
+    bars.set_xlabel("Variables")
+    bars.set_ylabel("Percentage Missing (%)")
+
+    fig.tight_layout()
+    return fig
+
+
+def report_missing_data(df, dataset_name="Dataset", output=None, show=None, max_bins=500,
+                        file_format=None, dpi=100):
     """
     Reports missing data in a dataset with details and visualizations.
+
+    The statistics come from missing_data_report and the heatmap from its row
+    bins, so the cost of drawing does not grow with the number of rows.
     
     Parameters:
     - df: pandas DataFrame - The dataset to analyze
     - dataset_name: str - Name of the dataset for reporting (default: "Dataset")
+    - output: str or file-like - Path or buffer (e.g. io.BytesIO) to write the
+      figure to, in file_format or the format of the path's extension
+    - show: bool - Show the figure with plt.show(). By default it is shown when no
+      output is given and the matplotlib backend can display figures, so batch
+      servers never block on it
+    - max_bins: int - Largest number of row bins in the heatmap
+    - file_format: str - Image format for output, e.g. 'png' or 'svg'
+    - dpi: int - Resolution of the written figure
     
     Returns:
-    - None: Prints results and displays visualizations
+    - MissingDataReport: The structured report; the text report is also printed
     """
-    
-    # Calculate total number of entries
-    total_entries = df.size  # Total number of cells (rows * columns)
-    total_rows = df.shape[0]
-    total_cols = df.shape[1]
-    
-    # Identify variables with missing data
-    missing_by_column = df.isnull().sum()  # Count of missing values per column
-    missing_percent_by_column = (missing_by_column / total_rows) * 100  # Percentage per column
-    
-    # Filter to columns with missing data
-    missing_columns = missing_by_column[missing_by_column > 0]
-    missing_percent_columns = missing_percent_by_column[missing_by_column > 0]
-    
-    # Calculate total missing data
-    total_missing = missing_by_column.sum()  # Total count of missing values
-    total_missing_percent = (total_missing / total_entries) * 100  # Total percentage
-    
-    # Print report
-    print(f"### Missing Data Report for {dataset_name} ###")
-    print(f"Total Rows: {total_rows}, Total Columns: {total_cols}")
-    print(f"Total Entries (cells): {total_entries}")
-    print("\n#### Variables with Missing Data ####")
-    if len(missing_columns) > 0:
-        for col, count in missing_columns.items():
-            percent = missing_percent_by_column[col]
-            print(f"{col}: {count} missing values ({percent:.2f}%)")
-    else:
-        print("No missing data found in any variable.")
-    
-    print(f"\n#### Overall Missing Data ####")
-    print(f"Total Missing Values: {total_missing}")
-    print(f"Total Missing Percentage: {total_missing_percent:.2f}%")
-    
+    report = missing_data_report(df, max_bins=max_bins)
+    print(report.text(dataset_name))
 
-    # Visualizations
-    plt.figure(figsize=(12, 8))
-    
-    # Heatmap of missing data
-    plt.subplot(2, 1, 1)
-    sns.heatmap(df.isnull(), cbar=False, cmap='viridis', yticklabels=False)
-    plt.title(f"Missing Data Heatmap - {dataset_name}")
-    plt.xlabel("Columns")
-    plt.ylabel("Rows")
-    
-    # Bar plot of missing data by column
-    plt.subplot(2, 1, 2)
-    missing_percent_columns.plot(kind='bar', color='skyblue')
-    plt.title(f"Percentage of Missing Data by Variable - {dataset_name}")
-    plt.xlabel("Variables")
-    plt.ylabel("Percentage Missing (%)")
-    plt.xticks(rotation=45, ha='right')
-    
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    if show is None:
+        show = output is None and matplotlib.get_backend().lower() not in _FILE_BACKENDS
+    if show:
+        plot_missing_data(report, dataset_name, fig=plt.figure(figsize=(12, 8)))
+        plt.show()
+    if output is not None:
+        fig = plot_missing_data(report, dataset_name)
+        fig.savefig(output, format=file_format, dpi=dpi)
+    return report
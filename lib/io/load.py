@@ -1,25 +1,232 @@
+import hashlib
+import io
 import os 
+import numpy as np
 import pandas as pd
 
-def load_data(data_path="../data/raw"):
-    """Load the credit scoring dataset."""
+from lib.io.schema import RAW_SCHEMA, DEFAULT_COLUMNS
+from lib.io.save import FORMATS, detect_format, save_mapped
+
+
+def csv_byte_ranges(file_path, n_parts):
+    """
+    Split a CSV file into up to n_parts byte ranges that start and end on line
+    boundaries, for reading the parts in parallel with read_raw_csv(byte_range=...).
+
+    The first range starts after the header line. Records must not contain embedded
+    newlines, which holds for the Kaggle files.
+
+    Returns:
+    list: (start, end) byte offsets, in file order.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        f.readline()
+        boundaries = [f.tell()]
+        body = size - boundaries[0]
+        for i in range(1, n_parts):
+            f.seek(max(boundaries[0] + body * i // n_parts - 1, boundaries[-1]))
+            f.readline()
+            if f.tell() >= size:
+                break
+            if f.tell() > boundaries[-1]:
+                boundaries.append(f.tell())
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def raw_columns(file_path, columns=None):
+    """
+    Return the columns read_raw_csv reads from a file, from its header line: the
+    requested columns that are in the file, in file order.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    columns (list, optional): Requested columns, defaults to DEFAULT_COLUMNS.
+
+    Returns:
+    list: The column names.
+    """
+    if columns is None:
+        columns = DEFAULT_COLUMNS
+    header = pd.read_csv(file_path, nrows=0).columns
+    return [col for col in header if col in columns]
+
+
+def read_raw_csv(file_path, columns=None, chunksize=None, engine=None, byte_range=None):
+    """
+    Read a raw credit score CSV with the declared schema in lib.io.schema.
+
+    Only the requested columns are parsed, each with its declared dtype, so nothing
+    is inferred and the identifier columns are skipped at parse time.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    columns (list, optional): Columns to read. Defaults to every schema column except
+                              the identifiers. Columns missing from the file (such as
+                              Credit_Score in test.csv) are skipped.
+    chunksize (int, optional): If given, return an iterator over chunks of this many rows.
+    engine (str, optional): CSV parser engine, e.g. 'pyarrow' for the multithreaded
+                            Arrow reader. Cannot be combined with chunksize.
+    byte_range (tuple, optional): (start, end) offsets from csv_byte_ranges; only the
+                                  rows in that part of the file are read.
+
+    Returns:
+    pd.DataFrame or TextFileReader: The data, or a chunk iterator if chunksize is set.
+    """
+    usecols = raw_columns(file_path, columns)
+    dtype = {col: RAW_SCHEMA[col] for col in usecols if col in RAW_SCHEMA}
+
+    kwargs = {'usecols': usecols, 'dtype': dtype, 'chunksize': chunksize}
+    if engine is not None:
+        kwargs['engine'] = engine
+    if byte_range is not None:
+        start, end = byte_range
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            source = io.BytesIO(f.read(end - start))
+        header = pd.read_csv(file_path, nrows=0).columns
+        return pd.read_csv(source, header=None, names=list(header), **kwargs)
+    return pd.read_csv(file_path, **kwargs)
+
+
+def group_chunks(chunks, key):
+    """
+    Re-cuts a stream of chunks so that no value of key is split between two chunks,
+    e.g. so that each chunk holds every monthly row of its customers.
+
+    The rows at the end of a chunk that share the chunk's last key are held back and
+    put in front of the next chunk. This assumes the rows of each key are contiguous
+    in the stream, which holds for Customer_ID in the raw files.
+
+    Parameters:
+    chunks (iterable): DataFrame chunks, e.g. from read_raw_csv(..., chunksize=...).
+    key (str): The column whose values must not be split.
+
+    Yields:
+    pd.DataFrame: Chunks that end on a key boundary.
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None and len(carry):
+            chunk = pd.concat([carry, chunk])
+        if len(chunk) == 0:
+            continue
+        keys = chunk[key].to_numpy()
+        # Start of the trailing run of rows with the last key
+        differs = np.flatnonzero(keys != keys[-1])
+        tail = differs[-1] + 1 if len(differs) else 0
+        carry = chunk.iloc[tail:]
+        if tail:
+            yield chunk.iloc[:tail]
+    if carry is not None and len(carry):
+        yield carry
+
+
+def read_columnar(file_path, columns=None, arrow_dtypes=False):
+    """
+    Read a Parquet, Feather or Arrow file written by lib.io.save.
+
+    The file is memory-mapped and only the requested columns are read. Numeric columns
+    without missing values are converted to pandas without copying where Arrow allows
+    it, and the Arrow buffers are released column by column during the conversion.
+
+    Parameters:
+    file_path (str): Path to a .parquet, .feather or .arrow file. Uncompressed .arrow
+                     files (see lib.io.save.save_mapped) are read without decoding.
+    columns (list, optional): Columns to read (default: all).
+    arrow_dtypes (bool): If True, keep every column Arrow-backed (pd.ArrowDtype), which
+                         avoids the conversion entirely.
+
+    Returns:
+    pd.DataFrame: The data, with the dtypes and categoricals it was saved with.
+    """
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if detect_format(file_path) == 'parquet':
+        table = pq.read_table(file_path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+
+    if arrow_dtypes:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def cache_path(file_path, cache_dir, **options):
+    """
+    Return the path of the memory-mapped cache of a file in cache_dir.
+
+    The name includes a hash of the file's absolute path, size and modification time
+    and of the read options, so a changed source file or different options never
+    reuse a stale cache.
+    """
+    stat = os.stat(file_path)
+    key = repr((os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, sorted(options.items())))
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir, f"{name}.{digest}.arrow")
+
+
+def load_data(data_path="../data/raw", typed=False, columns=None, engine=None, cache_dir=None):
+    """
+    Load the credit scoring dataset.
+
+    Parameters:
+    data_path (str): A CSV, Parquet or Feather file, or a directory holding exactly
+                     one such file. The format is detected from the extension.
+    typed (bool): If True, read CSV files with the declared schema (see read_raw_csv):
+                  the identifier columns are skipped and text columns become categoricals.
+    columns (list, optional): Columns to read (default: all, or the schema's default
+                              columns when typed is True).
+    engine (str, optional): CSV parser engine when typed is True, e.g. 'pyarrow'.
+    cache_dir (str, optional): If given, a CSV file is parsed once and kept in this
+                               directory as an uncompressed Arrow file; later calls
+                               (after a kernel restart, or from other processes)
+                               memory-map that file instead of parsing the CSV again.
+    """
     # Check if the data path is a file
     if os.path.isfile(data_path):
         print(f"Loading data from file: {data_path}")
-        return pd.read_csv(data_path)
+        return _read(data_path, typed, columns, engine, cache_dir)
     
     # Check if the data path is a directory
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Data directory '{data_path}' not found.")
     
-    # Look for CSV files in the data directory
-    csv_files = [f for f in os.listdir(data_path) if f.endswith('.csv')]
+    # Look for data files in the data directory
+    data_files = [f for f in os.listdir(data_path) if os.path.splitext(f)[1].lower() in FORMATS]
     
-    if not csv_files:
-        raise FileNotFoundError(f"No CSV files found in '{data_path}'.")
+    if not data_files:
+        raise FileNotFoundError(f"No CSV, Parquet or Feather files found in '{data_path}'.")
+    # The order of os.listdir depends on the filesystem, so which file comes first
+    # is not a choice
+    if len(data_files) > 1:
+        raise ValueError(f"'{data_path}' holds several data files ({', '.join(sorted(data_files))}); "
+                         f"pass the path of the one to load.")
     
-    # Load the first CSV file found
-    file_path = os.path.join(data_path, csv_files[0])
+    file_path = os.path.join(data_path, data_files[0])
     print(f"Loading data from: {file_path}")
     
-    return pd.read_csv(file_path)
+    return _read(file_path, typed, columns, engine, cache_dir)
+
+
+def _read(file_path, typed, columns, engine, cache_dir=None):
+    if detect_format(file_path) != 'csv':
+        return read_columnar(file_path, columns=columns)
+
+    if cache_dir is not None:
+        cached = cache_path(file_path, cache_dir, typed=typed, columns=columns)
+        if not os.path.exists(cached):
+            os.makedirs(cache_dir, exist_ok=True)
+            df = _read(file_path, typed, columns, engine)
+            # Write to a temporary name first so other processes never map a partial file
+            tmp_path = f"{cached}.{os.getpid()}.tmp"
+            save_mapped(df, tmp_path)
+            os.replace(tmp_path, cached)
+        return read_columnar(cached)
+
+    if typed:
+        return read_raw_csv(file_path, columns=columns, engine=engine)
+    return pd.read_csv(file_path, usecols=columns)
@@ -0,0 +1,188 @@
+import os
+
+# File extensions of the supported output formats
+FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'arrow',
+}
+
+
+def detect_format(path):
+    """
+    Return the format ('csv', 'parquet', 'feather' or 'arrow') of a path from its extension.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file extension '{ext}', expected one of {sorted(FORMATS)}.")
+    return FORMATS[ext]
+
+
+def _to_arrow(df, schema=None, keep_nan=False):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if keep_nan:
+        # Store NaN as a float value rather than as a null, so the column has no
+        # validity bitmap and can be handed to pandas without a copy
+        for i, col in enumerate(df.columns):
+            if df[col].dtype.kind == 'f':
+                table = table.set_column(i, table.field(i), pa.array(df[col].to_numpy(), from_pandas=False))
+    if schema is not None and not table.schema.equals(schema):
+        # Chunks can differ in their categories or in a column that happened to be
+        # all missing; the file keeps the schema of the first chunk
+        table = table.cast(schema)
+    return table
+
+
+def save_parquet(df, path, compression='snappy', compression_level=None, row_group_size=None):
+    """
+    Save a DataFrame as Parquet, keeping dtypes and categoricals.
+
+    Parameters:
+    df (pd.DataFrame): The data to save.
+    path (str): Output file path.
+    compression (str): Codec, e.g. 'snappy', 'zstd', 'gzip' or None (default 'snappy').
+    compression_level (int, optional): Level for codecs that support it, e.g. zstd.
+    row_group_size (int, optional): Maximum rows per row group. Smaller row groups let
+                                    readers skip more data, larger ones compress better.
+    """
+    import pyarrow.parquet as pq
+
+    pq.write_table(_to_arrow(df), path, compression=compression,
+                   compression_level=compression_level, row_group_size=row_group_size)
+
+
+def save_feather(df, path, compression='lz4', compression_level=None, chunksize=None):
+    """
+    Save a DataFrame as Feather (Arrow IPC), keeping dtypes and categoricals.
+
+    Parameters:
+    df (pd.DataFrame): The data to save.
+    path (str): Output file path.
+    compression (str): 'lz4', 'zstd' or 'uncompressed' (default 'lz4'). Uncompressed
+                       files can be memory-mapped without decoding.
+    compression_level (int, optional): Level for zstd.
+    chunksize (int, optional): Maximum rows per record batch.
+    """
+    import pyarrow.feather as feather
+
+    feather.write_feather(_to_arrow(df), path, compression=compression,
+                          compression_level=compression_level, chunksize=chunksize)
+
+
+def save_mapped(df, path, chunksize=None):
+    """
+    Save a DataFrame as an uncompressed Arrow IPC file (.arrow) meant to be
+    memory-mapped by lib.io.load.read_columnar.
+
+    Nothing has to be decoded on load: the numeric columns are read straight from the
+    mapped pages, and processes that open the same file share those pages through
+    the OS page cache instead of each holding a private copy.
+
+    Parameters:
+    df (pd.DataFrame): The data to save.
+    path (str): Output file path.
+    chunksize (int, optional): Maximum rows per record batch.
+    """
+    import pyarrow.feather as feather
+
+    feather.write_feather(_to_arrow(df, keep_nan=True), path, compression='uncompressed',
+                          chunksize=chunksize)
+
+
+def save_data(df, path, **options):
+    """
+    Save a DataFrame in the format given by the file extension (.csv, .parquet,
+    .feather or .arrow). Extra options are passed to the format's writer.
+    """
+    file_format = detect_format(path)
+    if file_format == 'parquet':
+        save_parquet(df, path, **options)
+    elif file_format == 'feather':
+        save_feather(df, path, **options)
+    elif file_format == 'arrow':
+        save_mapped(df, path, **options)
+    else:
+        df.to_csv(path, index=False, **options)
+
+
+class ChunkWriter:
+    """
+    Writes a DataFrame chunk by chunk to a single CSV, Parquet, Feather or
+    memory-mappable Arrow file.
+
+    Each Parquet chunk becomes one or more row groups and each Feather chunk a record
+    batch, so chunked output can be read back the same way as a file written at once.
+    compression defaults to the format's default ('snappy' for Parquet, 'lz4' for Feather);
+    .arrow files are always written uncompressed, like save_mapped.
+
+    Usage:
+        with ChunkWriter("data/processed/train.parquet") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path, compression=None, compression_level=None, row_group_size=None):
+        self.path = path
+        self.format = detect_format(path)
+        self.compression = compression
+        self.compression_level = compression_level
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._categories = {}
+
+    def write(self, df):
+        if self.format == 'csv':
+            # The first chunk creates the file with a header, the rest are appended
+            first = self.rows == 0
+            df.to_csv(self.path, index=False, mode='w' if first else 'a', header=first)
+        else:
+            table = _to_arrow(self._extend_categories(df), self._schema,
+                              keep_nan=self.format == 'arrow')
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = self._open(table.schema)
+            if self.format == 'parquet':
+                self._writer.write_table(table, row_group_size=self.row_group_size)
+            else:
+                self._writer.write_table(table)
+        self.rows += len(df)
+
+    def _extend_categories(self, df):
+        # Arrow IPC files allow a dictionary to grow between batches but not to change,
+        # so every chunk is recoded to the categories seen so far plus its new ones
+        updates = {}
+        for col in df.select_dtypes('category').columns:
+            known = self._categories.setdefault(col, [])
+            seen = set(known)
+            known.extend(c for c in df[col].cat.categories if c not in seen)
+            updates[col] = df[col].cat.set_categories(known)
+        return df.assign(**updates) if updates else df
+
+    def _open(self, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.format == 'parquet':
+            return pq.ParquetWriter(self.path, schema, compression=self.compression or 'snappy',
+                                    compression_level=self.compression_level)
+        compression = 'uncompressed' if self.format == 'arrow' else self.compression or 'lz4'
+        options = pa.ipc.IpcWriteOptions(
+            compression=None if compression == 'uncompressed' else compression,
+            emit_dictionary_deltas=True)
+        return pa.ipc.new_file(self.path, schema, options=options)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
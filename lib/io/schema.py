@@ -0,0 +1,44 @@
+# Declared layout of the raw Kaggle credit score files (train.csv / test.csv).
+# Reading with these dtypes avoids per-column type inference, keeps the dirty
+# numeric columns as text for transform_data_types to clean, and stores the
+# low-cardinality text columns as categoricals.
+
+# Identifier columns, not used by the cleaning pipeline
+IDENTIFIER_COLUMNS = ['ID', 'Customer_ID', 'Name', 'SSN']
+
+# Only present in train.csv
+TARGET_COLUMN = 'Credit_Score'
+
+RAW_SCHEMA = {
+    'ID': str,
+    'Customer_ID': str,
+    'Month': 'category',
+    'Name': str,
+    'Age': str,
+    'SSN': str,
+    'Occupation': 'category',
+    'Annual_Income': str,
+    'Monthly_Inhand_Salary': 'float64',
+    'Num_Bank_Accounts': 'int64',
+    'Num_Credit_Card': 'int64',
+    'Interest_Rate': 'int64',
+    'Num_of_Loan': str,
+    'Type_of_Loan': 'category',
+    'Delay_from_due_date': 'int64',
+    'Num_of_Delayed_Payment': str,
+    'Changed_Credit_Limit': str,
+    'Num_Credit_Inquiries': 'float64',
+    'Credit_Mix': 'category',
+    'Outstanding_Debt': str,
+    'Credit_Utilization_Ratio': 'float64',
+    'Credit_History_Age': 'category',
+    'Payment_of_Min_Amount': 'category',
+    'Total_EMI_per_month': 'float64',
+    'Amount_invested_monthly': str,
+    'Payment_Behaviour': 'category',
+    'Monthly_Balance': str,
+    'Credit_Score': 'category',
+}
+
+# Columns read by default: everything except the identifiers
+DEFAULT_COLUMNS = [col for col in RAW_SCHEMA if col not in IDENTIFIER_COLUMNS]
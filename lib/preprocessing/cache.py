@@ -0,0 +1,289 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+import time
+import types
+
+import pandas as pd
+
+from lib.io.load import read_columnar
+from lib.io.save import save_mapped
+from lib.preprocessing.profiling import profile_stage
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """
+    Return the SHA-256 of a file's contents, read in blocks so memory stays flat.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _package(value):
+    # Top-level package of a function or class, e.g. 'lib'
+    return (getattr(value, '__module__', None) or '').split('.')[0]
+
+
+def source_fingerprint(func, _seen=None):
+    """
+    Return a text fingerprint of a function's behaviour: its own source, plus the
+    source of the functions and classes and the value of the constants it uses,
+    followed recursively through every module of its package (lib), and the values
+    it closes over.
+
+    Editing handle_missing_data changes only its own fingerprint, while editing a
+    helper such as transform_unique, or coerce_numeric and its patterns in
+    lib.preprocessing.numeric, changes the fingerprint of every stage using it.
+    """
+    _seen = set() if _seen is None else _seen
+    if func in _seen:
+        return ''
+    _seen.add(func)
+
+    if isinstance(func, type):
+        # A class: its source, plus what its methods use
+        parts = [inspect.getsource(func)]
+        for value in vars(func).values():
+            value = getattr(value, '__func__', value)
+            if isinstance(value, property):
+                value = value.fget
+            if isinstance(value, types.FunctionType):
+                parts.append(source_fingerprint(value, _seen))
+        return '\n'.join(parts)
+
+    parts = [inspect.getsource(func)]
+    package = _package(func)
+    values = dict(func.__globals__)
+    # Closures, such as the steps built by lib.preprocessing.pipeline, depend on
+    # the values they close over as much as on their source
+    for name, cell in zip(func.__code__.co_freevars, func.__closure__ or ()):
+        try:
+            values[name] = cell.cell_contents
+        except ValueError:
+            continue
+    code_objects = [func.__code__]
+    names = set(func.__code__.co_freevars)
+    while code_objects:
+        # Walk nested functions and lambdas as well
+        code = code_objects.pop()
+        names.update(code.co_names)
+        code_objects.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+
+    for name in sorted(names):
+        value = values.get(name)
+        if isinstance(value, (types.FunctionType, type)) and _package(value) == package:
+            parts.append(source_fingerprint(value, _seen))
+        elif isinstance(value, re.Pattern):
+            parts.append(f"{name}={value.pattern!r}")
+        elif isinstance(value, (str, int, float, list, tuple, dict)):
+            parts.append(f"{name}={value!r}")
+    return '\n'.join(parts)
+
+
+def _param_repr(value):
+    # Fitted objects such as CleaningStatistics are keyed by their fitted values
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    return repr(value)
+
+
+class StageCache:
+    """
+    Content-addressed cache of the outputs of the cleaning pipeline.
+
+    Each unit of a compiled plan (the row selection, then every group of steps) is
+    stored under a key built from the key of its input (the hash of the raw file for
+    the row selection, the selection's key for a group), the source fingerprints of
+    its steps and the fitted statistics. Because keys never depend on the data
+    itself, run_plan can work out which outputs are already cached before reading
+    anything, and only reads the raw file when some unit has to be computed.
+
+    Outputs are stored as uncompressed Arrow files (see lib.io.save.save_mapped).
+    When the cache grows past max_bytes, the least recently used outputs are evicted.
+
+    Attributes:
+    stats (dict): Counts of 'hits' and 'misses', plus 'bytes_saved' (size of the
+                  outputs served from the cache) and 'seconds_saved' (time the cached
+                  units took when they were computed).
+    """
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'bytes_saved': 0, 'seconds_saved': 0.0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, 'index.json')
+        self._index = self._read_index()
+
+    def _read_index(self):
+        if not os.path.exists(self._index_path):
+            return {'files': {}, 'entries': {}}
+        with open(self._index_path) as f:
+            return json.load(f)
+
+    def _write_index(self):
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp_path, self._index_path)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.arrow")
+
+    def input_key(self, file_path, reader=None, **read_options):
+        """
+        Return the key of a raw input file. The content hash is remembered per
+        (path, size, mtime), so an unchanged file is not hashed again.
+
+        Parameters:
+        file_path (str): The raw file.
+        reader (callable, optional): The function that reads it, e.g. read_raw_csv. Its
+                                     source fingerprint is part of the key, so a change
+                                     to the reader or to the schema and column list it
+                                     uses (RAW_SCHEMA, DEFAULT_COLUMNS) gives a new key.
+        read_options: Other arguments of the read, such as the columns and engine.
+        """
+        stat = os.stat(file_path)
+        file_id = f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        if file_id not in self._index['files']:
+            self._index['files'][file_id] = file_hash(file_path)
+            self._write_index()
+        reader_fingerprint = source_fingerprint(reader) if reader is not None else None
+        key = repr((self._index['files'][file_id], reader_fingerprint, sorted(read_options.items())))
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def steps_key(self, steps, params, upstream_key):
+        """Return the key of the output of a list of pipeline steps."""
+        params = {name: _param_repr(value) for name, value in sorted(params.items())}
+        spec = [[step.name, step.inputs, step.output, source_fingerprint(step.func)]
+                for step in steps]
+        key = json.dumps([upstream_key, spec, params], sort_keys=True, default=str)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def contains(self, key):
+        return key in self._index['entries'] and os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Load a cached output and record the hit."""
+        entry = self._index['entries'][key]
+        df = read_columnar(self._path(key))
+        entry['last_used'] = time.time()
+        self.stats['hits'] += 1
+        self.stats['bytes_saved'] += entry['bytes']
+        self.stats['seconds_saved'] += entry['seconds']
+        self._write_index()
+        return df
+
+    def put(self, key, df, seconds):
+        """Store an output, then evict old entries if the cache is too large."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        save_mapped(df, tmp_path)
+        os.replace(tmp_path, path)
+        self._index['entries'][key] = {
+            'bytes': os.path.getsize(path),
+            'seconds': seconds,
+            'last_used': time.time(),
+        }
+        self._evict(keep=key)
+        self._write_index()
+
+    def _evict(self, keep=None):
+        if self.max_bytes is None:
+            return
+        entries = self._index['entries']
+        total = sum(entry['bytes'] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries.pop(key)['bytes']
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+
+    def run_plan(self, plan, input_key, load, stats=None, log=None, profiler=None):
+        """
+        Run a compiled cleaning plan (see lib.preprocessing.pipeline.Plan), reusing
+        cached outputs.
+
+        The plan is cached in units: the row selection (the steps the filters depend
+        on, the filters, and the output columns that no later step writes), and each
+        of the plan's groups of steps. A group's key is built from the selection's key
+        and the group's own steps, so editing one step recomputes only its group.
+
+        Parameters:
+        plan (Plan): The plan, for the columns load returns.
+        input_key (str): Key of the input, usually from input_key.
+        load (callable): Returns the input DataFrame; only called if a unit is not cached.
+        stats (CleaningStatistics, optional): Fitted statistics, if a step uses them.
+        log (callable, optional): Called with a message for every unit.
+        profiler (StageProfiler, optional): If given, the run is recorded as a
+                                            'pipeline' stage, with the load, the cache
+                                            reads and writes and every step that runs
+                                            below it.
+
+        Returns:
+        pd.DataFrame: The plan's output, with a RangeIndex.
+        """
+        if stats is None and plan.uses_stats:
+            raise ValueError("Caching a plan that uses statistics needs fitted stats.")
+        log = log or (lambda *args: None)
+        selection_key = self.steps_key(plan.pre_filter + plan.filters,
+                                       {'columns': plan.selected_columns, 'stats': stats},
+                                       input_key)
+        units = [('select_rows', selection_key, None)]
+        for group in plan.groups:
+            outputs = [col for col in dict.fromkeys(step.output for step in group)
+                       if col in plan.output_columns]
+            units.append((', '.join(outputs), self.steps_key(group, {'stats': stats}, selection_key),
+                          (group, outputs)))
+
+        with profile_stage(profiler, 'pipeline') as pipeline_record:
+            # Read the cached units first, so that storing new ones cannot evict them
+            columns = {}
+            missing = []
+            for name, key, group in units:
+                if self.contains(key):
+                    with profile_stage(profiler, f"cache_get({name})") as record:
+                        df = self.get(key)
+                        record['rows_out'] = len(df)
+                    columns.update(df.items())
+                    log(f"{name}: cached ✅")
+                else:
+                    missing.append((name, key, group))
+
+            if missing:
+                started = time.perf_counter()
+                with profile_stage(profiler, 'load') as record:
+                    df = load()
+                    record['rows_out'] = len(df)
+                pipeline_record['rows_in'] = len(df)
+                selected = plan.select_rows(df, stats, profiler)
+                del df
+                selection_seconds = time.perf_counter() - started
+                for name, key, group in missing:
+                    if group is None:
+                        df = pd.DataFrame({col: selected[col] for col in plan.selected_columns})
+                        seconds = selection_seconds
+                    else:
+                        steps, outputs = group
+                        started = time.perf_counter()
+                        local = plan.run_group(steps, selected, stats, profiler)
+                        df = pd.DataFrame({col: local[col] for col in outputs})
+                        seconds = time.perf_counter() - started
+                    df = df.reset_index(drop=True)
+                    self.stats['misses'] += 1
+                    with profile_stage(profiler, f"cache_put({name})", rows_in=len(df)):
+                        self.put(key, df, seconds)
+                    columns.update(df.items())
+                    log(f"{name}: computed ✅")
+
+            result = pd.DataFrame({col: columns[col] for col in plan.output_columns})
+            pipeline_record['rows_out'] = len(result)
+        return result
@@ -1,9 +1,29 @@
+import re
 import pandas as pd
 import numpy as np
 
-def drop_columns(df, columns_to_drop):
-    # Drop columns, ignoring errors if a column does not exist
-    df = df.drop(columns=columns_to_drop, axis=1, errors='ignore')
+from lib.preprocessing.numeric import coerce_numeric
+
+# Numerical columns that handle_missing_data imputes with their median
+MEDIAN_IMPUTED_COLUMNS = [
+    'Credit_History_Age',
+    'Monthly_Inhand_Salary',
+    'Changed_Credit_Limit',
+    'Num_Credit_Inquiries',
+    'Amount_invested_monthly',
+    'Monthly_Balance'
+]
+
+def drop_columns(df, columns_to_drop, copy=True):
+    # Drop columns, ignoring errors if a column does not exist.
+    # With copy=False the columns are deleted from df itself, which only releases
+    # their data instead of building a new frame from the remaining columns.
+    if copy:
+        df = df.drop(columns=columns_to_drop, errors='ignore')
+    else:
+        for col in columns_to_drop:
+            if col in df.columns:
+                del df[col]
 
     # Verify and print confirmation for dropped columns
     for col in columns_to_drop:
@@ -13,175 +33,320 @@ def drop_columns(df, columns_to_drop):
     return df  
 
 
-def transform_data_types(df):
+# Column-level steps. The stage functions below apply them to a whole DataFrame,
+# lib.preprocessing.pipeline declares them one column at a time.
+
+def parse_amount(series):
+    # Remove non-numeric characters except '.', convert to float
+    return coerce_numeric(series, 'strip')
+
+
+def parse_count(series):
+    # Convert to numeric, fill NaN with 0, convert to int
+    return coerce_numeric(series, 'strict').fillna(0).astype(int)
+
+
+def parse_number(series):
+    # Convert to numeric, coerce errors to NaN
+    return coerce_numeric(series, 'strict')
+
+
+def clean_age(ages, age_median, median_age):
+    # Fill missing ages with age_median, then replace negative ages with median_age
+    ages = ages.fillna(age_median).astype(int)
+    return ages.mask(ages < 0, median_age).astype(int)
+
+
+def age_in_range(ages):
+    # Rows with an Age between 0 and 100 are kept
+    return (ages >= 0) & (ages <= 100)
+
+
+def fill_unknown(series):
+    return series.fillna("Unknown")
+
+
+def transform_data_types(df, stats=None, copy=True):
     """
     Transforms the data types of specified columns in the DataFrame and cleans the 'Age' column.
     
     Parameters:
     df (pd.DataFrame): The input DataFrame to be transformed.
+    stats (CleaningStatistics, optional): Fitted statistics to take the Age medians from.
+                                          If None, they are computed from df.
+    copy (bool): If False, the Age filter returns df itself when every row passes
+                 and otherwise a plain row selection that later stages may modify.
     
     Returns:
     pd.DataFrame: The transformed DataFrame with corrected data types and cleaned 'Age' column.
     """
     # Annual_Income: remove non-numeric characters except '.', convert to float
-    df['Annual_Income'] = df['Annual_Income'].astype(str).str.replace(r'[^\d.]', '', regex=True).astype(float)
+    df['Annual_Income'] = parse_amount(df['Annual_Income'])
     
     # Num_of_Loan: convert to numeric, fill NaN with 0, convert to int
-    df['Num_of_Loan'] = pd.to_numeric(df['Num_of_Loan'], errors='coerce').fillna(0).astype(int)
+    df['Num_of_Loan'] = parse_count(df['Num_of_Loan'])
     
     # Num_of_Delayed_Payment: similar to Num_of_Loan
-    df['Num_of_Delayed_Payment'] = pd.to_numeric(df['Num_of_Delayed_Payment'], errors='coerce').fillna(0).astype(int)
+    df['Num_of_Delayed_Payment'] = parse_count(df['Num_of_Delayed_Payment'])
     
     # Changed_Credit_Limit: convert to numeric, coerce errors to NaN
-    df['Changed_Credit_Limit'] = pd.to_numeric(df['Changed_Credit_Limit'], errors='coerce')
+    df['Changed_Credit_Limit'] = parse_number(df['Changed_Credit_Limit'])
     
     # Outstanding_Debt: remove non-numeric characters except '.', convert to float
-    df['Outstanding_Debt'] = df['Outstanding_Debt'].str.replace(r'[^\d.]', '', regex=True).astype(float)
+    df['Outstanding_Debt'] = parse_amount(df['Outstanding_Debt'])
     
     # Amount_invested_monthly: convert to numeric, coerce errors to NaN
-    df['Amount_invested_monthly'] = pd.to_numeric(df['Amount_invested_monthly'], errors='coerce')
+    df['Amount_invested_monthly'] = parse_number(df['Amount_invested_monthly'])
     
     # Monthly_Balance: convert to numeric, coerce errors to NaN
-    df['Monthly_Balance'] = pd.to_numeric(df['Monthly_Balance'], errors='coerce')
+    df['Monthly_Balance'] = parse_number(df['Monthly_Balance'])
     
     # Age: convert to numeric, coerce errors to NaN
-    df['Age'] = pd.to_numeric(df['Age'], errors='coerce')
-    
-    # Compute median of non-NaN ages, default to 0 if all NaN
-    age_median = int(df['Age'].median()) if not df['Age'].isna().all() else 0
+    ages = parse_number(df['Age'])
     
-    # Fill NaN with median and convert to int
-    df['Age'] = df['Age'].fillna(age_median).astype(int)
+    if stats is not None:
+        age_median, median_age = stats.age_median, stats.median_age
+    else:
+        # Compute median of non-NaN ages, default to 0 if all NaN
+        age_median = int(ages.median()) if not ages.isna().all() else 0
+        # Compute median of non-negative ages after filling, default to 0 if there are none
+        filled = ages.fillna(age_median).astype(int)
+        median_age = int(filled[filled >= 0].median()) if (filled >= 0).any() else 0
     
-    # Compute median of non-negative ages, default to 0 if no non-negative ages
-    median_age = int(df[df['Age'] >= 0]['Age'].median()) if not df[df['Age'] >= 0].empty else 0
-    
-    # Replace negative ages with median_age
-    df['Age'] = df['Age'].apply(lambda x: median_age if x < 0 else x).astype(int)
+    # Fill NaN with age_median and replace negative ages with median_age
+    df['Age'] = clean_age(ages, age_median, median_age)
     
     # Drop rows where Age > 100 or Age < 0
-    df = df[(df['Age'] >= 0) & (df['Age'] <= 100)]
+    keep = age_in_range(df['Age'])
+    if copy:
+        df = df[keep]
+    elif not keep.all():
+        df = df.take(np.flatnonzero(keep.to_numpy()))
     
     return df
 
-def clean_categorical(df):
+def clean_categorical(df, copy=True):
     """
     Cleans and standardizes Categorical columns in the DataFrame for a data pipeline.
     
     Parameters:
     df (pd.DataFrame): The input DataFrame to be cleaned.
+    copy (bool): If False, df is cleaned in place and returned.
     
     Returns:
-    pd.DataFrame: The cleaned DataFrame.
+    pd.DataFrame: The cleaned DataFrame, with the cleaned columns as 'category' dtype.
     """
     # Create a copy to avoid modifying the original DataFrame
-    cleaned_df = df.copy()
-    
-    # Clean 'Occupation'
-    cleaned_df['Occupation'] = cleaned_df['Occupation'].replace("_______", "Unknown")
-    cleaned_df['Occupation'] = cleaned_df['Occupation'].str.title().str.strip()
-    
-    # Clean 'Credit_Mix'
-    cleaned_df['Credit_Mix'] = cleaned_df['Credit_Mix'].fillna("Unknown")
-    cleaned_df['Credit_Mix'] = cleaned_df['Credit_Mix'].replace("_", "Unknown")
-    cleaned_df['Credit_Mix'] = cleaned_df['Credit_Mix'].str.title().str.strip()
-    
-    # Clean 'Payment_of_Min_Amount'
-    cleaned_df['Payment_of_Min_Amount'] = cleaned_df['Payment_of_Min_Amount'].fillna("Unknown")
-    cleaned_df['Payment_of_Min_Amount'] = cleaned_df['Payment_of_Min_Amount'].replace("NM", "Unknown")
-    cleaned_df['Payment_of_Min_Amount'] = cleaned_df['Payment_of_Min_Amount'].str.title().str.strip()
-    
-    # Clean 'Payment_Behaviour'
-    cleaned_df['Payment_Behaviour'] = cleaned_df['Payment_Behaviour'].fillna("Unknown")
-    cleaned_df['Payment_Behaviour'] = cleaned_df['Payment_Behaviour'].replace("!@9#%8", "Unknown")
-    cleaned_df['Payment_Behaviour'] = cleaned_df['Payment_Behaviour'].str.replace("_", " ").str.title().str.strip()
-    
-    # Define mapping for Payment_Behaviour
-    duplicate_mapping = {
-        "Low Spent Small": "Low Spent Small Value Payments",
-        "High Spent Small": "High Spent Small Value Payments",
-        "Low Spent Large": "Low Spent Large Value Payments",
-        "Low Spent Medium": "Low Spent Medium Value Payments",
-        "High Spent Medium": "High Spent Medium Value Payments",
-        "High Spent Large": "High Spent Large Value Payments",
-        "Unknown": "Unknown"
-    }
-    cleaned_df['Payment_Behaviour'] = cleaned_df['Payment_Behaviour'].replace(duplicate_mapping)
+    cleaned_df = df.copy() if copy else df
+    
+    # Each chain runs on the distinct values only and the result is a categorical
+    # column, so the cost depends on the number of categories, not rows
+    cleaned_df['Occupation'] = clean_occupation(cleaned_df['Occupation'])
+    cleaned_df['Credit_Mix'] = clean_credit_mix(cleaned_df['Credit_Mix'])
+    cleaned_df['Payment_of_Min_Amount'] = clean_payment_of_min_amount(cleaned_df['Payment_of_Min_Amount'])
+    cleaned_df['Payment_Behaviour'] = clean_payment_behaviour(cleaned_df['Payment_Behaviour'])
     
     # Clean 'Credit_Score' if it exists
     if 'Credit_Score' in cleaned_df.columns:
-        cleaned_df['Credit_Score'] = cleaned_df['Credit_Score'].str.strip().str.title()
+        cleaned_df['Credit_Score'] = clean_credit_score(cleaned_df['Credit_Score'])
     
     return cleaned_df
 
 
+def clean_occupation(series):
+    return transform_unique(
+        series,
+        lambda s: s.replace("_______", "Unknown").str.title().str.strip(),
+        categorical=True
+    )
+
+
+def clean_credit_mix(series):
+    return transform_unique(
+        series,
+        lambda s: s.replace("_", "Unknown").str.title().str.strip(),
+        fill_value="Unknown",
+        categorical=True
+    )
+
+
+def clean_payment_of_min_amount(series):
+    return transform_unique(
+        series,
+        lambda s: s.replace("NM", "Unknown").str.title().str.strip(),
+        fill_value="Unknown",
+        categorical=True
+    )
+
+
+# Mapping of the truncated Payment_Behaviour values to the full ones
+PAYMENT_BEHAVIOUR_MAPPING = {
+    "Low Spent Small": "Low Spent Small Value Payments",
+    "High Spent Small": "High Spent Small Value Payments",
+    "Low Spent Large": "Low Spent Large Value Payments",
+    "Low Spent Medium": "Low Spent Medium Value Payments",
+    "High Spent Medium": "High Spent Medium Value Payments",
+    "High Spent Large": "High Spent Large Value Payments",
+    "Unknown": "Unknown"
+}
+
+
+def clean_payment_behaviour(series):
+    return transform_unique(
+        series,
+        lambda s: (s.replace("!@9#%8", "Unknown")
+                    .str.replace("_", " ").str.title().str.strip()
+                    .replace(PAYMENT_BEHAVIOUR_MAPPING)),
+        fill_value="Unknown",
+        categorical=True
+    )
+
+
+def clean_credit_score(series):
+    return transform_unique(series, lambda s: s.str.strip().str.title(), categorical=True)
+
+
+# "<years> <word> <word> <months> ..." -- the first and fourth whitespace-separated tokens
+CREDIT_HISTORY_PATTERN = re.compile(r'^\s*([+-]?\d+)\s+\S+\s+\S+\s+([+-]?\d+)(?:\s|$)')
+
+
+def transform_unique(series, func, fill_value=None, categorical=False):
+    """
+    Applies a column transformation to the distinct values of a column only.
+    
+    Text columns such as Occupation, Credit_History_Age and Type_of_Loan repeat a small
+    set of strings, so transforming the uniques and gathering the results back by code
+    scales with the cardinality instead of the row count.
+    
+    Parameters:
+    series (pd.Series): The column to transform.
+    func (callable): Takes a pd.Series of the distinct non-missing values and returns
+                     a pd.Series of the same length.
+    fill_value (optional): If given, missing values are filled with it before func is
+                           applied, like fillna followed by the transformation.
+                           Otherwise missing values stay missing.
+    categorical (bool): If True, return a 'category' column whose categories are the
+                        distinct transformed values, in sorted order.
+    
+    Returns:
+    pd.Series: The transformed column, with the index and name of series.
+    """
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+    if fill_value is not None:
+        # Missing values (code -1) point at the fill value appended to the uniques
+        codes = np.where(codes == -1, len(uniques), codes)
+        uniques = pd.concat([uniques, pd.Series([fill_value], dtype=object)], ignore_index=True)
+    result = func(uniques).to_numpy()
+    
+    if categorical:
+        # Several raw values can clean to the same string, so factorize again
+        result_codes, categories = pd.factorize(result, sort=True)
+        # Append -1 so that the code -1 (missing) stays missing
+        result_codes = np.append(result_codes, -1)
+        values = pd.Categorical.from_codes(result_codes[codes], categories=categories)
+    else:
+        # Append a NaN so that the code -1 (missing) maps to it
+        values = np.append(result, np.nan)[codes]
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def convert_to_months(series):
+    """
+    Converts Credit_History_Age strings such as "22 Years and 1 Months" to total months.
+    
+    Parameters:
+    series (pd.Series): The credit history age strings.
+    
+    Returns:
+    pd.Series: The total number of months as float, NaN for missing or malformed values.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        # An all-missing column is read as float
+        return pd.Series(np.nan, index=series.index, name=series.name)
+    
+    def parse(uniques):
+        parts = uniques.str.extract(CREDIT_HISTORY_PATTERN).astype(float)
+        return parts[0] * 12 + parts[1]
+    
+    return transform_unique(series, parse).astype(float)
+
+
+def normalize_loan_types(series):
+    """
+    Standardizes Type_of_Loan strings, e.g. "Auto Loan, and Personal Loan" becomes
+    "auto loan,personal loan".
+    
+    Parameters:
+    series (pd.Series): The loan type strings, without missing values.
+    
+    Returns:
+    pd.Series: The normalized strings.
+    """
+    return (series.str.lower()
+                  .str.replace('and ', '', regex=False)
+                  .str.replace(', ', ',', regex=False)
+                  .str.strip())
+
+
+MONTH_ORDER = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def convert_month(series):
+    # Map month names to numbers, 0 for missing or invalid values
+    month_mapping = {month: i for i, month in enumerate(MONTH_ORDER, start=1)}
+    return transform_unique(series, lambda s: s.map(month_mapping)).fillna(0).astype(int)
+
+
+def clean_loan_types(series):
+    return transform_unique(series, normalize_loan_types)
+
+
 def transform_special_columns(df):
     """
     Transforms specific columns in the DataFrame for a data pipeline.
     
     Parameters:
-    df (pd.DataFrame): The input DataFrame to be transformed.
+    df (pd.DataFrame): The input DataFrame to be transformed. The columns are
+                       replaced in df itself, no copy is made.
     
     Returns:
     pd.DataFrame: The transformed DataFrame.
     """
     # Month transformation: Map month names to numbers and handle invalid values
-    month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-                   'July', 'August', 'September', 'October', 'November', 'December']
-    month_mapping = {month: i for i, month in enumerate(month_order, start=1)}
-    df['Month'] = df['Month'].map(month_mapping).fillna(0).astype(int)
+    df['Month'] = convert_month(df['Month'])
     
     # Credit_History_Age transformation: Convert string to total months
-    def convert_to_months(age_str):
-        if pd.isna(age_str):
-            return np.nan
-        try:
-            parts = age_str.split()
-            years = int(parts[0])
-            months = int(parts[3])
-            total_months = (years * 12) + months
-            return total_months
-        except (IndexError, ValueError):
-            return np.nan
-    
-    df['Credit_History_Age'] = df['Credit_History_Age'].apply(convert_to_months).astype(float)
+    df['Credit_History_Age'] = convert_to_months(df['Credit_History_Age'])
     
     # Type_of_Loan transformation: Standardize format
-    df['Type_of_Loan'] = df['Type_of_Loan'].apply(
-        lambda x: x.lower().replace('and ', '').replace(', ', ',').strip() if pd.notna(x) else x
-    )
+    df['Type_of_Loan'] = clean_loan_types(df['Type_of_Loan'])
     
     return df
 
-def handle_missing_data(df):
+def handle_missing_data(df, stats=None, copy=True):
     """
     Handles missing data for specific columns in the DataFrame for use in a data pipeline.
     
     Parameters:
     df (pd.DataFrame): The input DataFrame to be processed.
+    stats (CleaningStatistics, optional): Fitted statistics to take the medians from.
+                                          If None, they are computed from df.
+    copy (bool): If False, missing values are filled in df itself and df is returned.
     
     Returns:
     pd.DataFrame: A new DataFrame with missing values handled.
     """
     # Create a copy to avoid modifying the original DataFrame
-    df_copy = df.copy()
+    df_copy = df.copy() if copy else df
     
     # Handle 'Type_of_Loan' (categorical) by filling with "Unknown"
-    df_copy['Type_of_Loan'] = df_copy['Type_of_Loan'].fillna("Unknown")
-    
-    # Define numerical columns to impute with their respective medians
-    numerical_cols = [
-        'Credit_History_Age',
-        'Monthly_Inhand_Salary',
-        'Changed_Credit_Limit',
-        'Num_Credit_Inquiries',
-        'Amount_invested_monthly',
-        'Monthly_Balance'
-    ]
+    df_copy['Type_of_Loan'] = fill_unknown(df_copy['Type_of_Loan'])
     
     # Impute missing values with median for each numerical column
-    for col in numerical_cols:
-        median_value = df_copy[col].median()
+    for col in MEDIAN_IMPUTED_COLUMNS:
+        median_value = stats.medians[col] if stats is not None else df_copy[col].median()
         df_copy[col] = df_copy[col].fillna(median_value)
     
     return df_copy
\ No newline at end of file
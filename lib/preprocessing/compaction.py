@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+
+from lib.io.schema import RAW_SCHEMA
+from lib.preprocessing.encoding import split_labels
+
+# The loan types in the cleaned Type_of_Loan strings (see normalize_loan_types),
+# in bit order: bit i of the bitmask is set when the row lists LOAN_TYPES[i]
+LOAN_TYPES = [
+    'auto loan',
+    'credit-builder loan',
+    'debt consolidation loan',
+    'home equity loan',
+    'mortgage loan',
+    'not specified',
+    'payday loan',
+    'personal loan',
+    'student loan',
+]
+
+# Bit set for any loan type that is not in LOAN_TYPES, so no token is lost silently
+OTHER_LOAN_BIT = len(LOAN_TYPES)
+
+# Compact dtypes of the cleaned numeric columns. They are declared instead of taken
+# from the values of each frame, so every chunk and partition of a file gets the same
+# dtypes and can be written to the same Parquet or Arrow schema. Month (0-12) and Age
+# (0-100 after the filter) are bounded by the cleaning; the counts leave room for
+# the outliers in the raw data (thousands of bank accounts or delayed payments).
+# Integer columns with missing values, such as Age and Num_of_Loan after
+# fill_in_group, get the nullable dtype of the same width (Int8, Int16).
+# Credit_History_Age and Num_Credit_Inquiries hold whole numbers (or a median ending
+# in .5), which float32 stores exactly; values that it cannot store, such as months
+# interpolated by impute_by_customer, keep the column in its own dtype when the frame
+# is compacted at once (see the errors argument of compact_data for chunks). The amounts
+# stay float64: float32 keeps only about 7 significant digits, which is not enough
+# for incomes with cents.
+COMPACT_DTYPES = {
+    'Month': 'int8',
+    'Age': 'int8',
+    'Num_Bank_Accounts': 'int16',
+    'Num_Credit_Card': 'int16',
+    'Interest_Rate': 'int16',
+    'Num_of_Loan': 'int16',
+    'Delay_from_due_date': 'int16',
+    'Num_of_Delayed_Payment': 'int16',
+    'Num_Credit_Inquiries': 'float32',
+    'Credit_History_Age': 'float32',
+}
+
+# Text columns stored as 'category': the columns the schema reads as categoricals
+# that are still text after cleaning. Type_of_Loan becomes a bitmask instead, unless
+# compact_data is told otherwise. Like COMPACT_DTYPES, this does not depend on the
+# values, so every chunk of a file gets the same dtypes.
+CATEGORY_COLUMNS = [col for col, dtype in RAW_SCHEMA.items()
+                    if dtype == 'category' and col not in COMPACT_DTYPES]
+
+
+def loan_type_bitmask(series):
+    """
+    Encodes Type_of_Loan strings such as "auto loan,personal loan" as a multi-hot
+    bitmask, one bit per entry of LOAN_TYPES (and OTHER_LOAN_BIT for other types).
+
+    The strings are split once per distinct value, and the masks are gathered back by
+    code. A loan type listed twice in a row sets its bit once; "Unknown" (the fill
+    value for missing loan types) and missing values give 0.
+
+    Parameters:
+    series (pd.Series): The cleaned Type_of_Loan strings.
+
+    Returns:
+    pd.Series: The bitmasks as uint16, with the index and name of series.
+    """
+    bits = {name: 1 << i for i, name in enumerate(LOAN_TYPES)}
+    codes, uniques = pd.factorize(series)
+    parents, labels = split_labels(pd.Series(uniques, dtype=object).astype(str).str.lower(),
+                                   ignore=('unknown',))
+    label_bits = np.array([bits.get(label, 1 << OTHER_LOAN_BIT) for label in labels], dtype=np.uint16)
+    # The extra last mask is for missing values (code -1)
+    masks = np.zeros(len(uniques) + 1, dtype=np.uint16)
+    np.bitwise_or.at(masks, parents, label_bits)
+    return pd.Series(masks[codes], index=series.index, name=series.name)
+
+
+def decode_loan_bitmask(masks):
+    """
+    Turns Type_of_Loan bitmasks back into loan type strings, the types joined by ','
+    in LOAN_TYPES order ("other loan" for OTHER_LOAN_BIT), and "Unknown" for 0.
+
+    Parameters:
+    masks (pd.Series): Bitmasks made by loan_type_bitmask.
+
+    Returns:
+    pd.Series: The loan type strings, with the index and name of masks.
+    """
+    names = LOAN_TYPES + ['other loan']
+    codes, uniques = pd.factorize(masks)
+    decoded = np.array([','.join(name for i, name in enumerate(names) if mask >> i & 1) or 'Unknown'
+                        for mask in uniques], dtype=object)
+    return pd.Series(decoded[codes], index=masks.index, name=masks.name)
+
+
+def _compact_numeric(series, dtype):
+    # Cast to the declared dtype, or return None if that would change a value. Integer
+    # dtypes become nullable (e.g. Int8) when the column has missing values.
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        present = values[~np.isnan(values)]
+        if len(present) and (present.min() < info.min or present.max() > info.max
+                             or (present != np.round(present)).any()):
+            return None
+        if len(present) < len(values):
+            return series.astype(f"{'UInt' if dtype.kind == 'u' else 'Int'}{dtype.itemsize * 8}")
+        return series.astype(dtype)
+    compact = series.astype(dtype)
+    if not np.array_equal(compact.to_numpy(dtype=float), series.to_numpy(dtype=float), equal_nan=True):
+        return None
+    return compact
+
+
+def _is_text(series):
+    # Object or string columns; categoricals of strings are already compact
+    return (not isinstance(series.dtype, pd.CategoricalDtype)
+            and (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)))
+
+
+def compact_data(df, dtypes=None, categories=None, loan_bitmask=True, errors='keep', report=None):
+    """
+    Stores a cleaned DataFrame in less memory without changing its values.
+
+    Every dtype is declared rather than taken from the values, so the chunks and
+    partitions of a file get the same dtypes and can be written to one Parquet or
+    Arrow schema (see ChunkWriter):
+
+    - Numeric columns in dtypes are cast to their declared width (the nullable integer
+      dtype if they have missing values). A declared column whose values its dtype
+      cannot store exactly is left as it is and listed in the report, or raises with
+      errors='raise'.
+    - Text columns in categories become 'category', which stores each distinct string
+      once plus a small code per row.
+    - Type_of_Loan becomes a uint16 multi-hot bitmask (see loan_type_bitmask), unless
+      loan_bitmask is False, in which case it is treated like the other text columns.
+
+    Other columns are kept as they are. The result is a new DataFrame whose columns
+    are laid out anew, so the memory of df is released once the caller drops it; df
+    itself is not modified.
+
+    Parameters:
+    df (pd.DataFrame): The cleaned DataFrame.
+    dtypes (dict, optional): Column name to dtype. Defaults to COMPACT_DTYPES; columns
+                             missing from df are skipped.
+    categories (list, optional): Text columns to store as 'category'. Defaults to
+                                 CATEGORY_COLUMNS.
+    loan_bitmask (bool): If True, encode Type_of_Loan as a bitmask.
+    errors (str): 'keep' to leave a declared column whose values do not fit as it is,
+                  or 'raise' to raise a ValueError instead. Chunks written to one file
+                  need 'raise': a chunk kept in its own dtype would be cast to the
+                  schema of the first chunk when written.
+    report (dict, optional): If given, the memory before and after is added to it:
+                             'rows', 'bytes_before', 'bytes_after', and 'columns', a
+                             dict of column name to the same byte counts and the dtypes
+                             before and after. Counts add up when the same dict is
+                             passed for several chunks. 'skipped' maps the declared
+                             columns left as they are to their declared dtype.
+
+    Returns:
+    pd.DataFrame: The compacted DataFrame, with the same index and columns.
+    """
+    if errors not in ('keep', 'raise'):
+        raise ValueError(f"errors must be 'keep' or 'raise', not '{errors}'.")
+    dtypes = COMPACT_DTYPES if dtypes is None else dtypes
+    categories = set(CATEGORY_COLUMNS if categories is None else categories)
+    columns = {}
+    sizes = {}
+    skipped = {}
+    for col in df.columns:
+        series = df[col]
+        if col in dtypes:
+            compact = _compact_numeric(series, dtypes[col])
+            if compact is None:
+                dtype = str(np.dtype(dtypes[col]))
+                if errors == 'raise':
+                    raise ValueError(f"Column '{col}' has values that do not fit in {dtype}.")
+                skipped[col] = dtype
+                compact = series
+        elif col == 'Type_of_Loan' and loan_bitmask:
+            compact = loan_type_bitmask(series)
+        elif col in categories and _is_text(series):
+            compact = series.astype('category')
+        else:
+            compact = series
+        columns[col] = compact
+
+        if report is not None:
+            # Deep sizes count the strings of text columns, not just their pointers
+            sizes[col] = {'dtype_before': str(series.dtype), 'dtype_after': str(compact.dtype),
+                          'bytes_before': int(series.memory_usage(index=False, deep=True)),
+                          'bytes_after': int(compact.memory_usage(index=False, deep=True))}
+
+    if report is not None:
+        merge_reports(report, {
+            'rows': len(df),
+            'bytes_before': sum(size['bytes_before'] for size in sizes.values()),
+            'bytes_after': sum(size['bytes_after'] for size in sizes.values()),
+            'columns': sizes,
+            'skipped': skipped,
+        })
+    # Building a new frame copies the columns into new blocks, instead of keeping
+    # the consolidated float64 and int64 blocks of df alive behind narrower columns
+    return pd.DataFrame(columns, index=df.index)
+
+
+def merge_reports(report, other):
+    """
+    Adds the counts of a report filled by compact_data (e.g. in a worker process) to
+    report, in place, and returns report.
+    """
+    for key in ('rows', 'bytes_before', 'bytes_after'):
+        report[key] = report.get(key, 0) + other.get(key, 0)
+    columns = report.setdefault('columns', {})
+    for col, size in other.get('columns', {}).items():
+        entry = columns.setdefault(col, {'dtype_before': size['dtype_before'],
+                                         'bytes_before': 0, 'bytes_after': 0})
+        entry['dtype_after'] = size['dtype_after']
+        entry['bytes_before'] += size['bytes_before']
+        entry['bytes_after'] += size['bytes_after']
+    report.setdefault('skipped', {}).update(other.get('skipped', {}))
+    return report
+
+
+def compaction_summary(report):
+    """
+    Formats a report filled by compact_data as text: one line per column whose size
+    changed, largest saving first, the total, and the declared columns left as they
+    were.
+    """
+    lines = [f"{'column':<26} {'before':>10} {'after':>10} {'MB before':>10} {'MB after':>9}"]
+    changed = [(col, entry) for col, entry in report.get('columns', {}).items()
+               if entry['bytes_after'] != entry['bytes_before']]
+    for col, entry in sorted(changed, key=lambda item: item[1]['bytes_after'] - item[1]['bytes_before']):
+        lines.append(f"{col:<26} {entry['dtype_before']:>10} {entry['dtype_after']:>10} "
+                     f"{entry['bytes_before'] / 2**20:>10.2f} {entry['bytes_after'] / 2**20:>9.2f}")
+    before, after = report.get('bytes_before', 0), report.get('bytes_after', 0)
+    saved = 1 - after / before if before else 0.0
+    lines.append(f"{'total':<26} {'':>10} {'':>10} {before / 2**20:>10.2f} {after / 2**20:>9.2f} "
+                 f"({saved:.0%} smaller)")
+    for col, dtype in report.get('skipped', {}).items():
+        lines.append(f"{col}: some values do not fit in {dtype}, kept as they were")
+    return '\n'.join(lines)
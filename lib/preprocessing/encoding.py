@@ -0,0 +1,494 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Order of the ordinal columns, worst to best. Other values ("Unknown") have no rank.
+ORDINAL_CATEGORIES = {
+    'Credit_Mix': ['Bad', 'Standard', 'Good'],
+    'Credit_Score': ['Poor', 'Standard', 'Good'],
+}
+
+
+def _column(data, column):
+    # The encoded column of a DataFrame, or the Series itself
+    return data[column] if isinstance(data, pd.DataFrame) else data
+
+
+def _uniques(values):
+    # Distinct non-missing values, found by factorizing (observed categories only)
+    return pd.factorize(values)[1]
+
+
+def _factorize(values):
+    # Codes and distinct values; categorical columns reuse their own codes
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+def _codes(values, categories):
+    """
+    Returns the position of each value in categories, -1 for missing values and
+    values that are not in categories. Only the distinct values are looked up, and
+    categorical columns are mapped through their own codes.
+    """
+    index = pd.Index(categories)
+    codes, uniques = _factorize(values)
+    # Append -1 so that the code -1 (missing) stays -1
+    lookup = np.append(index.get_indexer(uniques), -1)
+    return lookup[codes]
+
+
+def _sorted_union(known, new):
+    # Categories stay sorted, so the result does not depend on the order of the chunks
+    return sorted(set(known).union(new), key=str)
+
+
+def _indicators(codes, n_columns, as_sparse):
+    # One 1.0 per row at column codes[i], none where the code is -1
+    valid = codes >= 0
+    if as_sparse:
+        indptr = np.concatenate([[0], np.cumsum(valid)])
+        data = np.ones(int(valid.sum()), dtype=np.float32)
+        return sparse.csr_matrix((data, codes[valid], indptr), shape=(len(codes), n_columns))
+    dense = np.zeros((len(codes), n_columns), dtype=np.float32)
+    dense[np.flatnonzero(valid), codes[valid]] = 1.0
+    return dense
+
+
+def split_labels(uniques, sep=',', ignore=()):
+    """
+    Splits distinct strings such as "auto loan,personal loan" into their labels.
+
+    With pyarrow installed the split, trim and filter run in pyarrow compute kernels
+    over all the strings at once; without it, pandas does the same work.
+
+    Parameters:
+    uniques (array-like): The distinct strings (no missing values).
+    sep (str): The label separator.
+    ignore (tuple): Labels to leave out, e.g. "Unknown".
+
+    Returns:
+    tuple: (parents, labels), two arrays with one entry per label found: the position
+           in uniques of the string it came from, and the label (stripped of
+           surrounding whitespace; empty labels are left out). Labels listed twice
+           in a string appear twice.
+    """
+    try:
+        parents, labels = _split_arrow(uniques, sep)
+    except ImportError:
+        split = pd.Series(uniques, dtype=object).astype(str).str.split(sep).explode()
+        parents, labels = split.index.to_numpy(), split.str.strip().to_numpy(dtype=object)
+    keep = (labels != '') & ~pd.Series(labels).isin(list(ignore)).to_numpy()
+    return parents[keep], labels[keep]
+
+
+def _split_arrow(uniques, sep):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arr = pc.cast(pa.array(np.asarray(uniques, dtype=object), from_pandas=True), pa.string())
+    lists = pc.split_pattern(arr, sep)
+    labels = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    parents = pc.list_parent_indices(lists)
+    return parents.to_numpy(), labels.to_numpy(zero_copy_only=False)
+
+
+def _gather_rows(matrix, rows):
+    # matrix[rows] for a CSR matrix, as a few vectorized numpy operations
+    lengths = np.diff(matrix.indptr)[rows]
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    # Position of every output entry in matrix.indices: the start of its source row
+    # plus its offset within that row
+    offsets = np.arange(indptr[-1]) - np.repeat(indptr[:-1], lengths)
+    positions = np.repeat(matrix.indptr[:-1][rows], lengths) + offsets
+    return sparse.csr_matrix((matrix.data[positions], matrix.indices[positions], indptr),
+                             shape=(len(rows), matrix.shape[1]))
+
+
+def multi_hot(series, vocabulary=None, sep=',', ignore=('Unknown',)):
+    """
+    Expands a column of separated labels, such as the Type_of_Loan strings
+    "auto loan,credit-builder loan", into a sparse indicator matrix.
+
+    Only the distinct strings are split (see split_labels); each row of the result is
+    then gathered from the row of its string by code, so the cost of the split does
+    not grow with the number of rows.
+
+    Parameters:
+    series (pd.Series): The label strings (object, string or category dtype).
+    vocabulary (list, optional): The labels, in column order. If None, the sorted
+                                 labels found in series. Labels outside the
+                                 vocabulary get no column but are still counted.
+    sep (str): The label separator.
+    ignore (tuple): Values that mean "no label", e.g. "Unknown", the value
+                    handle_missing_data fills missing loan types with.
+
+    Returns:
+    tuple: (matrix, counts, vocabulary): a float32 CSR matrix of shape
+           (rows, len(vocabulary)) with a 1.0 for each label of a row (a label listed
+           twice is set once), the number of labels of each row as int32, counting
+           repeats, and the vocabulary.
+    """
+    codes, uniques = _factorize(series)
+    parents, labels = split_labels(uniques, sep, ignore)
+    label_codes, found = pd.factorize(labels)
+    if vocabulary is None:
+        vocabulary = sorted(found, key=str)
+    columns = pd.Index(vocabulary).get_indexer(found)[label_codes] if len(found) else label_codes
+
+    # One row per distinct string, plus an empty last row for missing values (code -1)
+    known = columns >= 0
+    per_value = sparse.csr_matrix(
+        (np.ones(int(known.sum()), dtype=np.float32), (parents[known], columns[known])),
+        shape=(len(uniques) + 1, len(vocabulary)))
+    # Repeated labels were summed, indicators are 1
+    per_value.data[:] = 1.0
+    n_labels = np.bincount(parents, minlength=len(uniques) + 1).astype(np.int32)
+    return _gather_rows(per_value, codes), n_labels[codes], list(vocabulary)
+
+
+class Encoder(ABC):
+    """
+    Abstract base class of the column encoders. Subclasses implement partial_fit,
+    merge, transform and feature_names; fit and fit_transform are built on them.
+
+    Encoders are fitted like CleaningStatistics: fit takes a DataFrame or an iterable
+    of chunks, partial_fit updates the fitted state with one chunk, and merge combines
+    encoders fitted on different parts of the data. transform returns a float32
+    matrix, as a dense numpy array or a scipy.sparse CSR matrix (see the sparse
+    attribute), built from the column's codes without intermediate DataFrames.
+
+    Encoders only hold lists and numpy arrays, so fitted encoders can be pickled and
+    loaded by a scoring process.
+    """
+
+    sparse = False
+
+    def __init__(self, column):
+        self.column = column
+        self.n_rows = 0
+
+    @abstractmethod
+    def partial_fit(self, df):
+        """Updates the fitted state with one chunk, and returns self."""
+
+    def fit(self, data):
+        """
+        Fits the encoder in one pass over a DataFrame or an iterable of chunks.
+
+        Returns:
+        Encoder: self
+        """
+        chunks = [data] if isinstance(data, (pd.DataFrame, pd.Series)) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    @abstractmethod
+    def merge(self, other):
+        """Adds the fitted state of an encoder of the same column, and returns self."""
+
+    @abstractmethod
+    def transform(self, df):
+        """Returns the float32 feature matrix of the rows of df."""
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    @property
+    @abstractmethod
+    def feature_names(self):
+        """The names of the columns of the transform matrix."""
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+
+class _CategoryEncoder(Encoder):
+    # An encoder over a list of categories, either given or learned by fit
+
+    def __init__(self, column, categories=None):
+        super().__init__(column)
+        self.fixed = categories is not None
+        self.categories = list(categories) if categories is not None else []
+
+    def partial_fit(self, df):
+        values = _column(df, self.column)
+        self.n_rows += len(values)
+        if not self.fixed:
+            self.categories = _sorted_union(self.categories, _uniques(values))
+        return self
+
+    def merge(self, other):
+        self.n_rows += other.n_rows
+        if not self.fixed:
+            self.categories = _sorted_union(self.categories, other.categories)
+        return self
+
+
+class OrdinalEncoder(_CategoryEncoder):
+    """
+    Encodes a column as the rank of its value in an ordered list of categories
+    (0 for the first), e.g. Credit_Mix "Bad" < "Standard" < "Good".
+
+    Parameters:
+    column (str): The column to encode.
+    categories (list, optional): The categories in order. Defaults to the column's
+                                 entry in ORDINAL_CATEGORIES, or, for other columns,
+                                 to the sorted values seen by fit.
+    unknown_value (float): Value for missing values and values not in categories.
+    """
+
+    def __init__(self, column, categories=None, unknown_value=np.nan):
+        if categories is None:
+            categories = ORDINAL_CATEGORIES.get(column)
+        super().__init__(column, categories)
+        self.unknown_value = unknown_value
+
+    def transform(self, df):
+        """
+        Returns:
+        np.ndarray: The ranks as float32, of shape (rows, 1).
+        """
+        codes = _codes(_column(df, self.column), self.categories)
+        ranks = np.append(np.arange(len(self.categories), dtype=np.float32),
+                          np.float32(self.unknown_value))
+        return ranks[codes].reshape(-1, 1)
+
+    @property
+    def feature_names(self):
+        return [self.column]
+
+
+class OneHotEncoder(_CategoryEncoder):
+    """
+    Encodes a column as one indicator column per category. Missing values and
+    categories not seen by fit give a row of zeros.
+
+    Parameters:
+    column (str): The column to encode.
+    categories (list, optional): The categories. If None, the sorted values seen by fit.
+    sparse (bool): If True (the default), transform returns a CSR matrix.
+    """
+
+    def __init__(self, column, categories=None, sparse=True):
+        super().__init__(column, categories)
+        self.sparse = sparse
+
+    def transform(self, df):
+        """
+        Returns:
+        scipy.sparse.csr_matrix or np.ndarray: float32 indicators, of shape
+                                              (rows, number of categories).
+        """
+        codes = _codes(_column(df, self.column), self.categories)
+        return _indicators(codes, len(self.categories), self.sparse)
+
+    @property
+    def feature_names(self):
+        return [f"{self.column}={category}" for category in self.categories]
+
+
+class TargetEncoder(Encoder):
+    """
+    Encodes a column by the distribution of a categorical target within each of its
+    categories: one column per target class, holding the share of rows of the
+    category in that class, smoothed towards the share over all rows.
+
+    With n rows in a category, k of them in the class, and a share p over all rows,
+    the value is (k + smoothing * p) / (n + smoothing); rare categories stay close to
+    p. Missing values and categories not seen by fit get p.
+
+    The counts are summed over chunks, so partial_fit and merge give the same result
+    as fitting on all rows at once. Fitting and transforming the same rows leaks the
+    target into the feature, so fit on training folds and transform held-out rows.
+
+    Parameters:
+    column (str): The column to encode.
+    target (str): The target column, e.g. 'Credit_Score'.
+    smoothing (float): Weight of the overall share, in rows.
+    """
+
+    def __init__(self, column, target='Credit_Score', smoothing=10.0):
+        super().__init__(column)
+        self.target = target
+        self.smoothing = smoothing
+        self.categories = []
+        self.classes = []
+        # counts[i, j]: rows with category i and target class j; the last row counts
+        # the rows whose category is missing, which only add to the overall shares
+        self.counts = np.zeros((1, 0))
+
+    def _add_counts(self, categories, classes, counts):
+        # Adds counts laid out like self.counts but over other category and class
+        # lists, growing both lists as needed (classes stay sorted)
+        all_classes = _sorted_union(self.classes, classes)
+        known = set(self.categories)
+        new_categories = [c for c in categories if c not in known]
+        merged = np.zeros((len(self.categories) + len(new_categories) + 1, len(all_classes)))
+        old_rows = np.append(np.arange(len(self.categories)), len(merged) - 1)
+        merged[np.ix_(old_rows, pd.Index(all_classes).get_indexer(self.classes))] = self.counts
+
+        self.categories = self.categories + new_categories
+        rows = np.append(pd.Index(self.categories).get_indexer(categories), len(merged) - 1)
+        merged[np.ix_(rows, pd.Index(all_classes).get_indexer(classes))] += counts
+        self.counts, self.classes = merged, all_classes
+
+    def partial_fit(self, df):
+        values, target = _column(df, self.column), df[self.target]
+        self.n_rows += len(df)
+        codes, categories = pd.factorize(values)
+        class_codes, classes = pd.factorize(target)
+        # Rows without a target are not counted
+        keep = class_codes >= 0
+        # Missing categories (code -1) are counted in the extra last row
+        codes = np.where(codes == -1, len(categories), codes)
+        counts = np.zeros((len(categories) + 1, len(classes)))
+        np.add.at(counts, (codes[keep], class_codes[keep]), 1)
+        self._add_counts(list(categories), list(classes), counts)
+        return self
+
+    def merge(self, other):
+        self.n_rows += other.n_rows
+        self._add_counts(other.categories, other.classes, other.counts)
+        return self
+
+    @property
+    def prior(self):
+        """Share of each class over all rows with a target."""
+        totals = self.counts.sum(axis=0)
+        return totals / max(totals.sum(), 1)
+
+    def transform(self, df):
+        """
+        Returns:
+        np.ndarray: float32 class shares, of shape (rows, number of classes).
+        """
+        prior = self.prior
+        counts = self.counts[:-1]
+        table = (counts + self.smoothing * prior) / (counts.sum(axis=1, keepdims=True) + self.smoothing)
+        # The extra last row (code -1) is for missing and unseen categories
+        table = np.vstack([table, prior]).astype(np.float32)
+        return table[_codes(_column(df, self.column), self.categories)]
+
+    @property
+    def feature_names(self):
+        return [f"{self.column}_{self.target}={c}" for c in self.classes]
+
+
+class MultiLabelEncoder(Encoder):
+    """
+    Encodes a column of separated labels, such as the Type_of_Loan strings
+    "auto loan,personal loan", as one indicator column per label. A label listed twice
+    in a row is set once.
+
+    Labels not seen by fit are left out. See multi_hot, which does the expansion.
+
+    Parameters:
+    column (str): The column to encode.
+    sep (str): The label separator.
+    ignore (tuple): Values that mean "no label", e.g. "Unknown", the value
+                    handle_missing_data fills missing loan types with.
+    sparse (bool): If True (the default), transform returns a CSR matrix.
+    """
+
+    def __init__(self, column='Type_of_Loan', sep=',', ignore=('Unknown',), sparse=True):
+        super().__init__(column)
+        self.sep = sep
+        self.ignore = tuple(ignore)
+        self.sparse = sparse
+        self.labels = []
+
+    def partial_fit(self, df):
+        values = _column(df, self.column)
+        self.n_rows += len(values)
+        _, labels = split_labels(_uniques(values), self.sep, self.ignore)
+        self.labels = _sorted_union(self.labels, pd.unique(labels))
+        return self
+
+    def merge(self, other):
+        self.n_rows += other.n_rows
+        self.labels = _sorted_union(self.labels, other.labels)
+        return self
+
+    def transform(self, df):
+        """
+        Returns:
+        scipy.sparse.csr_matrix or np.ndarray: float32 indicators, of shape
+                                              (rows, number of labels).
+        """
+        result, _, _ = multi_hot(_column(df, self.column), self.labels, self.sep, self.ignore)
+        return result if self.sparse else result.toarray()
+
+    @property
+    def feature_names(self):
+        return [f"{self.column}={label}" for label in self.labels]
+
+
+def default_encoders(target_encode=False):
+    """
+    Returns encoders for the categorical columns of the cleaned data: Credit_Mix as
+    an ordinal, Occupation and Payment_Behaviour one-hot (or target encoded against
+    Credit_Score if target_encode is True) and Type_of_Loan as multi-label indicators.
+    Credit_Score itself is the target, see OrdinalEncoder('Credit_Score').
+    """
+    if target_encode:
+        nominal = [TargetEncoder('Occupation'), TargetEncoder('Payment_Behaviour')]
+    else:
+        nominal = [OneHotEncoder('Occupation'), OneHotEncoder('Payment_Behaviour')]
+    return [OrdinalEncoder('Credit_Mix')] + nominal + [MultiLabelEncoder('Type_of_Loan')]
+
+
+class FeatureEncoder:
+    """
+    Encodes several columns at once and stacks the results into one float32 matrix,
+    with the numeric columns in passthrough copied as they are.
+
+    The result is a CSR matrix if any encoder is sparse, and a dense array otherwise.
+
+    Usage:
+        encoder = FeatureEncoder(default_encoders(), passthrough=['Age', 'Annual_Income'])
+        encoder.fit(train_chunks)
+        X = encoder.transform(test_df)
+        encoder.feature_names  # the names of the columns of X
+    """
+
+    def __init__(self, encoders=None, passthrough=()):
+        self.encoders = default_encoders() if encoders is None else list(encoders)
+        self.passthrough = list(passthrough)
+
+    def partial_fit(self, df):
+        for encoder in self.encoders:
+            encoder.partial_fit(df)
+        return self
+
+    def fit(self, data):
+        """Fits every encoder in one pass over a DataFrame or an iterable of chunks."""
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        for encoder, other_encoder in zip(self.encoders, other.encoders):
+            encoder.merge(other_encoder)
+        return self
+
+    def transform(self, df):
+        blocks = [encoder.transform(df) for encoder in self.encoders]
+        if self.passthrough:
+            blocks.insert(0, df[self.passthrough].to_numpy(dtype=np.float32))
+        if any(sparse.issparse(block) for block in blocks):
+            return sparse.hstack(blocks, format='csr', dtype=np.float32)
+        return np.hstack(blocks) if blocks else np.empty((len(df), 0), dtype=np.float32)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    @property
+    def feature_names(self):
+        return self.passthrough + [name for encoder in self.encoders for name in encoder.feature_names]
@@ -0,0 +1,269 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_float(values):
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(values, dtype=float)
+
+
+class GroupIndex:
+    """
+    Rows grouped by a key (e.g. Customer_ID) and ordered within each group (e.g. by
+    Month), for per-group operations written as NumPy segment operations instead of
+    groupby().apply.
+
+    The rows are sorted once, so every group is a contiguous segment [start, end) of
+    the sorted order. The operations take and return values in the original row
+    order. When the frame is already grouped and ordered, as the raw files are
+    (eight consecutive monthly rows per customer), no sort is needed and building the
+    index is a single O(n) pass.
+
+    Missing keys form one group of their own.
+
+    Usage:
+        index = GroupIndex(df['Customer_ID'], order_by=df['Month'])
+        df['Annual_Income_lag1'] = index.shift(df['Annual_Income'], on_order=True)
+        df['Annual_Income_mean'] = index.broadcast(index.reduce(df['Annual_Income'], 'mean'))
+    """
+
+    def __init__(self, keys, order_by=None):
+        codes, self.keys = pd.factorize(keys)
+        # Missing keys (code -1) go to an extra last group
+        if (codes == -1).any():
+            codes = np.where(codes == -1, len(self.keys), codes)
+            self.keys = self.keys.append(pd.Index([None]))
+        self.n_rows = len(codes)
+        self.n_groups = len(self.keys)
+
+        order = None if order_by is None else _as_float(order_by)
+        # factorize numbers the keys in order of appearance, so codes that never go
+        # down mean the rows of each group are already contiguous
+        grouped = bool(np.all(codes[1:] >= codes[:-1]))
+        same_group = codes[1:] == codes[:-1]
+        ordered = order is None or not np.any(same_group & (order[1:] < order[:-1]))
+        if grouped and ordered:
+            self.order = None
+        elif order is None:
+            self.order = np.argsort(codes, kind='stable')
+        else:
+            self.order = np.lexsort((order, codes))
+
+        self.codes = codes
+        # The order values in sorted order, for the operations keyed on them
+        self._order_values = None if order is None else self._sorted(order)
+        sorted_codes = self._sorted(codes)
+        # Start of each group in the sorted order, plus the end of the last one.
+        # The rows are sorted by code, so segment i holds the rows of group i.
+        boundaries = np.r_[True, sorted_codes[1:] != sorted_codes[:-1], True]
+        self.starts = np.flatnonzero(boundaries) if self.n_rows else np.zeros(1, dtype=np.intp)
+        # Position of each sorted row in its group, and the number of rows after it
+        sizes = np.diff(self.starts)
+        self._positions = (np.arange(self.n_rows) - np.repeat(self.starts[:-1], sizes)).astype(np.int32)
+        self._remaining = (np.repeat(sizes, sizes) - 1 - self._positions).astype(np.int32)
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def sizes(self):
+        """Number of rows of each group, in the order of self.keys."""
+        return np.bincount(self.codes, minlength=self.n_groups)
+
+    @property
+    def is_sorted(self):
+        """True if the rows were already grouped and ordered, so no sort was needed."""
+        return self.order is None
+
+    def _sorted(self, values):
+        return values if self.order is None else values[self.order]
+
+    def _unsorted(self, values):
+        if self.order is None:
+            return values
+        result = np.empty_like(values)
+        result[self.order] = values
+        return result
+
+    def positions(self):
+        """Position of each row within its group (0 for the first), in row order."""
+        return self._unsorted(self._positions)
+
+    def _shift_sorted(self, values, periods):
+        # Shift of sorted values: a slice, then NaN where it crossed a group boundary
+        result = np.full(self.n_rows, np.nan)
+        if periods >= 0:
+            result[periods:] = values[:self.n_rows - periods]
+            result[self._positions < periods] = np.nan
+        else:
+            result[:periods] = values[-periods:]
+            result[self._remaining < -periods] = np.nan
+        return result
+
+    def _sorted_order(self):
+        if self._order_values is None:
+            raise ValueError("Operations on the order values need a GroupIndex built with order_by.")
+        return self._order_values
+
+    def _shift_on_order(self, values, periods):
+        # Shift of sorted values by periods in the order values: the row up to
+        # |periods| rows away whose order value differs by exactly periods
+        order = self._sorted_order()
+        if periods == 0:
+            return values.copy()
+        result = np.full(self.n_rows, np.nan)
+        found = np.zeros(self.n_rows, dtype=bool)
+        step = 1 if periods > 0 else -1
+        for rows in range(step, periods + step, step):
+            match = ~found & (self._shift_sorted(order, rows) == order - periods)
+            result[match] = self._shift_sorted(values, rows)[match]
+            found |= match
+        return result
+
+    def shift(self, values, periods=1, on_order=False):
+        """
+        Returns the value periods rows earlier in the same group (later for negative
+        periods), NaN where there is none. Like groupby().shift(), as floats.
+
+        With on_order=True, periods counts in the order values instead of rows: the
+        value of the row whose order value (e.g. Month) is periods less than the row's
+        own, NaN where the group has no such row, e.g. for a month missing from the data.
+        """
+        values = self._sorted(_as_float(values))
+        if on_order:
+            return self._unsorted(self._shift_on_order(values, periods))
+        return self._unsorted(self._shift_sorted(values, periods))
+
+    def diff(self, values, periods=1, on_order=False):
+        """
+        Returns the change since the value periods rows earlier in the same group
+        (periods less in the order values with on_order=True, see shift).
+        """
+        return _as_float(values) - self.shift(values, periods, on_order)
+
+    def rolling_mean(self, values, window, min_periods=1, on_order=False):
+        """
+        Returns the mean of the last window values of each row's group, up to and
+        including the row, ignoring NaN; NaN where fewer than min_periods values are
+        available. Like groupby().rolling(window, min_periods).mean().
+
+        With on_order=True, the window holds the rows whose order value is less than
+        window below the row's own, e.g. the last three months rather than the last
+        three rows.
+
+        The window is summed as window shifted copies, which is exact and fast for
+        the short windows of monthly data.
+        """
+        values = self._sorted(_as_float(values))
+        order = self._sorted_order() if on_order else None
+        sums = np.zeros(self.n_rows)
+        counts = np.zeros(self.n_rows, dtype=np.int32)
+        for lag in range(window):
+            shifted = self._shift_sorted(values, lag) if lag else values
+            present = ~np.isnan(shifted)
+            if on_order and lag:
+                # Up to window rows back, only those less than window earlier count
+                present &= order - self._shift_sorted(order, lag) < window
+            np.add(sums, shifted, out=sums, where=present)
+            counts += present
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts >= max(min_periods, 1), sums / counts, np.nan)
+        return self._unsorted(means)
+
+    def ffill(self, values):
+        """Fills NaN with the last earlier value in the same group, if there is one."""
+        values = self._sorted(_as_float(values))
+        rows = np.arange(self.n_rows)
+        # Index of the last non-missing row so far; it belongs to the group if it is
+        # not before the group's start
+        last = np.maximum.accumulate(np.where(np.isnan(values), -1, rows))
+        found = last >= rows - self._positions
+        result = np.full(self.n_rows, np.nan)
+        result[found] = values[last[found]]
+        return self._unsorted(result)
+
+    def bfill(self, values):
+        """Fills NaN with the next later value in the same group, if there is one."""
+        values = self._sorted(_as_float(values))
+        rows = np.arange(self.n_rows)
+        # Index of the next non-missing row, scanning from the end
+        next_row = np.minimum.accumulate(np.where(np.isnan(values), self.n_rows, rows)[::-1])[::-1]
+        found = next_row <= rows + self._remaining
+        result = np.full(self.n_rows, np.nan)
+        result[found] = values[next_row[found]]
+        return self._unsorted(result)
+
+    def reduce(self, values, how='mean'):
+        """
+        Reduces each group to one value, ignoring NaN.
+
+        Parameters:
+        values (array-like): The values, in row order.
+        how (str): 'sum', 'count', 'mean', 'median', 'mode' (the most frequent value,
+                   the smallest one on ties, like Series.mode()[0]), 'min', 'max',
+                   'first' or 'last' (the first and last non-missing value in the
+                   group's order).
+
+        Returns:
+        np.ndarray: One value per group, in the order of self.keys; NaN for groups
+                    without values (0 for 'sum' and 'count').
+        """
+        values = _as_float(values)
+        present = ~np.isnan(values)
+        counts = np.bincount(self.codes[present], minlength=self.n_groups).astype(float)
+        if how == 'count':
+            return counts
+        if how in ('sum', 'mean'):
+            sums = np.bincount(self.codes[present], weights=values[present], minlength=self.n_groups)
+            if how == 'sum':
+                return sums
+            with np.errstate(invalid='ignore'):
+                return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        if how in ('median', 'mode'):
+            # Sort the values within each group; only median and mode need this
+            codes, values = self.codes[present], values[present]
+            by_value = np.lexsort((values, codes))
+            codes, values = codes[by_value], values[by_value]
+            if how == 'median':
+                return self._median(codes, values, counts)
+            return self._mode(codes, values)
+        if how in ('min', 'max'):
+            fill = np.inf if how == 'min' else -np.inf
+            ufunc = np.minimum if how == 'min' else np.maximum
+            result = ufunc.reduceat(self._sorted(np.where(present, values, fill)), self.starts[:-1])
+            return np.where(counts > 0, result, np.nan)
+        if how in ('first', 'last'):
+            filled = self.bfill(values) if how == 'first' else self.ffill(values)
+            rows = self.starts[:-1] if how == 'first' else self.starts[1:] - 1
+            return self._sorted(filled)[rows]
+        raise ValueError(f"Unknown reduction '{how}'.")
+
+    def _median(self, codes, values, counts):
+        # Middle value(s) of each group in values sorted by (code, value)
+        counts = counts.astype(np.int64)
+        starts = np.cumsum(counts) - counts
+        result = np.full(self.n_groups, np.nan)
+        has = counts > 0
+        low = values[(starts + (counts - 1) // 2)[has]]
+        high = values[(starts + counts // 2)[has]]
+        result[has] = (low + high) / 2
+        return result
+
+    def _mode(self, codes, values):
+        # Longest run of equal values in each group of values sorted by (code, value)
+        result = np.full(self.n_groups, np.nan)
+        if len(values) == 0:
+            return result
+        run_starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (values[1:] != values[:-1])])
+        run_lengths = np.diff(np.r_[run_starts, len(values)])
+        run_codes, run_values = codes[run_starts], values[run_starts]
+        # Per group, longest run first, then smallest value
+        order = np.lexsort((run_values, -run_lengths, run_codes))
+        first = np.r_[True, run_codes[order][1:] != run_codes[order][:-1]]
+        result[run_codes[order][first]] = run_values[order][first]
+        return result
+
+    def broadcast(self, group_values):
+        """Returns the value of each row's group, in row order."""
+        return np.asarray(group_values)[self.codes]
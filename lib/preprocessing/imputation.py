@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from lib.preprocessing.groups import GroupIndex
+
+# How handle_missing_data's median columns are filled from the customer's other
+# months. Credit_History_Age grows by one month per month, so it is carried over
+# from the nearest known month with the month difference added.
+CUSTOMER_IMPUTATION = {
+    'Credit_History_Age': 'interpolate',
+    'Monthly_Inhand_Salary': 'median',
+    'Changed_Credit_Limit': 'median',
+    'Num_Credit_Inquiries': 'mode',
+    'Amount_invested_monthly': 'median',
+    'Monthly_Balance': 'median',
+}
+
+def customer_month_index(customers, months):
+    """
+    Returns the GroupIndex of customers ordered by months, which impute_from_customer
+    takes. Build it once and pass it to every column filled for the same rows.
+
+    Parameters:
+    customers (pd.Series): The Customer_ID column.
+    months (pd.Series): The numeric Month column.
+    """
+    return GroupIndex(customers, order_by=months)
+
+
+def impute_from_customer(values, index, months, how='median', fallback=np.nan):
+    """
+    Fills the missing values of a column from the same customer's other months.
+
+    Parameters:
+    values (pd.Series): The column to fill.
+    index (GroupIndex): The rows grouped by customer and ordered by month, see
+                        customer_month_index.
+    months (pd.Series): The numeric Month of each row.
+    how (str): 'median' or 'mode' of the customer's known values, or 'interpolate'
+               to carry the nearest earlier (else later) known value over, adding
+               the months in between, for values that grow by one each month. Rows
+               of unknown month (0, see convert_month) are left out of the
+               interpolation, and get the fallback if their value is missing.
+    fallback (float): Value for the rows of customers with no known value, e.g. the
+                      global median.
+
+    Returns:
+    pd.Series: The filled column as float, with the index and name of values.
+    """
+    x = values.to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(x)
+    if missing.any():
+        if how == 'interpolate':
+            m = months.to_numpy(dtype=float, na_value=np.nan)
+            m = np.where(m > 0, m, np.nan)
+            offsets = x - m
+            filled = index.ffill(offsets)
+            filled = np.where(np.isnan(filled), index.bfill(offsets), filled) + m
+        else:
+            filled = index.broadcast(index.reduce(x, how))
+        x = np.where(missing, filled, x)
+        x = np.where(np.isnan(x), fallback, x)
+    return pd.Series(x, index=values.index, name=values.name)
+
+
+def impute_by_customer(df, stats=None, columns=None, customer='Customer_ID', month='Month',
+                       copy=True):
+    """
+    Fills missing values of the median-imputed columns from each customer's other
+    months, falling back to the global median for customers without a known value.
+    The DataFrame counterpart of handle_missing_data's median filling.
+
+    Parameters:
+    df (pd.DataFrame): Data with the customer column and a numeric month.
+    stats (CleaningStatistics, optional): Fitted statistics for the fallback medians.
+                                          If None, they are computed from df.
+    columns (dict, optional): Column name to how (see impute_from_customer).
+                              Defaults to CUSTOMER_IMPUTATION.
+    customer (str): The customer column.
+    month (str): The numeric month column.
+    copy (bool): If False, the columns are filled in df itself.
+
+    Returns:
+    pd.DataFrame: The data with the columns filled.
+    """
+    columns = CUSTOMER_IMPUTATION if columns is None else columns
+    df = df.copy() if copy else df
+    index = customer_month_index(df[customer], df[month])
+    for col, how in columns.items():
+        fallback = stats.medians[col] if stats is not None else df[col].median()
+        df[col] = impute_from_customer(df[col], index, df[month], how, fallback)
+    return df
@@ -0,0 +1,472 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from lib.io.schema import RAW_SCHEMA
+from lib.preprocessing.cleaning import (
+    MEDIAN_IMPUTED_COLUMNS,
+    age_in_range,
+    clean_age,
+    clean_credit_mix,
+    clean_credit_score,
+    clean_loan_types,
+    clean_occupation,
+    clean_payment_behaviour,
+    clean_payment_of_min_amount,
+    convert_month,
+    convert_to_months,
+    fill_unknown,
+    parse_amount,
+    parse_count,
+    parse_number,
+)
+from lib.preprocessing.imputation import CUSTOMER_IMPUTATION, customer_month_index, impute_from_customer
+from lib.preprocessing.profiling import profile_stage
+from lib.preprocessing.statistics import CleaningStatistics
+
+
+class Step:
+    """
+    One declared cleaning step.
+
+    Steps are normally row-wise: each output row depends only on the same input row
+    (and on the fitted statistics). This is what lets the pipeline filter rows before
+    the steps that do not feed a filter, and run independent columns separately.
+    Steps that read other rows too, such as filling a value from the same customer's
+    other months, are declared with row_wise=False; they must not feed a filter, so
+    they always see the rows that are kept, as the stage functions do.
+
+    Parameters:
+    name (str): Name shown in the plan.
+    func (callable): Called with the input columns as pd.Series, in the order of
+                     inputs, plus stats=... if uses_stats is True. Returns the new
+                     output column, or for a filter step a boolean mask of rows to keep.
+                     A step can also make an intermediate value for later steps, such
+                     as a GroupIndex; it is passed along like a column but is not part
+                     of the output.
+    inputs (list): Names of the columns the step reads, from the data or from the
+                   output of an earlier step.
+    output (str, optional): Name of the column the step writes. None for a filter.
+    uses_stats (bool): If True, func needs the fitted CleaningStatistics.
+    optional (bool): If True, the step is skipped when its inputs are missing
+                     (e.g. Credit_Score in test.csv) instead of raising a KeyError.
+    stage (str, optional): Name of the cleaning stage the step belongs to, used to
+                           group the steps when profiling.
+    row_wise (bool): False if an output row also depends on other rows.
+    """
+
+    def __init__(self, name, func, inputs, output=None, uses_stats=False, optional=False,
+                 stage=None, row_wise=True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.output = output
+        self.uses_stats = uses_stats
+        self.optional = optional
+        self.stage = stage
+        self.row_wise = row_wise
+
+    @property
+    def is_filter(self):
+        return self.output is None
+
+    @property
+    def label(self):
+        return self.name if self.is_filter else f"{self.name}({self.output})"
+
+    def __call__(self, columns, stats=None):
+        args = [columns[col] for col in self.inputs]
+        if self.uses_stats:
+            return self.func(*args, stats=stats)
+        return self.func(*args)
+
+    def __repr__(self):
+        target = 'filter' if self.is_filter else self.output
+        return f"Step({self.name!r}: {', '.join(self.inputs)} -> {target})"
+
+
+def _column_step(func, column, **options):
+    # A step that rewrites one column from its own values
+    return Step(func.__name__, func, [column], column, **options)
+
+
+def _clean_age(ages, stats):
+    return clean_age(parse_number(ages), stats.age_median, stats.median_age)
+
+
+def _median_filler(column):
+    def fill_median(series, stats):
+        return series.fillna(stats.medians[column])
+    return fill_median
+
+
+def _customer_filler(column, how):
+    def fill_from_customer(series, index, months, stats):
+        return impute_from_customer(series, index, months, how, fallback=stats.medians[column])
+    return fill_from_customer
+
+
+def cleaning_steps(impute='median'):
+    """
+    Returns the steps of the cleaning stages in lib.preprocessing.cleaning, one column
+    at a time, in the same order: transform_data_types, clean_categorical,
+    transform_special_columns and handle_missing_data. drop_columns has no step, the
+    pipeline's columns and drop arguments take its place.
+
+    Parameters:
+    impute (str): 'median' to fill the numeric columns with their global median, like
+                  handle_missing_data, or 'customer' to fill them from the customer's
+                  other months first (see lib.preprocessing.imputation), which reads
+                  Customer_ID even if it is dropped from the output.
+
+    Returns:
+    list: The Step objects.
+    """
+    if impute == 'median':
+        fill_steps = [Step('fill_median', _median_filler(col), [col], col, uses_stats=True)
+                      for col in MEDIAN_IMPUTED_COLUMNS]
+    elif impute == 'customer':
+        # The customer index is built once per run and shared by the fill steps
+        fill_steps = [Step('customer_month_index', customer_month_index, ['Customer_ID', 'Month'],
+                           'customer_index', row_wise=False)]
+        fill_steps += [Step('fill_from_customer', _customer_filler(col, CUSTOMER_IMPUTATION[col]),
+                            [col, 'customer_index', 'Month'], col, uses_stats=True, row_wise=False)
+                       for col in MEDIAN_IMPUTED_COLUMNS]
+    else:
+        raise ValueError(f"Unknown imputation '{impute}', expected 'median' or 'customer'.")
+
+    stages = {
+        'transform_data_types': [
+            _column_step(parse_amount, 'Annual_Income'),
+            _column_step(parse_count, 'Num_of_Loan'),
+            _column_step(parse_count, 'Num_of_Delayed_Payment'),
+            _column_step(parse_number, 'Changed_Credit_Limit'),
+            _column_step(parse_amount, 'Outstanding_Debt'),
+            _column_step(parse_number, 'Amount_invested_monthly'),
+            _column_step(parse_number, 'Monthly_Balance'),
+            Step('clean_age', _clean_age, ['Age'], 'Age', uses_stats=True),
+            Step('age_in_range', age_in_range, ['Age']),
+        ],
+        'clean_categorical': [
+            _column_step(clean_occupation, 'Occupation'),
+            _column_step(clean_credit_mix, 'Credit_Mix'),
+            _column_step(clean_payment_of_min_amount, 'Payment_of_Min_Amount'),
+            _column_step(clean_payment_behaviour, 'Payment_Behaviour'),
+            _column_step(clean_credit_score, 'Credit_Score', optional=True),
+        ],
+        'transform_special_columns': [
+            _column_step(convert_month, 'Month'),
+            _column_step(convert_to_months, 'Credit_History_Age'),
+            _column_step(clean_loan_types, 'Type_of_Loan'),
+        ],
+        'handle_missing_data': [_column_step(fill_unknown, 'Type_of_Loan')] + fill_steps,
+    }
+    steps = []
+    for stage, stage_steps in stages.items():
+        for step in stage_steps:
+            step.stage = stage
+            steps.append(step)
+    return steps
+
+
+class Plan:
+    """
+    A pipeline compiled for one set of available columns, see Pipeline.plan.
+
+    Attributes:
+    input_columns (list): The columns the plan reads, in the order of the input.
+    output_columns (list): The columns of the result.
+    pre_filter (list): Steps that the filters depend on, run on all rows.
+    filters (list): Filter steps, combined into one row selection.
+    groups (list): Lists of steps that share no column with other groups. Each
+                   group runs back to back on its own columns after the filters.
+    selected_columns (list): The output columns no group writes, which come straight
+                             from select_rows.
+    uses_stats (bool): True if a step needs the fitted statistics.
+    """
+
+    def __init__(self, steps, available, columns=None, drop=()):
+        available = list(available)
+        if columns is not None:
+            self.output_columns = [col for col in columns if col in available]
+        else:
+            self.output_columns = [col for col in available if col not in set(drop)]
+
+        # Walk back from the outputs to find the steps and columns they need;
+        # filters are always kept since they decide which rows come out
+        needed = set(self.output_columns)
+        kept = []
+        for i in reversed(range(len(steps))):
+            step = steps[i]
+            if not step.is_filter and step.output not in needed:
+                continue
+            # Inputs are read from the data or made by an earlier step, such as the
+            # customer index the customer imputation steps share
+            derived = {earlier.output for earlier in steps[:i]}
+            missing = [col for col in step.inputs if col not in available and col not in derived]
+            if missing:
+                if step.optional:
+                    continue
+                raise KeyError(f"Step '{step.name}' needs the missing columns {missing}.")
+            kept.append(step)
+            needed.update(step.inputs)
+        kept.reverse()
+        self.input_columns = [col for col in available if col in needed]
+        self.uses_stats = any(step.uses_stats for step in kept)
+
+        # Steps before the last filter that produce a column a filter reads run first;
+        # every other step is row-wise, so it only has to run on the rows kept
+        self.filters = [step for step in kept if step.is_filter]
+        last_filter = max((kept.index(step) for step in self.filters), default=-1)
+        filter_inputs = {col for step in self.filters for col in step.inputs}
+        self.pre_filter = []
+        for i in reversed(range(last_filter)):
+            step = kept[i]
+            if not step.is_filter and step.output in filter_inputs:
+                self.pre_filter.insert(0, step)
+                filter_inputs.update(step.inputs)
+        post = [step for step in kept
+                if not step.is_filter and step not in self.pre_filter]
+        for step in self.pre_filter:
+            if not step.row_wise:
+                raise ValueError(f"Step '{step.name}' reads other rows, so it cannot feed a filter.")
+
+        # Steps that touch a common column end up in the same group
+        parent = {}
+
+        def find(col):
+            while parent.setdefault(col, col) != col:
+                col = parent[col]
+            return col
+
+        for step in post:
+            root = find(step.output)
+            for col in step.inputs:
+                parent[find(col)] = root
+        groups = {}
+        for step in post:
+            groups.setdefault(find(step.output), []).append(step)
+        self.groups = list(groups.values())
+        produced = {step.output for step in post}
+        self.selected_columns = [col for col in self.output_columns if col not in produced]
+
+    def _call(self, step, columns, stats, profiler):
+        if profiler is None:
+            return step(columns, stats)
+        with profiler.stage(step.label, rows_in=len(columns[step.inputs[0]]),
+                            parent=step.stage) as record:
+            result = step(columns, stats)
+            record['rows_out'] = int(result.sum()) if step.is_filter else len(result)
+        return result
+
+    def select_rows(self, df, stats=None, profiler=None):
+        """
+        Runs the steps the filters depend on and the filters.
+
+        Parameters:
+        df (pd.DataFrame): The raw data, with the plan's input columns.
+        stats (CleaningStatistics, optional): Fitted statistics, if a step uses them.
+        profiler (StageProfiler, optional): If given, every step is recorded.
+
+        Returns:
+        dict: Column name to pd.Series on the rows kept, for the input columns and the
+              outputs of the pre-filter steps.
+        """
+        columns = {col: df[col] for col in self.input_columns}
+        for step in self.pre_filter:
+            columns[step.output] = self._call(step, columns, stats, profiler)
+
+        if self.filters:
+            keep = np.logical_and.reduce([self._call(step, columns, stats, profiler).to_numpy()
+                                          for step in self.filters])
+            if not keep.all():
+                positions = np.flatnonzero(keep)
+                with profile_stage(profiler, 'take_rows', rows_in=len(keep),
+                                   parent=self.filters[0].stage) as record:
+                    columns = {col: series.take(positions) for col, series in columns.items()}
+                    record['rows_out'] = len(positions)
+        return columns
+
+    def run_group(self, group, columns, stats=None, profiler=None):
+        """
+        Runs one of the plan's groups on the columns from select_rows. The steps pass
+        their columns along without building a frame.
+
+        Returns:
+        dict: Column name to pd.Series, for the outputs of the group's steps.
+        """
+        local = {}
+        for step in group:
+            local[step.output] = self._call(step, {**columns, **local}, stats, profiler)
+        return local
+
+    def run(self, df, stats=None, n_jobs=1, profiler=None):
+        """
+        Runs the plan on a DataFrame that has the plan's input columns.
+
+        Parameters:
+        df (pd.DataFrame): The raw data.
+        stats (CleaningStatistics, optional): Fitted statistics, if a step uses them.
+        n_jobs (int): Number of threads for the groups.
+        profiler (StageProfiler, optional): If given, every step is recorded under its
+                                            stage, and the groups run on one thread.
+
+        Returns:
+        pd.DataFrame: The cleaned data, without modifying df.
+        """
+        columns = self.select_rows(df, stats, profiler)
+
+        def run_group(group):
+            return self.run_group(group, columns, stats, profiler)
+
+        if n_jobs > 1 and len(self.groups) > 1 and profiler is None:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(run_group, self.groups))
+        else:
+            results = [run_group(group) for group in self.groups]
+        for local in results:
+            columns.update(local)
+
+        return pd.DataFrame({col: columns[col] for col in self.output_columns})
+
+    def describe(self):
+        """Returns a readable summary of the plan."""
+        lines = [f"reads: {', '.join(self.input_columns)}"]
+        for step in self.pre_filter:
+            lines.append(f"  {step.output}: {step.name}")
+        for step in self.filters:
+            lines.append(f"filter: {step.name}({', '.join(step.inputs)})")
+        for group in self.groups:
+            outputs = list(dict.fromkeys(step.output for step in group))
+            lines.append(f"  {', '.join(outputs)}: {' -> '.join(step.name for step in group)}")
+        return '\n'.join(lines)
+
+
+class Pipeline:
+    """
+    Declarative cleaning pipeline compiled from column-level steps.
+
+    The same object cleans whole files or chunks (transform) and batches of raw
+    records for scoring (transform_records). Before running, the steps are compiled
+    into a Plan for the columns at hand, which:
+    - reads only the columns the requested outputs depend on (see input_columns, which
+      can be passed to the CSV reader as usecols),
+    - applies the row filters right after the steps they depend on, so the other steps
+      only process the rows that are kept,
+    - fuses the steps on each column into one chain that runs without writing back into
+      a DataFrame in between, and
+    - splits the chains into groups with no column in common, which can run on several
+      threads (n_jobs). This only pays off where the steps release the GIL.
+
+    Plans are cached per set of available columns.
+
+    Parameters:
+    steps (list, optional): Step objects, in order. Defaults to cleaning_steps().
+    columns (list, optional): Output columns. Defaults to every available column that
+                              is not in drop.
+    drop (list): Columns left out of the output when columns is not given.
+    stats (CleaningStatistics, optional): Fitted statistics for the steps that need
+                                          them. If None, they are fitted on each
+                                          DataFrame passed to transform.
+    n_jobs (int): Number of threads for the independent column groups.
+
+    Usage:
+        pipeline = Pipeline(drop=IDENTIFIER_COLUMNS, stats=stats)
+        df = read_raw_csv(path, columns=pipeline.input_columns(RAW_SCHEMA))
+        cleaned = pipeline.transform(df)
+        rows = pipeline.transform_records([{'Age': '23', 'Month': 'January', ...}, ...])
+    """
+
+    def __init__(self, steps=None, columns=None, drop=(), stats=None, n_jobs=1):
+        self.steps = cleaning_steps() if steps is None else list(steps)
+        self.columns = None if columns is None else list(columns)
+        self.drop = list(drop)
+        self.stats = stats
+        self.n_jobs = n_jobs
+        self._plans = {}
+
+    def plan(self, available):
+        """
+        Returns the Plan for data with the given columns.
+
+        Parameters:
+        available (iterable): Names of the columns in the data, in order.
+
+        Returns:
+        Plan: The compiled plan.
+        """
+        key = tuple(available)
+        if key not in self._plans:
+            self._plans[key] = Plan(self.steps, key, self.columns, self.drop)
+        return self._plans[key]
+
+    def input_columns(self, available):
+        """Returns the columns among available that the pipeline reads."""
+        return self.plan(available).input_columns
+
+    def transform(self, df, profiler=None):
+        """
+        Cleans a DataFrame. df is not modified.
+
+        Parameters:
+        df (pd.DataFrame): The raw data, or a chunk of it.
+        profiler (StageProfiler, optional): If given, the run is recorded as a
+                                            'pipeline' stage with every step below it.
+
+        Returns:
+        pd.DataFrame: The cleaned data.
+        """
+        with profile_stage(profiler, 'pipeline', rows_in=len(df)) as record:
+            plan = self.plan(df.columns)
+            stats = self.stats
+            if stats is None and plan.uses_stats:
+                with profile_stage(profiler, 'fit_statistics', rows_in=len(df)):
+                    stats = CleaningStatistics().fit(df)
+            result = plan.run(df, stats, self.n_jobs, profiler)
+            record['rows_out'] = len(result)
+        return result
+
+    def transform_records(self, records):
+        """
+        Cleans raw records for scoring, all in one pipeline run.
+
+        A run has a fixed cost of a few milliseconds per step whatever the number of
+        rows, so records should be scored in batches rather than one by one.
+
+        Parameters:
+        records (list): Dicts of column name to raw value, as in the raw CSV (strings
+                        for the text columns), all with the same columns.
+
+        Returns:
+        list: The cleaned records as dicts, in order, with None for the records a
+              filter rejects (e.g. Age above 100).
+        """
+        if not records:
+            return []
+        if self.stats is None and self.plan(list(records[0])).uses_stats:
+            raise ValueError("Scoring records needs fitted statistics (stats=...).")
+        df = pd.DataFrame(records, dtype=object)
+        for col in df.columns:
+            # Numeric raw columns get the dtype read_raw_csv gives them
+            if RAW_SCHEMA.get(col) in ('float64', 'int64'):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        cleaned = self.plan(df.columns).run(df, self.stats)
+        rows = cleaned.astype(object).to_dict('index')
+        return [rows.get(i) for i in range(len(records))]
+
+    def transform_record(self, record):
+        """
+        Cleans a single raw record, a shorthand for transform_records([record]). It
+        costs a whole pipeline run (about 20 ms), so it suits checks and examples;
+        use transform_records to score many records.
+
+        Parameters:
+        record (dict): Column name to raw value, as in the raw CSV.
+
+        Returns:
+        dict: The cleaned record, or None if a filter rejects it.
+        """
+        return self.transform_records([record])[0]
+
+    def __repr__(self):
+        return f"Pipeline({len(self.steps)} steps, n_jobs={self.n_jobs})"
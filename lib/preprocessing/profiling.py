@@ -0,0 +1,238 @@
+from contextlib import contextmanager, nullcontext
+import json
+import logging
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_total():
+    return {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows_in': None, 'rows_out': None,
+            'peak_bytes': 0, 'allocated_bytes': 0}
+
+
+def _add(total, record):
+    total['wall_s'] += record['wall_s']
+    total['cpu_s'] += record['cpu_s']
+    total['peak_bytes'] = max(total['peak_bytes'], record.get('peak_bytes', 0))
+    total['allocated_bytes'] += record.get('allocated_bytes', 0)
+
+
+def _rows(count):
+    return '' if count is None else count
+
+
+def profile_stage(profiler, name, rows_in=None, parent=None):
+    """
+    Returns profiler.stage(...), or a context that records nothing if profiler is None,
+    so optional profiling does not need a branch at every call site.
+    """
+    if profiler is None:
+        return nullcontext({})
+    return profiler.stage(name, rows_in=rows_in, parent=parent)
+
+
+class StageProfiler:
+    """
+    Records the cost of each cleaning stage: wall time, CPU time, rows in and out,
+    peak memory and bytes allocated.
+
+    Stages can be nested, and every record keeps its path (e.g.
+    "pipeline;transform_data_types;parse_amount(Annual_Income)"), so the records can be
+    summed into a tree (summary) or exported as folded stacks for flame graph tools
+    (folded). Each record is also logged as JSON on the 'lib.preprocessing.profiling'
+    logger at INFO level.
+
+    Memory is measured with tracemalloc, which sees the allocations of Python objects
+    and numpy arrays but not those made inside pyarrow. Tracing slows down code that
+    allocates many small objects by an order of magnitude (to_numeric on text, to_csv),
+    so the times are only comparable between runs with the same memory setting.
+
+    Usage:
+        profiler = StageProfiler()
+        with profiler.stage("transform_data_types", rows_in=len(df)) as record:
+            df = transform_data_types(df)
+            record["rows_out"] = len(df)
+        print(profiler.summary())
+        profiler.save("profile.json")
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self._stack = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows_in=None, parent=None):
+        """
+        Profiles the code in the with block as one stage.
+
+        Parameters:
+        name (str): Name of the stage.
+        rows_in (int, optional): Number of input rows.
+        parent (str, optional): Name of a frame to group the stage under in the path,
+                                without timing it, e.g. the cleaning stage that a
+                                pipeline step belongs to.
+
+        Yields:
+        dict: The record, where the block can set 'rows_out'.
+        """
+        path = [frame['path'] for frame in self._stack[-1:]]
+        if parent is not None:
+            path.append(parent)
+        record = {
+            'name': name,
+            'path': ';'.join(path + [name]),
+            'rows_in': rows_in,
+            'rows_out': None,
+        }
+
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # The parent's peak so far is kept before the peak is reset for this stage
+                self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+            tracemalloc.reset_peak()
+            record['_start_bytes'] = current
+            record['_peak'] = current
+
+        self._stack.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - wall
+            record['cpu_s'] = time.process_time() - cpu
+            self._stack.pop()
+
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, record.pop('_peak'))
+                start = record.pop('_start_bytes')
+                record['peak_bytes'] = peak - start
+                record['allocated_bytes'] = current - start
+                if self._stack:
+                    self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+                elif self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+
+            self.records.append(record)
+            logger.info(json.dumps(record))
+
+    def profile(self, func, df, *args, parent=None, **kwargs):
+        """
+        Calls func(df, *args, **kwargs) as a stage named after func, and returns
+        its result. Meant for the cleaning stages, which take and return a DataFrame.
+        """
+        with self.stage(func.__name__, rows_in=len(df), parent=parent) as record:
+            result = func(df, *args, **kwargs)
+            record['rows_out'] = len(result)
+        return result
+
+    def extend(self, records):
+        """Adds records made by another profiler, e.g. in a worker process."""
+        self.records.extend(records)
+
+    def totals(self):
+        """
+        Sums the records by path. A frame that was only given as a parent gets the
+        sums of its children, without row counts. Row counts that were not recorded
+        stay None.
+
+        Returns:
+        dict: Path to a dict with 'calls', 'wall_s', 'cpu_s', 'rows_in', 'rows_out',
+              'peak_bytes' (the largest peak of any call) and 'allocated_bytes'.
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['path'], _empty_total())
+            total['calls'] += 1
+            for key in ('rows_in', 'rows_out'):
+                if record[key] is not None:
+                    total[key] = (total[key] or 0) + record[key]
+            _add(total, record)
+
+        # Untimed parent frames add up their children, up to the nearest timed frame
+        derived = {}
+        for path, total in totals.items():
+            parts = path.split(';')
+            for depth in range(len(parts) - 1, 0, -1):
+                parent = ';'.join(parts[:depth])
+                if parent in totals:
+                    break
+                frame = derived.setdefault(parent, _empty_total())
+                frame['calls'] = max(frame['calls'], total['calls'])
+                _add(frame, total)
+        totals.update(derived)
+        return totals
+
+    def folded(self):
+        """
+        Returns the wall time of each path in microseconds, in the folded stack format
+        read by flamegraph.pl and speedscope ("a;b;c 1234" per line). Time spent in a
+        frame outside its children is reported on the frame's own line.
+        """
+        totals = self.totals()
+        lines = []
+        for path in sorted(totals):
+            children = sum(total['wall_s'] for child, total in totals.items()
+                           if child.startswith(path + ';') and child.count(';') == path.count(';') + 1)
+            own = max(totals[path]['wall_s'] - children, 0.0)
+            if own > 0:
+                lines.append(f"{path} {int(own * 1e6)}")
+        return '\n'.join(lines)
+
+    def summary(self, width=30):
+        """
+        Returns a flame-style text summary: one line per frame, indented by depth,
+        with a bar proportional to its wall time and its summed metrics.
+
+        Parameters:
+        width (int): Width of the bar of the slowest root frame.
+        """
+        totals = self.totals()
+        if not totals:
+            return "No stages recorded."
+        roots = [path for path in totals if ';' not in path]
+        scale = max(totals[path]['wall_s'] for path in roots) or 1.0
+        name_width = max(2 * path.count(';') + len(path.rsplit(';', 1)[-1]) for path in totals)
+        name_width = max(name_width, len('stage'))
+        # Memory columns only when it was traced
+        memory = any('peak_bytes' in record for record in self.records)
+
+        header = (f"{'stage':<{name_width}}  {'':<{width}} {'calls':>6} {'wall (s)':>9} "
+                  f"{'cpu (s)':>8} {'rows in':>10} {'rows out':>10}")
+        lines = [header + (f" {'peak (MB)':>10} {'alloc (MB)':>11}" if memory else '')]
+
+        def visit(path):
+            total = totals[path]
+            depth = path.count(';')
+            name = '  ' * depth + path.rsplit(';', 1)[-1]
+            bar = '█' * max(1, round(total['wall_s'] / scale * width))
+            line = (f"{name:<{name_width}}  {bar:<{width}} {total['calls']:>6} "
+                    f"{total['wall_s']:>9.3f} {total['cpu_s']:>8.3f} {_rows(total['rows_in']):>10} "
+                    f"{_rows(total['rows_out']):>10}")
+            if memory:
+                line += (f" {total['peak_bytes'] / 2**20:>10.1f} "
+                         f"{total['allocated_bytes'] / 2**20:>11.1f}")
+            lines.append(line)
+            children = [child for child in totals
+                        if child.startswith(path + ';') and child.count(';') == depth + 1]
+            # Slowest first, like the widest frames of a flame graph
+            for child in sorted(children, key=lambda c: -totals[c]['wall_s']):
+                visit(child)
+
+        for root in sorted(roots, key=lambda r: -totals[r]['wall_s']):
+            visit(root)
+        return '\n'.join(lines)
+
+    def save(self, path):
+        """Saves the records and their totals by path to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump({'records': self.records, 'totals': self.totals()}, f, indent=4)
@@ -0,0 +1,301 @@
+import json
+import numpy as np
+import pandas as pd
+
+from lib.preprocessing.cleaning import MEDIAN_IMPUTED_COLUMNS, convert_to_months, parse_number
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch over a stream of numbers.
+
+    Values are kept as exact (value, count) pairs, so quantiles match pandas as long
+    as the number of distinct values stays under max_size. Past that, neighbouring
+    values are merged into weighted centroids and quantiles become approximate.
+    """
+
+    def __init__(self, max_size=200_000):
+        self.max_size = max_size
+        self.values = np.empty(0, dtype=float)
+        self.weights = np.empty(0, dtype=float)
+        self.exact = True
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values, weights=None):
+        """
+        Adds values to the sketch. NaN values are ignored.
+
+        Parameters:
+        values (array-like): The values to add.
+        weights (array-like, optional): A count for each value (default is 1 each).
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=float).ravel()
+        keep = ~np.isnan(values)
+        self._add(values[keep], weights[keep])
+        return self
+
+    def merge(self, other):
+        """Merges another sketch into this one."""
+        self._add(other.values, other.weights)
+        self.exact = self.exact and other.exact
+        return self
+
+    def _add(self, values, weights):
+        if len(values) == 0:
+            return
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        self.values, inverse = np.unique(values, return_inverse=True)
+        self.weights = np.bincount(inverse, weights=weights)
+        if len(self.values) > self.max_size:
+            self._compress()
+
+    def _compress(self):
+        # Group sorted values into equal-weight bins and keep one weighted mean per bin
+        n_bins = self.max_size // 2
+        cum = np.cumsum(self.weights)
+        bins = np.minimum((cum - self.weights / 2) / cum[-1] * n_bins, n_bins - 1).astype(int)
+        weights = np.bincount(bins, weights=self.weights)
+        sums = np.bincount(bins, weights=self.values * self.weights)
+        used = weights > 0
+        self.values = sums[used] / weights[used]
+        self.weights = weights[used]
+        self.exact = False
+
+    def quantile(self, q=0.5):
+        """
+        Returns the q-th quantile, using the same linear interpolation as pandas.
+
+        Parameters:
+        q (float): The quantile to compute, between 0 and 1.
+
+        Returns:
+        float: The quantile, or NaN if the sketch is empty.
+        """
+        if len(self.values) == 0:
+            return np.nan
+        cum = np.cumsum(self.weights)
+        position = q * (cum[-1] - 1)
+        lower = np.floor(position)
+        lo = self.values[min(np.searchsorted(cum, lower, side='right'), len(cum) - 1)]
+        hi = self.values[min(np.searchsorted(cum, lower + 1, side='right'), len(cum) - 1)]
+        return float(lo + (position - lower) * (hi - lo))
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def copy(self):
+        sketch = QuantileSketch(self.max_size)
+        sketch.values = self.values.copy()
+        sketch.weights = self.weights.copy()
+        sketch.exact = self.exact
+        return sketch
+
+
+class CleaningStatistics:
+    """
+    Statistics used by the cleaning stages, fitted once and reused everywhere.
+
+    transform_data_types and handle_missing_data compute their medians from the frame
+    they are given, so the output depends on how the data is split into batches. This
+    class fits those medians over the whole dataset in one streaming pass (see fit and
+    partial_fit) and hands the same values to every chunk, worker and later dataset
+    through the stats argument of those functions.
+
+    The medians are computed from the sketches when first read after fit, partial_fit
+    or merge, so fitting many chunks does not recompute them after every chunk.
+
+    Attributes (available after fit):
+    age_median (int): Median of all numeric ages, used to fill missing ages.
+    median_age (int): Median of the non-negative ages, used to replace negative ages.
+    medians (dict): Median of each column in MEDIAN_IMPUTED_COLUMNS, over the rows
+                    that transform_data_types keeps.
+    """
+
+    # Raw columns needed to fit the statistics, useful as usecols when reading
+    columns = ['Age'] + MEDIAN_IMPUTED_COLUMNS
+
+    # Rows are grouped by their raw Age, because whether negative and missing ages
+    # survive the Age filter is only known once the Age medians are final
+    _groups = ('valid', 'negative', 'missing')
+
+    def __init__(self, max_size=200_000):
+        self.max_size = max_size
+        self.n_rows = 0
+        self.n_missing_age = 0
+        self.age = QuantileSketch(max_size)
+        self.non_negative_age = QuantileSketch(max_size)
+        self.column_sketches = {
+            group: {col: QuantileSketch(max_size) for col in MEDIAN_IMPUTED_COLUMNS}
+            for group in self._groups
+        }
+        # The medians, or None until they are read after a fit (see _fitted_medians)
+        self._medians = None
+        self._stale = False
+
+    def partial_fit(self, df):
+        """
+        Updates the statistics with one chunk of the raw data.
+
+        Parameters:
+        df (pd.DataFrame): A chunk of the raw data, containing at least the columns
+                           in CleaningStatistics.columns.
+
+        Returns:
+        CleaningStatistics: self
+        """
+        ages = parse_number(df['Age'])
+        truncated = np.trunc(ages)
+
+        self.n_rows += len(df)
+        self.n_missing_age += int(ages.isna().sum())
+        self.age.update(ages)
+        self.non_negative_age.update(truncated[truncated >= 0])
+
+        groups = {
+            'valid': (truncated >= 0) & (truncated <= 100),
+            'negative': truncated < 0,
+            'missing': ages.isna(),
+        }
+        values = self._column_values(df)
+        for group, mask in groups.items():
+            mask = mask.to_numpy()
+            for col, column in values.items():
+                self.column_sketches[group][col].update(column[mask])
+
+        self._stale = True
+        return self
+
+    def fit(self, data):
+        """
+        Fits the statistics in one pass over a DataFrame or an iterable of chunks
+        (for example the reader returned by pd.read_csv(..., chunksize=...)).
+
+        Returns:
+        CleaningStatistics: self
+        """
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        """
+        Merges statistics fitted on another part of the data, e.g. by another process.
+
+        Returns:
+        CleaningStatistics: self
+        """
+        self.n_rows += other.n_rows
+        self.n_missing_age += other.n_missing_age
+        self.age.merge(other.age)
+        self.non_negative_age.merge(other.non_negative_age)
+        for group in self._groups:
+            for col in MEDIAN_IMPUTED_COLUMNS:
+                self.column_sketches[group][col].merge(other.column_sketches[group][col])
+        self._stale = True
+        return self
+
+    @staticmethod
+    def _column_values(df):
+        # The values each column has when handle_missing_data sees it
+        values = {}
+        for col in MEDIAN_IMPUTED_COLUMNS:
+            if col == 'Credit_History_Age':
+                column = convert_to_months(df[col])
+            else:
+                column = parse_number(df[col])
+            values[col] = column.to_numpy(dtype=float)
+        return values
+
+    def _fitted_medians(self):
+        # The medians of the data seen so far, computed again only if chunks or other
+        # statistics were added since they were last read
+        if self._stale:
+            self._medians = self._finalize()
+            self._stale = False
+        return self._medians if self._medians is not None else {}
+
+    def _finalize(self):
+        # Mirror the Age logic in transform_data_types
+        age_median = int(self.age.median()) if self.age.count > 0 else 0
+
+        non_negative = self.non_negative_age.copy()
+        if age_median >= 0 and self.n_missing_age > 0:
+            non_negative.update([age_median], [self.n_missing_age])
+        median_age = int(non_negative.median()) if non_negative.count > 0 else 0
+
+        missing_age = age_median if age_median >= 0 else median_age
+        kept = ['valid']
+        if 0 <= median_age <= 100:
+            kept.append('negative')
+        if 0 <= missing_age <= 100:
+            kept.append('missing')
+
+        medians = {}
+        for col in MEDIAN_IMPUTED_COLUMNS:
+            sketch = QuantileSketch(self.max_size)
+            for group in kept:
+                sketch.merge(self.column_sketches[group][col])
+            medians[col] = sketch.median()
+        return {'age_median': age_median, 'median_age': median_age, 'medians': medians}
+
+    @property
+    def age_median(self):
+        return self._fitted_medians().get('age_median')
+
+    @property
+    def median_age(self):
+        return self._fitted_medians().get('median_age')
+
+    @property
+    def medians(self):
+        return self._fitted_medians().get('medians')
+
+    @property
+    def exact(self):
+        """True if no sketch had to be compressed, i.e. the medians are exact."""
+        sketches = [self.age, self.non_negative_age] + [
+            sketch for group in self.column_sketches.values() for sketch in group.values()
+        ]
+        return all(sketch.exact for sketch in sketches)
+
+    def to_dict(self):
+        """Returns the fitted medians as a JSON-serializable dictionary."""
+        return {
+            'n_rows': self.n_rows,
+            'exact': self.exact,
+            'age_median': self.age_median,
+            'median_age': self.median_age,
+            'medians': {col: (None if pd.isna(v) else v) for col, v in self.medians.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restores fitted statistics from to_dict output. The result can be passed to the
+        cleaning functions but not fitted further, since the sketches are not stored.
+        """
+        stats = cls()
+        stats.n_rows = data['n_rows']
+        stats._medians = {
+            'age_median': data['age_median'],
+            'median_age': data['median_age'],
+            'medians': {col: (np.nan if v is None else v) for col, v in data['medians'].items()},
+        }
+        return stats
+
+    def save(self, path):
+        """Saves the fitted medians to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    @classmethod
+    def load(cls, path):
+        """Loads fitted medians saved with save."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from lib.preprocessing.groups import GroupIndex
+
+# Fields that should hardly change between a customer's months but have noisy or
+# missing entries in the raw data; fill_in_group replaces those from the customer's
+# other months
+FILL_COLUMNS = ['Annual_Income', 'Num_of_Loan', 'Age']
+
+# Plausible ranges of the fill columns: values outside them are treated as noise,
+# e.g. ages of -500 or 8000 and hundreds of loans
+VALID_RANGES = {
+    'Age': (14, 100),
+    'Num_of_Loan': (0, 20),
+}
+
+# Columns that get lag, rolling mean and delta features by default
+FEATURE_COLUMNS = [
+    'Annual_Income',
+    'Monthly_Inhand_Salary',
+    'Num_of_Delayed_Payment',
+    'Outstanding_Debt',
+    'Credit_Utilization_Ratio',
+    'Monthly_Balance',
+]
+
+
+def customer_index(df, customer='Customer_ID', month='Month'):
+    """
+    Returns the GroupIndex of a frame's rows by customer, ordered by month.
+
+    Parameters:
+    df (pd.DataFrame): Data with the customer column and the month as a number
+                       (see convert_month).
+    """
+    return GroupIndex(df[customer], order_by=df[month])
+
+
+def fill_in_group(df, columns=None, valid_ranges=None, index=None, copy=True):
+    """
+    Fills missing and implausible values of noisy per-customer fields from the same
+    customer's other months: forward from the last earlier month, then backward from
+    the next month for the customer's first months. Values with no other month to
+    fill from stay missing.
+
+    Parameters:
+    df (pd.DataFrame): Data with Customer_ID and a numeric Month.
+    columns (list, optional): Columns to fill. Defaults to FILL_COLUMNS.
+    valid_ranges (dict, optional): Column name to (low, high); values outside are
+                                   filled too. Defaults to VALID_RANGES.
+    index (GroupIndex, optional): A customer_index of df, to reuse.
+    copy (bool): If False, the columns are replaced in df itself.
+
+    Returns:
+    pd.DataFrame: The data with the filled columns; integer columns become float
+                  if some values could not be filled.
+    """
+    columns = FILL_COLUMNS if columns is None else columns
+    valid_ranges = VALID_RANGES if valid_ranges is None else valid_ranges
+    index = customer_index(df) if index is None else index
+    df = df.copy() if copy else df
+
+    for col in columns:
+        values = df[col].to_numpy(dtype=float, na_value=np.nan)
+        if col in valid_ranges:
+            low, high = valid_ranges[col]
+            values = np.where((values >= low) & (values <= high), values, np.nan)
+        filled = index.ffill(values)
+        filled = np.where(np.isnan(filled), index.bfill(values), filled)
+        # Integer columns stay integer unless a value could not be filled
+        if pd.api.types.is_integer_dtype(df[col]) and not np.isnan(filled).any():
+            filled = filled.astype(df[col].dtype)
+        df[col] = filled
+    return df
+
+
+def customer_features(df, columns=None, lags=(1,), windows=(3,), deltas=(1,), index=None,
+                      month='Month'):
+    """
+    Computes per-customer temporal features, each row using the customer's earlier
+    months only (and its own):
+
+    - <col>_lag<k>: the value k months earlier
+    - <col>_mean<w>: the mean over the last w months, including the current one
+    - <col>_delta<k>: the change since k months earlier
+
+    Months are taken from the month column, not counted in rows, so a month missing
+    from the data (e.g. a row removed by the Age filter) gives NaN rather than the
+    value of an earlier month. Rows of unknown month (0, see convert_month) get NaN
+    features and are not used by the other rows.
+
+    Parameters:
+    df (pd.DataFrame): Data with Customer_ID and a numeric Month, in any row order.
+    columns (list, optional): Columns to compute features for. Defaults to
+                              FEATURE_COLUMNS; columns missing from df are skipped.
+    lags (tuple): Lags in months.
+    windows (tuple): Rolling window lengths in months.
+    deltas (tuple): Delta periods in months.
+    index (GroupIndex, optional): A customer_index of df, to reuse.
+    month (str): The numeric month column.
+
+    Returns:
+    pd.DataFrame: The features as float32, with the index of df.
+    """
+    columns = FEATURE_COLUMNS if columns is None else columns
+    index = customer_index(df, month=month) if index is None else index
+    known = df[month].to_numpy() > 0
+    features = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        values = np.where(known, df[col].to_numpy(dtype=float, na_value=np.nan), np.nan)
+        # Each feature is narrowed as soon as it is computed, to bound peak memory
+        for k in lags:
+            features[f"{col}_lag{k}"] = index.shift(values, k, on_order=True).astype(np.float32)
+        for w in windows:
+            features[f"{col}_mean{w}"] = index.rolling_mean(values, w, on_order=True).astype(np.float32)
+        for k in deltas:
+            features[f"{col}_delta{k}"] = index.diff(values, k, on_order=True).astype(np.float32)
+    return pd.DataFrame(features, index=df.index)
+
+
+def add_customer_features(df, fill_columns=None, feature_columns=None, customer='Customer_ID',
+                          month='Month', drop_customer=True, **options):
+    """
+    Fills the noisy per-customer fields (fill_in_group), adds the temporal features
+    (customer_features) and drops the customer column. The customer index is built
+    once and shared by both.
+
+    Parameters:
+    df (pd.DataFrame): Cleaned data that still has the customer column.
+    fill_columns (list, optional): See fill_in_group.
+    feature_columns (list, optional): See customer_features.
+    customer (str): The customer column.
+    month (str): The numeric month column.
+    drop_customer (bool): If True, drop the customer column afterwards.
+    options: lags, windows and deltas, passed to customer_features.
+
+    Returns:
+    pd.DataFrame: The data with the filled fields and the feature columns appended.
+    """
+    index = customer_index(df, customer, month)
+    df = fill_in_group(df, fill_columns, index=index, copy=False)
+    features = customer_features(df, feature_columns, index=index, month=month, **options)
+    df = pd.concat([df, features], axis=1)
+    if drop_customer:
+        del df[customer]
+    return df
@@ -1,56 +1,347 @@
-from lib.preprocessing.cleaning import (
-    drop_columns,
-    transform_data_types,
-    clean_categorical,
-    transform_special_columns,
-    handle_missing_data
-)
-from lib.io.load import load_data
+from lib.preprocessing.statistics import CleaningStatistics
+from lib.preprocessing.cache import StageCache
+from lib.preprocessing.pipeline import Pipeline, cleaning_steps
+from lib.preprocessing.profiling import StageProfiler, profile_stage
+from lib.preprocessing.compaction import compact_data, compaction_summary, merge_reports
+from lib.preprocessing.temporal import add_customer_features
+from lib.io.schema import RAW_SCHEMA
+from lib.io.load import read_raw_csv, raw_columns, csv_byte_ranges, group_chunks
+from lib.io.save import ChunkWriter, save_data
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import os
-import pandas as pd  # Add this import if not already present
 
-def process_and_save(file_name, output_name):
-    # Construct the absolute path for the input file
+columns_to_drop = [
+    "ID",
+    "Name",  
+    "SSN",  
+    "Customer_ID",  
+]
+
+# Approximate size of the row partitions a file is split into on several workers
+partition_bytes = 64 * 2**20
+
+def cleaning_pipeline(stats=None, keep_customer=False, impute="median"):
+    """
+    Returns the cleaning stages of lib.preprocessing.cleaning as a compiled Pipeline,
+    which reads only the columns it needs and filters rows before the steps that do
+    not depend on the filter.
+
+    Parameters:
+    stats (CleaningStatistics, optional): Fitted statistics for the imputation steps.
+                                          If None, they are fitted on each DataFrame.
+    keep_customer (bool): If True, Customer_ID is kept for the customer features.
+    impute (str): 'median' or 'customer', see lib.preprocessing.pipeline.cleaning_steps.
+    """
+    drop = [col for col in columns_to_drop if not (keep_customer and col == "Customer_ID")]
+    return Pipeline(steps=cleaning_steps(impute), drop=drop, stats=stats)
+
+
+def raw_path(file_name):
+    # Construct the absolute path for a file in 'data/raw'
     data_dir = os.path.join(os.path.dirname(__file__), "data/raw")
-    file_path = os.path.join(data_dir, file_name)
+    return os.path.join(data_dir, file_name)
 
-    # Explicitly set low_memory=False to avoid DtypeWarning
-    df = pd.read_csv(file_path, low_memory=False)
-    print("-----")
 
-    columns_to_drop = [
-        "ID",
-        "Name",  
-        "SSN",  
-        "Customer_ID",  
-    ]
-    df = drop_columns(df, columns_to_drop)
-    print("drops the columns ✅")
+def processed_path(output_name):
+    # Construct the absolute path for a file in 'data/processed', creating the directory
+    processed_dir = os.path.join(os.path.dirname(__file__), "data/processed")
+    os.makedirs(processed_dir, exist_ok=True)
+    return os.path.join(processed_dir, output_name)
 
-    print("-----")
-    df = transform_data_types(df)
-    print("Transforms the data types ✅")
 
-    print("-----")
-    df = clean_categorical(df)
-    print("cleans the categorical columns ✅")
+def partitions(file_path, workers):
+    # At least one partition per worker, more for files larger than partition_bytes
+    n_parts = max(workers, -(-os.path.getsize(file_path) // partition_bytes))
+    return csv_byte_ranges(file_path, n_parts)
+
+
+def fit_partition(file_path, byte_range, engine=None):
+    # Runs in a worker process: fit the statistics on one row partition
+    df = read_raw_csv(file_path, columns=CleaningStatistics.columns, byte_range=byte_range, engine=engine)
+    return CleaningStatistics().partial_fit(df)
+
+
+def compact(df, report, profiler=None, errors='keep'):
+    # The optional compaction stage, see lib.preprocessing.compaction. Chunks and
+    # partitions pass errors='raise', since they are all written with the dtypes of
+    # the first one
+    with profile_stage(profiler, 'compact_data', rows_in=len(df)) as record:
+        df = compact_data(df, errors=errors, report=report)
+        record['rows_out'] = len(df)
+    return df
 
-    print("-----")
-    df = transform_special_columns(df)
-    print("Transforms special columns ✅")
 
+def print_compaction(report):
     print("-----")
-    df = handle_missing_data(df)
-    print("Handles missing data ✅")
+    print(compaction_summary(report))
+
+
+def clean_partition(file_path, byte_range, stats, engine=None, profile=False, profile_memory=False,
+                    compact_dtypes=False):
+    # Runs in a worker process: clean one row partition with the shared statistics.
+    # Returns the cleaned rows, the profiler records (empty unless profile is True;
+    # with memory figures if profile_memory is True too) and the compaction report
+    # (None unless compact_dtypes is True).
+    profiler = StageProfiler(memory=profile_memory) if profile else None
+    report = {} if compact_dtypes else None
+    pipeline = cleaning_pipeline(stats)
+    with profile_stage(profiler, 'read_raw_csv') as record:
+        df = read_raw_csv(file_path, columns=pipeline.input_columns(RAW_SCHEMA),
+                          byte_range=byte_range, engine=engine)
+        record['rows_out'] = len(df)
+    df = pipeline.transform(df, profiler=profiler)
+    if compact_dtypes:
+        # Compacted in the worker, so less data is sent back to the parent
+        df = compact(df, report, profiler, errors='raise')
+    return df, profiler.records if profiler is not None else [], report
+
+
+def fit_statistics(file_name, chunksize=None, engine=None, executor=None, workers=1):
+    """
+    Fits the cleaning statistics on a raw CSV file in a single pass.
+
+    Parameters:
+    file_name (str): Name of the raw CSV file.
+    chunksize (int, optional): If given, stream the file in chunks of this many rows.
+    engine (str, optional): CSV parser engine, e.g. 'pyarrow' (without chunksize).
+    executor (ProcessPoolExecutor, optional): If given, the file is split into row
+                                              partitions fitted in parallel, and the
+                                              partial statistics are merged in order.
+    workers (int): Number of workers in executor, used to size the partitions.
+
+    Returns:
+    CleaningStatistics: The fitted statistics.
+    """
+    file_path = raw_path(file_name)
+    if executor is not None:
+        stats = CleaningStatistics()
+        futures = [executor.submit(fit_partition, file_path, byte_range, engine)
+                   for byte_range in partitions(file_path, workers)]
+        for future in futures:
+            stats.merge(future.result())
+    else:
+        # Only the columns the medians depend on are parsed
+        reader = read_raw_csv(file_path, columns=CleaningStatistics.columns,
+                              chunksize=chunksize, engine=engine)
+        stats = CleaningStatistics().fit(reader)
+    print(f"Fitted cleaning statistics on {stats.n_rows} rows ✅")
+    return stats
+
+
+def process_and_save(file_name, output_name, chunksize=None, stats=None, engine=None, cache=None,
+                     profiler=None, compact_dtypes=False, customer_features=False, impute="median"):
+    """
+    Cleans a raw CSV file from 'data/raw' and writes it to 'data/processed'.
+
+    Parameters:
+    file_name (str): Name of the raw CSV file.
+    output_name (str): Name of the processed file. The extension (.csv, .parquet,
+                       .feather or .arrow) selects the format; all but CSV keep the
+                       cleaned dtypes and categoricals, and .arrow files can be
+                       memory-mapped by load_data.
+    chunksize (int, optional): If given, stream the file in chunks of this many
+                               rows and append each cleaned chunk to the output,
+                               so peak memory is bounded by the chunk size.
+    stats (CleaningStatistics, optional): Fitted statistics for the imputation steps.
+                                          In chunked mode they are fitted on the file
+                                          first if not given, so every chunk uses the
+                                          same medians.
+    engine (str, optional): CSV parser engine, e.g. 'pyarrow' (without chunksize).
+    cache (StageCache, optional): If given (and chunksize is not), the output of each
+                                  group of pipeline steps is cached, and groups whose
+                                  inputs, code and statistics are unchanged are
+                                  skipped on reruns.
+    profiler (StageProfiler, optional): If given, reading, each cleaning step and
+                                        writing are recorded. With a cache, the cache
+                                        reads and writes are recorded too, and only
+                                        the steps that are not cached.
+    compact_dtypes (bool): If True, the cleaned data is compacted (narrow numeric
+                           dtypes, categories and a Type_of_Loan bitmask) before it
+                           is written, and the memory saved is printed.
+    customer_features (bool): If True, noisy per-customer fields are filled from the
+                              customer's other months and lag, rolling mean and delta
+                              features are added before Customer_ID is dropped (see
+                              lib.preprocessing.temporal).
+    impute (str): 'median' to fill the numeric columns with their global median, or
+                  'customer' to fill them from the customer's other months first.
+
+    Customer features and customer imputation need all the rows of a customer at
+    once: in chunked mode the chunks are cut at customer boundaries (see
+    group_chunks).
+    """
+    by_customer = customer_features or impute == "customer"
+    file_path = raw_path(file_name)
 
     # Save the cleansed data to the 'processed' directory
-    processed_dir = os.path.join(os.path.dirname(__file__), "data/processed")
-    os.makedirs(processed_dir, exist_ok=True)
-    output_path = os.path.join(processed_dir, output_name)
-    df.to_csv(output_path, index=False)
+    output_path = processed_path(output_name)
+    pipeline = cleaning_pipeline(stats, keep_customer=customer_features, impute=impute)
+    columns = pipeline.input_columns(RAW_SCHEMA)
+    report = {} if compact_dtypes else None
+
+    if chunksize is None:
+        # The declared schema skips the identifier columns and avoids dtype inference
+        if cache is not None:
+            input_key = cache.input_key(file_path, reader=read_raw_csv, columns=columns, engine=engine)
+            df = cache.run_plan(pipeline.plan(raw_columns(file_path, columns)), input_key,
+                                lambda: read_raw_csv(file_path, columns=columns, engine=engine),
+                                stats=stats, log=print, profiler=profiler)
+        else:
+            with profile_stage(profiler, 'read_raw_csv') as record:
+                df = read_raw_csv(file_path, columns=columns, engine=engine)
+                record['rows_out'] = len(df)
+            df = pipeline.transform(df, profiler=profiler)
+        print("-----")
+        print(f"Cleaned {len(df)} rows ✅")
+        if customer_features:
+            with profile_stage(profiler, 'add_customer_features', rows_in=len(df)):
+                df = add_customer_features(df)
+            print(f"Added customer features, {df.shape[1]} columns ✅")
+        if compact_dtypes:
+            df = compact(df, report, profiler)
+        with profile_stage(profiler, 'save_data', rows_in=len(df)):
+            save_data(df, output_path)
+    else:
+        if stats is None:
+            stats = fit_statistics(file_name, chunksize=chunksize)
+            pipeline.stats = stats
+        reader = read_raw_csv(file_path, columns=columns, chunksize=chunksize)
+        if by_customer:
+            reader = group_chunks(reader, "Customer_ID")
+        with ChunkWriter(output_path) as writer:
+            for i, chunk in enumerate(reader):
+                chunk = pipeline.transform(chunk, profiler=profiler)
+                if customer_features:
+                    chunk = add_customer_features(chunk)
+                if compact_dtypes:
+                    chunk = compact(chunk, report, profiler, errors='raise')
+                with profile_stage(profiler, 'write_chunk', rows_in=len(chunk)):
+                    writer.write(chunk)
+                print(f"Chunk {i + 1}: {writer.rows} rows written ✅")
+
+    if compact_dtypes:
+        print_compaction(report)
     print("-----")
     print(f"Cleansed data saved to {output_path} ✅")
 
+
+def process_in_parallel(jobs, executor, workers, stats, engine=None, profiler=None,
+                        compact_dtypes=False):
+    """
+    Cleans several raw files on a process pool and writes them to 'data/processed'.
+
+    Every file is split into row partitions, and the partitions of all files are
+    queued on the pool together, so small and large files keep all workers busy.
+    All partitions use the same fitted statistics, and each output is written in
+    partition order, so the result is identical to a single-process run.
+
+    Parameters:
+    jobs (list): (file_name, output_name) pairs, as for process_and_save.
+    executor (ProcessPoolExecutor): The pool to run on.
+    workers (int): Number of workers in executor, used to size the partitions.
+    stats (CleaningStatistics): Fitted statistics shared by all partitions.
+    engine (str, optional): CSV parser engine, e.g. 'pyarrow'.
+    profiler (StageProfiler, optional): If given, the workers profile their partitions
+                                        (recording memory only if profiler does)
+                                        and their records are added to it.
+    compact_dtypes (bool): If True, the workers compact their partitions, as in
+                           process_and_save.
+    """
+    # Workers only need the medians, not the sketches they were fitted with
+    shared = CleaningStatistics.from_dict(stats.to_dict())
+
+    submitted = []
+    for file_name, output_name in jobs:
+        file_path = raw_path(file_name)
+        futures = [executor.submit(clean_partition, file_path, byte_range, shared, engine,
+                                   profiler is not None, profiler is not None and profiler.memory,
+                                   compact_dtypes)
+                   for byte_range in partitions(file_path, workers)]
+        submitted.append((output_name, futures))
+
+    for output_name, futures in submitted:
+        output_path = processed_path(output_name)
+        report = {}
+        with ChunkWriter(output_path) as writer:
+            for future in futures:
+                df, records, partition_report = future.result()
+                if profiler is not None:
+                    profiler.extend(records)
+                if partition_report is not None:
+                    merge_reports(report, partition_report)
+                writer.write(df)
+        if compact_dtypes:
+            print_compaction(report)
+        print("-----")
+        print(f"Cleansed data saved to {output_path} ({len(futures)} partitions) ✅")
+
 if __name__ == "__main__":
-    process_and_save("train.csv", "train_processed.csv")
-    process_and_save("test.csv", "test_processed.csv")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean the raw credit score data.")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the input in chunks of this many rows.")
+    parser.add_argument("--engine", choices=["c", "python", "pyarrow"], default=None,
+                        help="CSV parser engine (pyarrow cannot be combined with --chunksize).")
+    parser.add_argument("--format", choices=["csv", "parquet", "feather", "arrow"], default="csv",
+                        help="Format of the processed files (arrow: uncompressed, for memory-mapping).")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Cache the cleaning outputs here and skip unchanged steps on reruns.")
+    parser.add_argument("--cache-max-bytes", type=int, default=None,
+                        help="Evict the least recently used cached outputs above this size.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Clean the files on this many processes, splitting each file "
+                             "into row partitions (--chunksize and --cache-dir are not used then).")
+    parser.add_argument("--profile", default=None, metavar="PATH",
+                        help="Record the time, CPU time and rows of every stage, save them "
+                             "as JSON to PATH and print a flame-style summary.")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile, also record peak and allocated memory (slower).")
+    parser.add_argument("--customer-features", action="store_true",
+                        help="Fill noisy fields from each customer's other months and add "
+                             "lag, rolling mean and delta features (not with --workers).")
+    parser.add_argument("--impute", choices=["median", "customer"], default="median",
+                        help="Fill missing numbers with the global median, or from the "
+                             "customer's other months first (customer: not with --workers).")
+    parser.add_argument("--compact", action="store_true",
+                        help="Store the cleaned data in narrow numeric dtypes and categories, "
+                             "with Type_of_Loan as a bitmask, and print the memory saved.")
+    args = parser.parse_args()
+    if args.chunksize is not None and args.engine == "pyarrow":
+        parser.error("--engine pyarrow cannot be combined with --chunksize")
+    if (args.customer_features or args.impute == "customer") and args.workers > 1:
+        parser.error("--customer-features and --impute customer cannot be combined with --workers")
+    profiler = StageProfiler(memory=args.profile_memory) if args.profile else None
+    cache = StageCache(args.cache_dir, max_bytes=args.cache_max_bytes) if args.cache_dir else None
+
+    jobs = [
+        ("train.csv", f"train_processed.{args.format}"),
+        ("test.csv", f"test_processed.{args.format}"),
+    ]
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # Fit the imputation statistics on the training set once and share them
+            stats = fit_statistics("train.csv", engine=args.engine, executor=executor,
+                                   workers=args.workers)
+            stats.save(processed_path("cleaning_stats.json"))
+            process_in_parallel(jobs, executor, args.workers, stats, engine=args.engine,
+                                profiler=profiler, compact_dtypes=args.compact)
+    else:
+        # Fit the imputation statistics on the training set and reuse them for the test set
+        stats = fit_statistics("train.csv", chunksize=args.chunksize, engine=args.engine)
+        stats.save(processed_path("cleaning_stats.json"))
+
+        for file_name, output_name in jobs:
+            process_and_save(file_name, output_name, chunksize=args.chunksize, stats=stats,
+                             engine=args.engine, cache=cache, profiler=profiler,
+                             compact_dtypes=args.compact, customer_features=args.customer_features,
+                             impute=args.impute)
+
+    if cache is not None:
+        print(f"Stage cache: {cache.stats['hits']} hits, {cache.stats['misses']} misses, "
+              f"{cache.stats['bytes_saved'] / 2**20:.1f} MB and "
+              f"{cache.stats['seconds_saved']:.2f} s saved")
+
+    if profiler is not None:
+        profiler.save(args.profile)
+        print(profiler.summary())
+        print(f"Profile saved to {args.profile} ✅")
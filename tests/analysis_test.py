@@ -0,0 +1,118 @@
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lib.analysis.correlation import correlation, top_correlations
+from lib.analysis.memo import column_token, frame_memo
+from lib.analysis.reports import categorical_summary_stats
+
+
+def numbers(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal(n)
+    df = pd.DataFrame({col: base * rng.random() + rng.standard_normal(n) for col in 'abcd'})
+    df.loc[rng.random(n) < 0.1, 'b'] = np.nan
+    df['level'] = rng.integers(0, 4, n)
+    df['name'] = rng.choice(['x', 'y', 'z'], n)
+    return df
+
+
+class MemoTest(unittest.TestCase):
+
+    def test_token_follows_the_column(self):
+        df = numbers()
+        token = column_token(df['a'])
+        self.assertEqual(column_token(df['a']), token)
+        self.assertNotEqual(column_token(df['b']), token)
+        df['a'] = df['a'] + 1
+        self.assertNotEqual(column_token(df['a']), token)
+
+    def test_token_of_extension_columns(self):
+        df = pd.DataFrame({'c': pd.Categorical(['x', 'y']), 'n': pd.array([1, None], dtype='Int64')})
+        for col in df.columns:
+            self.assertEqual(column_token(df[col]), column_token(df[col]))
+        token = column_token(df['c'])
+        df['c'] = pd.Categorical(['x', 'y'])
+        self.assertNotEqual(column_token(df['c']), token)
+
+    def test_memo_belongs_to_the_frame(self):
+        df = numbers()
+        frame_memo(df, 'test')['key'] = 1
+        self.assertEqual(frame_memo(df, 'test'), {'key': 1})
+        self.assertEqual(frame_memo(df.copy(), 'test'), {})
+        self.assertEqual(frame_memo(pickle.loads(pickle.dumps(df)), 'test'), {})
+        self.assertNotIn('_analysis_memo', df.columns)
+
+
+class CorrelationTest(unittest.TestCase):
+
+    def test_matches_pandas(self):
+        df = numbers()
+        for method in ('pearson', 'spearman', 'kendall'):
+            expected = df.select_dtypes('number').corr(method=method)
+            result = correlation(df, method, dtype=np.float64).matrix
+            pd.testing.assert_frame_equal(result, expected, atol=1e-9)
+
+    def test_cache_is_reused_until_a_column_is_replaced(self):
+        df = numbers()
+        first = correlation(df, cache=True)
+        self.assertIs(correlation(df, cache=True), first)
+        self.assertIsNot(correlation(df, 'spearman', cache=True), first)
+        self.assertIsNot(correlation(df.copy(), cache=True), first)
+        df['a'] = df['c']
+        changed = correlation(df, cache=True)
+        self.assertIsNot(changed, first)
+        self.assertAlmostEqual(changed.matrix.loc['a', 'c'], 1.0, places=5)
+
+    def test_sees_edits_made_in_place_by_default(self):
+        df = numbers()
+        df['b'] = df['a']
+        self.assertAlmostEqual(correlation(df).matrix.loc['a', 'b'], 1.0, places=5)
+        df.loc[:, 'b'] = np.random.default_rng(1).random(len(df))
+        expected = df['a'].corr(df['b'])
+        self.assertAlmostEqual(correlation(df).matrix.loc['a', 'b'], expected, places=5)
+        df.iloc[:250, 1] = 0
+        expected = df['a'].corr(df['b'])
+        self.assertAlmostEqual(correlation(df).matrix.loc['a', 'b'], expected, places=5)
+
+    def test_top_correlations(self):
+        matrix = correlation(numbers(), dtype=np.float64).matrix
+        top = top_correlations(matrix, n=3)
+        self.assertEqual(len(top), 3)
+        self.assertTrue((top.abs().diff().dropna() <= 0).all())
+        self.assertTrue(all(left != right for left, right in top.index))
+
+
+class CategoricalSummaryTest(unittest.TestCase):
+
+    def test_cache_is_reused_until_a_column_is_replaced(self):
+        df = numbers()
+        summary = categorical_summary_stats(df, cache=True)
+        self.assertEqual(sorted(summary), ['level', 'name'])
+        self.assertEqual(categorical_summary_stats(df, cache=True), summary)
+        df['name'] = 'x'
+        self.assertEqual(categorical_summary_stats(df, cache=True)['name']['unique_values'], 1)
+        self.assertEqual(categorical_summary_stats(df, cache=True), categorical_summary_stats(df))
+
+    def test_sees_edits_made_in_place_by_default(self):
+        df = pd.DataFrame({'name': ['x', 'y', None, 'x'], 'n': [1.0, 2.0, np.nan, 1.0]})
+        before = categorical_summary_stats(df)
+        self.assertEqual(before['name']['missing_values'], 1)
+        self.assertEqual(before['n']['missing_values'], 1)
+
+        df.fillna({'name': 'y', 'n': 2.0}, inplace=True)
+        summary = categorical_summary_stats(df)
+        self.assertEqual(summary['name']['missing_values'], 0)
+        self.assertEqual(summary['n']['missing_values'], 0)
+
+        df.loc[0, 'n'] = 5
+        df.iloc[1, 0] = 'q'
+        self.assertEqual(categorical_summary_stats(df), categorical_summary_stats(df.copy()))
+        self.assertEqual(categorical_summary_stats(df)['name']['unique_values'], 3)
+        self.assertEqual(categorical_summary_stats(df)['n']['unique_values'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
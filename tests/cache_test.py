@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from lib.io.load import read_raw_csv
+from lib.io.schema import RAW_SCHEMA
+from lib.preprocessing import numeric
+from lib.preprocessing.cache import StageCache, source_fingerprint
+from lib.preprocessing.cleaning import handle_missing_data, transform_data_types
+
+
+class SourceFingerprintTest(unittest.TestCase):
+
+    def test_follows_helpers_in_other_modules(self):
+        fingerprint = source_fingerprint(transform_data_types)
+        self.assertIn('def coerce_numeric', fingerprint)
+        self.assertIn('NUMBER_PATTERN=', fingerprint)
+        self.assertIn('STRIPPED_PATTERN=', fingerprint)
+
+    def test_changes_with_a_constant_of_another_module(self):
+        before = source_fingerprint(transform_data_types)
+        with mock.patch.object(numeric, 'STRIPPED_PATTERN', r'^\d+$'):
+            self.assertNotEqual(source_fingerprint(transform_data_types), before)
+        self.assertEqual(source_fingerprint(transform_data_types), before)
+
+    def test_unrelated_stage_is_unchanged(self):
+        before = source_fingerprint(handle_missing_data)
+        with mock.patch.object(numeric, 'STRIPPED_PATTERN', r'^\d+$'):
+            self.assertEqual(source_fingerprint(handle_missing_data), before)
+
+    def test_closure_values(self):
+        def make(column):
+            def fill(series):
+                return series.fillna(column)
+            return fill
+        self.assertNotEqual(source_fingerprint(make('a')), source_fingerprint(make('b')))
+
+
+class StageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_path = os.path.join(self.tmp.name, 'raw.csv')
+        pd.DataFrame({'Age': ['23', '-5', None, '40'], 'Monthly_Balance': ['1', '2', 'x', '4']}).to_csv(
+            self.csv_path, index=False)
+        self.cache = StageCache(os.path.join(self.tmp.name, 'cache'))
+
+    def test_input_key_covers_schema_and_options(self):
+        key = self.cache.input_key(self.csv_path, reader=read_raw_csv, engine=None)
+        self.assertEqual(self.cache.input_key(self.csv_path, reader=read_raw_csv, engine=None), key)
+        self.assertNotEqual(self.cache.input_key(self.csv_path, reader=read_raw_csv, engine='c'), key)
+        with mock.patch.dict(RAW_SCHEMA, {'Age': 'float64'}):
+            self.assertNotEqual(self.cache.input_key(self.csv_path, reader=read_raw_csv, engine=None), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lib.preprocessing.cleaning import (
+    clean_loan_types,
+    transform_data_types,
+    transform_special_columns,
+)
+
+
+def clean_age_per_row(ages):
+    # The Age handling transform_data_types had before, with its per-row lambda
+    ages = pd.to_numeric(ages, errors='coerce')
+    age_median = int(ages.median()) if not ages.isna().all() else 0
+    ages = ages.fillna(age_median).astype(int)
+    median_age = int(ages[ages >= 0].median()) if not ages[ages >= 0].empty else 0
+    ages = ages.apply(lambda x: median_age if x < 0 else x).astype(int)
+    return ages[(ages >= 0) & (ages <= 100)]
+
+
+def clean_loan_types_per_row(loans):
+    # The Type_of_Loan handling transform_special_columns had before
+    loans = loans.apply(
+        lambda x: x.lower().replace('and ', '').replace(', ', ',').strip() if pd.notna(x) else x
+    )
+    # None and NaN are both written as an empty CSV field
+    return loans.mask(loans.isna(), np.nan)
+
+
+def raw_frame(ages):
+    # The columns transform_data_types reads, with valid values besides Age
+    n_rows = len(ages)
+    return pd.DataFrame({
+        'Age': pd.Series(ages, dtype=object),
+        'Annual_Income': ['1000.5'] * n_rows,
+        'Num_of_Loan': ['2'] * n_rows,
+        'Num_of_Delayed_Payment': ['3'] * n_rows,
+        'Changed_Credit_Limit': ['1.5'] * n_rows,
+        'Outstanding_Debt': ['200'] * n_rows,
+        'Amount_invested_monthly': ['50'] * n_rows,
+        'Monthly_Balance': ['300'] * n_rows,
+    })
+
+
+AGES = ['23', ' 42 ', '25_', 'abc', None, np.nan, '-500', '4000', '0', '100', '101',
+        '1e1', '3.7', '-0.5', '', '35']
+
+LOANS = ['Auto Loan', 'Auto Loan, and Personal Loan', 'Payday Loan, Student Loan, and Not Specified',
+         '  Mortgage Loan ', 'Brand Loan', 'Not Specified', '', None, np.nan, 'Auto Loan, Auto Loan']
+
+
+class CleanAgeTest(unittest.TestCase):
+
+    def assert_same_ages(self, ages):
+        expected = clean_age_per_row(pd.Series(ages, dtype=object))
+        for copy in (True, False):
+            result = transform_data_types(raw_frame(ages), copy=copy)['Age']
+            pd.testing.assert_series_equal(result, expected, check_names=False)
+
+    def test_matches_per_row_lambda(self):
+        self.assert_same_ages(AGES)
+
+    def test_all_missing_or_invalid(self):
+        self.assert_same_ages([None, 'abc', '_', np.nan])
+
+    def test_all_negative(self):
+        self.assert_same_ages(['-1', '-500', '-3'])
+
+    def test_all_out_of_range(self):
+        self.assert_same_ages(['101', '4000'])
+
+
+class CleanLoanTypesTest(unittest.TestCase):
+
+    def test_matches_per_row_lambda(self):
+        loans = pd.Series(LOANS, dtype=object)
+        pd.testing.assert_series_equal(clean_loan_types(loans), clean_loan_types_per_row(loans))
+
+    def test_categorical_input(self):
+        # read_raw_csv reads Type_of_Loan as a categorical
+        loans = pd.Series(LOANS, dtype='category')
+        expected = clean_loan_types_per_row(loans.astype(object))
+        pd.testing.assert_series_equal(clean_loan_types(loans), expected)
+
+    def test_transform_special_columns(self):
+        df = pd.DataFrame({
+            'Month': ['January'] * len(LOANS),
+            'Credit_History_Age': ['1 Years and 2 Months'] * len(LOANS),
+            'Type_of_Loan': pd.Series(LOANS, dtype=object),
+        })
+        expected = clean_loan_types_per_row(df['Type_of_Loan'])
+        result = transform_special_columns(df.copy())['Type_of_Loan']
+        pd.testing.assert_series_equal(result, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lib.io.save import ChunkWriter
+from lib.preprocessing.compaction import (
+    compact_data,
+    compaction_summary,
+    decode_loan_bitmask,
+    loan_type_bitmask,
+    merge_reports,
+)
+
+
+class LoanTypeBitmaskTest(unittest.TestCase):
+
+    def test_bits(self):
+        loans = pd.Series(['auto loan', 'Auto Loan, payday loan', 'auto loan,auto loan',
+                           'Unknown', None, 'boat loan', ''])
+        self.assertEqual(loan_type_bitmask(loans).tolist(), [1, 65, 1, 0, 0, 512, 0])
+
+    def test_round_trip(self):
+        loans = pd.Series(['mortgage loan,student loan', 'Unknown', 'not specified'])
+        self.assertEqual(decode_loan_bitmask(loan_type_bitmask(loans)).tolist(), loans.tolist())
+
+
+class CompactDataTest(unittest.TestCase):
+
+    def test_declared_dtypes(self):
+        df = pd.DataFrame({'Month': [1, 2], 'Age': [23, 40], 'Credit_History_Age': [250.0, 12.5]})
+        compact = compact_data(df)
+        self.assertEqual(compact.dtypes.astype(str).tolist(), ['int8', 'int8', 'float32'])
+
+    def test_missing_integers_become_nullable(self):
+        # Age and Num_of_Loan after fill_in_group, for a customer with no valid month
+        df = pd.DataFrame({'Age': [23.0, np.nan, 40.0], 'Num_of_Loan': [np.nan, 3.0, 300.0]})
+        compact = compact_data(df)
+        self.assertEqual(str(compact['Age'].dtype), 'Int8')
+        self.assertEqual(str(compact['Num_of_Loan'].dtype), 'Int16')
+        self.assertTrue(compact['Age'].isna().iloc[1])
+        self.assertEqual(compact['Num_of_Loan'].iloc[2], 300)
+
+    def test_values_that_do_not_fit_are_kept(self):
+        # Interpolated months and fractional or out of range integers
+        df = pd.DataFrame({'Credit_History_Age': [250.0, 250.333333], 'Age': [23.5, 40.0],
+                           'Month': [1, 1000]})
+        report = {}
+        compact = compact_data(df, report=report)
+        pd.testing.assert_frame_equal(compact, df)
+        self.assertEqual(report['skipped'], {'Credit_History_Age': 'float32', 'Age': 'int8',
+                                             'Month': 'int8'})
+        self.assertIn('Age: some values do not fit in int8', compaction_summary(report))
+
+    def test_reports_merge(self):
+        # As for the partitions compacted by the workers
+        report = {}
+        for chunk in [pd.DataFrame({'Age': [23.5]}), pd.DataFrame({'Month': [1000]})]:
+            partition_report = {}
+            compact_data(chunk, report=partition_report)
+            merge_reports(report, partition_report)
+        self.assertEqual(report['rows'], 2)
+        self.assertEqual(report['skipped'], {'Age': 'int8', 'Month': 'int8'})
+
+    def test_chunks_get_the_same_dtypes(self):
+        # The second chunk needs a wider integer type and has more distinct strings
+        # per row than the first
+        chunks = [pd.DataFrame({'Month': [1, 2], 'Count': [1, 2], 'Occupation': ['Lawyer', 'Lawyer'],
+                                'Note': ['a', 'a']}),
+                  pd.DataFrame({'Month': [3, 4], 'Count': [100000, 3], 'Occupation': ['Doctor', 'Writer'],
+                                'Note': ['b', 'c']})]
+        compact = [compact_data(chunk, errors='raise') for chunk in chunks]
+        for chunk in compact:
+            # The categories themselves may differ, ChunkWriter extends them
+            self.assertEqual(chunk.dtypes.astype(str).tolist(), ['int8', 'int64', 'category', 'object'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'chunks.parquet')
+            with ChunkWriter(path) as writer:
+                for chunk in compact:
+                    writer.write(chunk)
+            written = pd.read_parquet(path)
+        expected = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(written['Count'].tolist(), expected['Count'].tolist())
+        self.assertEqual(written['Occupation'].astype(str).tolist(), expected['Occupation'].tolist())
+
+    def test_chunks_raise_on_values_that_do_not_fit(self):
+        chunk = pd.DataFrame({'Month': [1, 1000]})
+        with self.assertRaises(ValueError):
+            compact_data(chunk, errors='raise')
+        pd.testing.assert_frame_equal(compact_data(chunk), chunk)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lib.preprocessing.encoding import (
+    Encoder,
+    FeatureEncoder,
+    MultiLabelEncoder,
+    OneHotEncoder,
+    OrdinalEncoder,
+    default_encoders,
+)
+
+
+class EncoderTest(unittest.TestCase):
+
+    def test_incomplete_subclass_fails_when_created(self):
+        class FitOnly(Encoder):
+            def partial_fit(self, df):
+                return self
+
+        with self.assertRaises(TypeError):
+            FitOnly('Occupation')
+        with self.assertRaises(TypeError):
+            Encoder('Occupation')
+
+    def test_encoders_can_be_created(self):
+        for encoder in default_encoders() + default_encoders(target_encode=True):
+            self.assertIsInstance(encoder, Encoder)
+
+    def test_ordinal(self):
+        df = pd.DataFrame({'Credit_Mix': ['Good', 'Bad', None, 'Standard']})
+        ranks = OrdinalEncoder('Credit_Mix').fit_transform(df)
+        np.testing.assert_array_equal(ranks.ravel(), [2, 0, np.nan, 1])
+
+    def test_merge_matches_fit(self):
+        df = pd.DataFrame({'Occupation': ['Lawyer', 'Doctor', 'Teacher', 'Lawyer']})
+        merged = OneHotEncoder('Occupation').fit(df.iloc[:2]).merge(OneHotEncoder('Occupation').fit(df.iloc[2:]))
+        fitted = OneHotEncoder('Occupation').fit(df)
+        self.assertEqual(merged.feature_names, fitted.feature_names)
+        np.testing.assert_array_equal(merged.transform(df).toarray(), fitted.transform(df).toarray())
+
+    def test_feature_encoder(self):
+        df = pd.DataFrame({'Credit_Mix': ['Good', 'Bad'], 'Type_of_Loan': ['auto loan,payday loan', 'Unknown'],
+                           'Age': [23, 40]})
+        encoder = FeatureEncoder([OrdinalEncoder('Credit_Mix'), MultiLabelEncoder('Type_of_Loan')],
+                                 passthrough=['Age'])
+        X = encoder.fit_transform(df)
+        self.assertEqual(X.shape, (2, len(encoder.feature_names)))
+
+
+if __name__ == '__main__':
+    unittest.main()
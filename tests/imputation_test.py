@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_raw_frame
+from lib.io.schema import IDENTIFIER_COLUMNS
+from lib.preprocessing import imputation
+from lib.preprocessing.imputation import customer_month_index, impute_by_customer, impute_from_customer
+from lib.preprocessing.pipeline import Pipeline, cleaning_steps
+from lib.preprocessing.statistics import CleaningStatistics
+
+
+class ImputeFromCustomerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.customers = pd.Series(['A', 'A', 'A', 'A', 'B', 'B'])
+        self.months = pd.Series([0, 1, 2, 3, 1, 2])
+        self.index = customer_month_index(self.customers, self.months)
+
+    def test_interpolate_leaves_out_unknown_months(self):
+        # The row of month 0 is not the month before January
+        ages = pd.Series([100.0, np.nan, 12.0, np.nan, np.nan, np.nan])
+        filled = impute_from_customer(ages, self.index, self.months, 'interpolate', fallback=-1)
+        np.testing.assert_array_equal(filled, [100, 11, 12, 13, -1, -1])
+
+    def test_unknown_month_gets_the_fallback(self):
+        ages = pd.Series([np.nan, 5.0, np.nan, np.nan, 7.0, np.nan])
+        filled = impute_from_customer(ages, self.index, self.months, 'interpolate', fallback=-1)
+        np.testing.assert_array_equal(filled, [-1, 5, 6, 7, 7, 8])
+
+    def test_median_and_mode(self):
+        values = pd.Series([1.0, np.nan, 3.0, 3.0, np.nan, np.nan])
+        np.testing.assert_array_equal(impute_from_customer(values, self.index, self.months, 'median', -1),
+                                      [1, 3, 3, 3, -1, -1])
+        np.testing.assert_array_equal(impute_from_customer(values, self.index, self.months, 'mode', -1),
+                                      [1, 3, 3, 3, -1, -1])
+
+
+class CustomerImputationPipelineTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.raw = make_raw_frame(800, seed=2)
+        cls.stats = CleaningStatistics().fit(cls.raw)
+
+    def pipeline(self, n_jobs=1):
+        keep = [col for col in IDENTIFIER_COLUMNS if col != 'Customer_ID']
+        return Pipeline(steps=cleaning_steps('customer'), drop=keep, stats=self.stats, n_jobs=n_jobs)
+
+    def test_builds_the_index_once_per_run(self):
+        with mock.patch.object(imputation, 'GroupIndex', wraps=imputation.GroupIndex) as group_index:
+            result = self.pipeline().transform(self.raw)
+        self.assertEqual(group_index.call_count, 1)
+        self.assertNotIn('customer_index', result.columns)
+
+    def test_matches_impute_by_customer(self):
+        result = self.pipeline().transform(self.raw)
+        # The median pipeline without its fill steps, then the DataFrame imputation
+        unfilled = Pipeline(steps=[step for step in cleaning_steps() if step.name != 'fill_median'],
+                            drop=[col for col in IDENTIFIER_COLUMNS if col != 'Customer_ID'],
+                            stats=self.stats)
+        expected = impute_by_customer(unfilled.transform(self.raw), self.stats)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_threads_give_the_same_result(self):
+        pd.testing.assert_frame_equal(self.pipeline(n_jobs=4).transform(self.raw),
+                                      self.pipeline().transform(self.raw))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from lib.io.load import load_data
+
+
+class LoadDataTest(unittest.TestCase):
+
+    def test_directory_with_one_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pd.DataFrame({'a': [1, 2]}).to_csv(os.path.join(directory, 'train.csv'), index=False)
+            pd.testing.assert_frame_equal(load_data(directory), pd.DataFrame({'a': [1, 2]}))
+
+    def test_directory_with_several_files_is_ambiguous(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('train.csv', 'test.csv'):
+                pd.DataFrame({'a': [1]}).to_csv(os.path.join(directory, name), index=False)
+            with self.assertRaises(ValueError):
+                load_data(directory)
+            self.assertEqual(len(load_data(os.path.join(directory, 'train.csv'))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from benchmarks.synthetic import write_raw_csv
+from lib.io.load import raw_columns, read_raw_csv
+from lib.io.schema import IDENTIFIER_COLUMNS, RAW_SCHEMA
+from lib.preprocessing.cache import StageCache
+from lib.preprocessing.cleaning import (
+    clean_categorical,
+    drop_columns,
+    handle_missing_data,
+    transform_data_types,
+    transform_special_columns,
+)
+from lib.preprocessing.pipeline import Pipeline, Step, cleaning_steps
+from lib.preprocessing.profiling import StageProfiler
+from lib.preprocessing.statistics import CleaningStatistics
+
+
+def clean_in_stages(df, stats):
+    # The stage functions, in the order the pipeline's steps follow
+    with redirect_stdout(io.StringIO()):
+        df = drop_columns(df, IDENTIFIER_COLUMNS)
+        df = transform_data_types(df, stats=stats)
+        df = clean_categorical(df)
+        df = transform_special_columns(df)
+        return handle_missing_data(df, stats=stats)
+
+
+class PipelineTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.csv_path = os.path.join(cls.tmp.name, 'train.csv')
+        write_raw_csv(cls.csv_path, 400, seed=1)
+        cls.raw = read_raw_csv(cls.csv_path, columns=list(RAW_SCHEMA))
+        cls.stats = CleaningStatistics().fit(cls.raw)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def pipeline(self, steps=None):
+        return Pipeline(steps=steps, drop=IDENTIFIER_COLUMNS, stats=self.stats)
+
+
+class PipelineTest(PipelineTestCase):
+
+    def test_matches_stage_functions(self):
+        expected = clean_in_stages(self.raw.copy(), self.stats)
+        result = self.pipeline().transform(self.raw)
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+    def test_transform_records_matches_transform(self):
+        raw = pd.read_csv(self.csv_path, nrows=50, dtype=str)
+        pipeline = self.pipeline()
+        rows = pipeline.transform_records(raw.to_dict('records'))
+        expected = pipeline.transform(self.raw.head(50)).astype(object).to_dict('index')
+        self.assertEqual(len(rows), 50)
+        # Rejected records come back as None, in place
+        self.assertTrue(any(row is None for row in rows))
+        for i, row in enumerate(rows):
+            if i in expected:
+                self.assertEqual(row.keys(), expected[i].keys())
+                for col, value in expected[i].items():
+                    self.assertTrue(row[col] == value or (pd.isna(row[col]) and pd.isna(value)),
+                                    f"row {i}, {col}: {row[col]!r} != {value!r}")
+            else:
+                self.assertIsNone(row)
+        self.assertEqual(pipeline.transform_record(raw.iloc[0].to_dict()), rows[0])
+
+
+class RunPlanTest(PipelineTestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.loads = 0
+
+    def run_plan(self, pipeline, cache, profiler=None):
+        columns = pipeline.input_columns(RAW_SCHEMA)
+
+        def load():
+            self.loads += 1
+            return read_raw_csv(self.csv_path, columns=columns)
+
+        return cache.run_plan(pipeline.plan(raw_columns(self.csv_path, columns)),
+                              cache.input_key(self.csv_path, reader=read_raw_csv, columns=columns),
+                              load, stats=self.stats, profiler=profiler)
+
+    def test_matches_transform_and_skips_the_read(self):
+        pipeline = self.pipeline()
+        expected = pipeline.transform(self.raw).reset_index(drop=True)
+        cache = StageCache(self.cache_dir.name)
+        pd.testing.assert_frame_equal(self.run_plan(pipeline, cache), expected)
+        units = 1 + len(pipeline.plan(raw_columns(self.csv_path)).groups)
+        self.assertEqual(cache.stats['misses'], units)
+
+        cache = StageCache(self.cache_dir.name)
+        pd.testing.assert_frame_equal(self.run_plan(pipeline, cache), expected)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(cache.stats['hits'], units)
+
+    def test_customer_imputation(self):
+        pipeline = self.pipeline(cleaning_steps('customer'))
+        expected = pipeline.transform(self.raw).reset_index(drop=True)
+        cache = StageCache(self.cache_dir.name)
+        pd.testing.assert_frame_equal(self.run_plan(pipeline, cache), expected)
+
+    def test_changed_step_recomputes_only_its_group(self):
+        self.run_plan(self.pipeline(), StageCache(self.cache_dir.name))
+
+        def clip_balance(series):
+            return series.clip(lower=0)
+
+        steps = cleaning_steps() + [Step('clip', clip_balance, ['Monthly_Balance'], 'Monthly_Balance')]
+        pipeline = self.pipeline(steps)
+        cache = StageCache(self.cache_dir.name)
+        result = self.run_plan(pipeline, cache)
+        self.assertEqual(cache.stats['misses'], 1)
+        self.assertEqual(self.loads, 2)
+        pd.testing.assert_frame_equal(result, pipeline.transform(self.raw).reset_index(drop=True))
+
+    def test_profiles_steps_and_cache(self):
+        pipeline = self.pipeline()
+        profiler = StageProfiler(memory=False)
+        self.run_plan(pipeline, StageCache(self.cache_dir.name), profiler)
+        paths = {record['path'] for record in profiler.records}
+        self.assertIn('pipeline;load', paths)
+        self.assertIn('pipeline;transform_data_types;parse_amount(Annual_Income)', paths)
+        self.assertIn('pipeline;cache_put(Annual_Income)', paths)
+
+        profiler = StageProfiler(memory=False)
+        self.run_plan(pipeline, StageCache(self.cache_dir.name), profiler)
+        names = [record['name'] for record in profiler.records]
+        self.assertIn('cache_get(Annual_Income)', names)
+        self.assertNotIn('load', names)
+        self.assertNotIn('parse_amount(Annual_Income)', names)
+
+
+if __name__ == '__main__':
+    unittest.main()
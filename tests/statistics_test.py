@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.synthetic import make_raw_frame
+from lib.preprocessing.statistics import CleaningStatistics
+
+
+class CleaningStatisticsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.raw = make_raw_frame(2000, seed=3)[CleaningStatistics.columns]
+
+    def chunks(self, size=100):
+        return (self.raw.iloc[start:start + size] for start in range(0, len(self.raw), size))
+
+    def test_chunks_match_one_fit(self):
+        whole = CleaningStatistics().fit(self.raw)
+        chunked = CleaningStatistics().fit(self.chunks())
+        self.assertEqual(chunked.to_dict(), whole.to_dict())
+
+    def test_medians_are_computed_once_after_the_last_chunk(self):
+        stats = CleaningStatistics()
+        with mock.patch.object(stats, '_finalize', wraps=stats._finalize) as finalize:
+            stats.fit(self.chunks())
+            self.assertEqual(finalize.call_count, 0)
+            medians = stats.medians
+            self.assertIsInstance(stats.age_median, int)
+            self.assertIsInstance(stats.median_age, int)
+            self.assertEqual(finalize.call_count, 1)
+
+            stats.merge(CleaningStatistics().fit(self.raw.iloc[:100]))
+            self.assertEqual(finalize.call_count, 1)
+            stats.to_dict()
+            self.assertEqual(finalize.call_count, 2)
+        self.assertEqual(set(stats.medians), set(medians))
+
+    def test_round_trip(self):
+        stats = CleaningStatistics().fit(self.raw)
+        restored = CleaningStatistics.from_dict(stats.to_dict())
+        self.assertEqual(restored.age_median, stats.age_median)
+        self.assertEqual(restored.median_age, stats.median_age)
+        np.testing.assert_array_equal(list(restored.medians.values()), list(stats.medians.values()))
+
+    def test_not_fitted(self):
+        stats = CleaningStatistics()
+        self.assertIsNone(stats.medians)
+        self.assertIsNone(stats.age_median)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lib.preprocessing.groups import GroupIndex
+from lib.preprocessing.temporal import add_customer_features, customer_features
+
+
+def panel():
+    # Customer A has no row for March (e.g. removed by the Age filter), customer B
+    # has a row of unknown month (0); rows are out of order
+    df = pd.DataFrame({
+        'Customer_ID': ['A', 'A', 'A', 'A', 'B', 'B', 'B'],
+        'Month': [1, 2, 4, 5, 0, 1, 2],
+        'Annual_Income': [10.0, 20.0, 40.0, 50.0, 99.0, 1.0, 2.0],
+    })
+    return df.iloc[[3, 0, 5, 2, 4, 1, 6]]
+
+
+class GroupIndexTest(unittest.TestCase):
+
+    def test_shift_counts_rows(self):
+        index = GroupIndex(pd.Series(['A', 'A', 'A', 'B']), order_by=pd.Series([1, 2, 4, 1]))
+        np.testing.assert_array_equal(index.shift([1.0, 2.0, 4.0, 1.0]), [np.nan, 1, 2, np.nan])
+
+    def test_shift_on_order(self):
+        index = GroupIndex(pd.Series(['A', 'A', 'A', 'B']), order_by=pd.Series([1, 2, 4, 1]))
+        values = [1.0, 2.0, 4.0, 1.0]
+        np.testing.assert_array_equal(index.shift(values, on_order=True), [np.nan, 1, np.nan, np.nan])
+        np.testing.assert_array_equal(index.shift(values, 2, on_order=True), [np.nan, np.nan, 2, np.nan])
+        np.testing.assert_array_equal(index.shift(values, -1, on_order=True), [2, np.nan, np.nan, np.nan])
+        np.testing.assert_array_equal(index.diff(values, on_order=True), [np.nan, 1, np.nan, np.nan])
+        np.testing.assert_array_equal(index.rolling_mean(values, 2, on_order=True), [1, 1.5, 4, 1])
+
+    def test_on_order_needs_order_by(self):
+        with self.assertRaises(ValueError):
+            GroupIndex(pd.Series(['A', 'B'])).shift([1.0, 2.0], on_order=True)
+
+
+class CustomerFeaturesTest(unittest.TestCase):
+
+    def test_lags_follow_months(self):
+        df = panel()
+        features = customer_features(df, columns=['Annual_Income'])
+        by_row = pd.concat([df, features], axis=1).set_index(['Customer_ID', 'Month'])
+        expected = pd.DataFrame({
+            'Annual_Income_lag1': [np.nan, 10, np.nan, 40, np.nan, np.nan, 1],
+            'Annual_Income_mean3': [10, 15, 30, 45, np.nan, 1, 1.5],
+            'Annual_Income_delta1': [np.nan, 10, np.nan, 10, np.nan, np.nan, 1],
+        }, index=pd.MultiIndex.from_tuples([('A', 1), ('A', 2), ('A', 4), ('A', 5),
+                                            ('B', 0), ('B', 1), ('B', 2)],
+                                           names=['Customer_ID', 'Month']), dtype=np.float32)
+        pd.testing.assert_frame_equal(by_row[expected.columns].sort_index(), expected)
+
+    def test_add_customer_features_keeps_rows(self):
+        df = panel().assign(Age=30, Num_of_Loan=2)
+        result = add_customer_features(df)
+        self.assertNotIn('Customer_ID', result.columns)
+        self.assertEqual(result.index.tolist(), df.index.tolist())
+        self.assertTrue(np.isnan(result.loc[result['Month'] == 0, 'Annual_Income_mean3']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()